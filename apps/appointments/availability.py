@@ -0,0 +1,121 @@
+import calendar
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .constants import (
+    CLINIC_HOLIDAYS,
+    CLINIC_OPEN_WEEKDAYS,
+    CLINIC_SLOT_TIMES,
+    SAME_DAY_BOOKING_CUTOFF_HOURS,
+)
+from .models import SlotAvailability, month_calendar_cache_key
+
+SLOT_LABELS = [slot.strftime("%I:%M %p").lstrip("0") for slot in CLINIC_SLOT_TIMES]
+MONTH_CALENDAR_TTL_SECONDS = 60 * 60
+
+
+def booked_masks(start_date, end_date):
+    """Map each date in [start_date, end_date] that has bookings to its slot bitmap."""
+    return dict(
+        SlotAvailability.objects
+        .filter(date__range=(start_date, end_date), booked_mask__gt=0)
+        .values_list("date", "booked_mask")
+    )
+
+
+def is_clinic_day(day):
+    return day.weekday() in CLINIC_OPEN_WEEKDAYS and day not in CLINIC_HOLIDAYS
+
+
+def booking_cutoff():
+    """Earliest bookable local (naive) datetime for public bookings."""
+    now_cutoff = timezone.now() + timedelta(hours=SAME_DAY_BOOKING_CUTOFF_HOURS)
+    return timezone.localtime(now_cutoff).replace(tzinfo=None)
+
+
+def get_next_available_slots(start_dt, limit=3, search_days=21):
+    earliest = max(timezone.localtime(start_dt).replace(tzinfo=None), booking_cutoff())
+    start_date = earliest.date()
+    end_date = start_date + timedelta(days=search_days)
+
+    masks = booked_masks(start_date, end_date)
+
+    suggestions = []
+    for offset in range(search_days + 1):
+        candidate_date = start_date + timedelta(days=offset)
+        if not is_clinic_day(candidate_date):
+            continue
+
+        mask = masks.get(candidate_date, 0)
+        for index, slot_time in enumerate(CLINIC_SLOT_TIMES):
+            if mask & (1 << index):
+                continue
+            if candidate_date == start_date and slot_time < earliest.time():
+                continue
+
+            suggestions.append({
+                "date_iso": candidate_date.isoformat(),
+                "time_value": SLOT_LABELS[index],
+                "date_label": candidate_date.strftime("%B %d, %Y"),
+                "time_label": SLOT_LABELS[index],
+            })
+            if len(suggestions) >= limit:
+                return suggestions
+
+    return suggestions
+
+
+def cached_month_masks(year, month):
+    """
+    Booked-slot bitmaps for every clinic day of a month, as {iso date: mask}.
+    Cached per month; Appointment writes drop the month's entry.
+    """
+    first_day = date(year, month, 1)
+    cache_key = month_calendar_cache_key(first_day)
+    masks = cache.get(cache_key)
+    if masks is not None:
+        return masks
+
+    last_day = first_day.replace(day=calendar.monthrange(year, month)[1])
+    booked = booked_masks(first_day, last_day)
+    masks = {
+        day.isoformat(): booked.get(day, 0)
+        for day in (first_day + timedelta(days=offset) for offset in range(last_day.day))
+        if is_clinic_day(day)
+    }
+    cache.set(cache_key, masks, MONTH_CALENDAR_TTL_SECONDS)
+    return masks
+
+
+def month_availability(year, month):
+    """
+    Compact public calendar for a month. Each bookable clinic day maps to a
+    string with one character per slot label: "1" free, "0" taken or past the
+    booking cutoff. Closed days, holidays and past days are omitted, so a
+    fully booked day is all zeros rather than missing.
+    """
+    earliest = booking_cutoff()
+    earliest_date = earliest.date()
+
+    days = {}
+    for iso_date, mask in cached_month_masks(year, month).items():
+        day = date.fromisoformat(iso_date)
+        if day < earliest_date:
+            continue
+
+        if day == earliest_date:
+            for index, slot_time in enumerate(CLINIC_SLOT_TIMES):
+                if slot_time < earliest.time():
+                    mask |= 1 << index
+
+        days[iso_date] = "".join(
+            "0" if mask & (1 << index) else "1" for index in range(len(CLINIC_SLOT_TIMES))
+        )
+
+    return {
+        "month": f"{year:04d}-{month:02d}",
+        "slot_labels": SLOT_LABELS,
+        "days": days,
+    }
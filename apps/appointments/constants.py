@@ -16,6 +16,9 @@ APPOINTMENT_SERVICES = [
 
 SAME_DAY_BOOKING_CUTOFF_HOURS = 2
 
+# How many months past the current one the public availability API serves
+AVAILABILITY_MONTHS_AHEAD = 12
+
 CLINIC_OPEN_WEEKDAYS = {0, 2, 5, 6}
 CLINIC_OPEN_DAYS_LABEL = "Monday, Wednesday, Saturday, and Sunday"
 
@@ -1,6 +1,6 @@
 import re
 from django import forms
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from datetime import datetime, timedelta
 from apps.appointments.models import Appointment
@@ -14,6 +14,13 @@ from .constants import (
     CLINIC_HOLIDAYS,
 )
 
+SLOT_BOOKED_MESSAGE = "The selected date or time is already booked. Please choose a different date or time."
+
+
+class SlotUnavailableError(Exception):
+    """Raised by BaseAppointmentForm.save when the slot was taken concurrently."""
+
+
 class BaseAppointmentForm(forms.ModelForm):
     appointment_date = forms.DateField(
         widget=forms.DateInput(attrs={"type": "date", "class": "form-control"})
@@ -54,24 +61,28 @@ class BaseAppointmentForm(forms.ModelForm):
         timeslot_str = appt_time.strftime("%I:%M %p").lstrip("0")
         cleaned["timeslot_str"] = timeslot_str
 
+        if self.slot_is_taken(appt_date, appt_time):
+            self.mark_slot_booked(appt_date, appt_time)
+            raise forms.ValidationError(SLOT_BOOKED_MESSAGE)
+
+        return cleaned
+
+    def slot_is_taken(self, appt_date, appt_time):
         qs = Appointment.objects.filter(
             date=appt_date,
             start_time=appt_time,
-            status__in=[Appointment.STATUS_PENDING, Appointment.STATUS_CONFIRMED],
+            status__in=Appointment.ACTIVE_STATUSES,
         )
 
         if self.instance.pk:
             qs = qs.exclude(pk=self.instance.pk)
 
-        if qs.exists():
-            self.unavailable_reason = "booked"
-            self.unavailable_date = appt_date
-            self.unavailable_time = appt_time
-            raise forms.ValidationError(
-                "The selected date or time is already booked. Please choose a different date or time."
-            )
+        return qs.exists()
 
-        return cleaned
+    def mark_slot_booked(self, appt_date, appt_time):
+        self.unavailable_reason = "booked"
+        self.unavailable_date = appt_date
+        self.unavailable_time = appt_time
 
     def clean_phone(self):
         raw_phone = self.cleaned_data.get("phone", "")
@@ -114,10 +125,27 @@ class BaseAppointmentForm(forms.ModelForm):
             instance.status = status
 
         if commit:
-            instance.save()
+            self.insert_or_flag_conflict(instance)
 
         return instance
 
+    def insert_or_flag_conflict(self, instance):
+        """
+        Save optimistically and let unique_active_appointment_per_timeslot
+        arbitrate races. A slot conflict is reported like a failed
+        validate_slot_collision and raised as SlotUnavailableError so the
+        surrounding transaction (including any new patient row) rolls back.
+        """
+        try:
+            with transaction.atomic():
+                instance.save()
+        except IntegrityError:
+            if not self.slot_is_taken(instance.date, instance.start_time):
+                raise
+            self.mark_slot_booked(instance.date, instance.start_time)
+            self.add_error(None, SLOT_BOOKED_MESSAGE)
+            raise SlotUnavailableError(SLOT_BOOKED_MESSAGE)
+
 
 class AppointmentForm(BaseAppointmentForm):
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.appointments.models import Appointment, PatientStats
+from apps.patients.services import bulk_get_or_create_patient_records
+
+
+class Command(BaseCommand):
+    help = "Attach appointments without a patient to a matching or newly created patient record."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        linked = 0
+        last_pk = 0
+
+        while True:
+            batch = list(
+                Appointment.objects
+                .filter(patient__isnull=True, pk__gt=last_pk)
+                .order_by("pk")
+                .only("pk", "name", "phone", "email")[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            with transaction.atomic():
+                patients = bulk_get_or_create_patient_records(
+                    (appointment.name, appointment.phone, appointment.email)
+                    for appointment in batch
+                )
+
+                to_update = []
+                for appointment, patient in zip(batch, patients):
+                    if patient is not None:
+                        appointment.patient = patient
+                        to_update.append(appointment)
+
+                Appointment.objects.bulk_update(to_update, ["patient"], batch_size=500)
+                # bulk_update skips Appointment.save, so bring the counters up to date here.
+                PatientStats.objects.refresh(appointment.patient_id for appointment in to_update)
+
+            linked += len(to_update)
+
+        self.stdout.write(self.style.SUCCESS(f"Linked {linked} appointment(s) to patients."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.appointments.models import AppointmentDailyRollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily appointment rollup used by the staff charts."
+
+    def handle(self, *args, **options):
+        days = AppointmentDailyRollup.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt appointment rollup for {days} day(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.appointments.models import LatestCompletedVisit
+
+
+class Command(BaseCommand):
+    help = "Rebuild the latest completed visit per patient used by the staff dashboard."
+
+    def handle(self, *args, **options):
+        rows = LatestCompletedVisit.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt latest visits for {rows} patient(s)."))
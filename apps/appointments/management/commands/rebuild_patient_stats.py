@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.appointments.models import PatientStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-patient appointment counters used by the staff patient queue."
+
+    def handle(self, *args, **options):
+        rows = PatientStats.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {rows} patient(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.appointments.models import SlotAvailability
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-day slot availability index from pending and confirmed appointments."
+
+    def handle(self, *args, **options):
+        days = SlotAvailability.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt slot availability for {days} day(s)."))
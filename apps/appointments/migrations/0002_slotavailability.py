@@ -0,0 +1,47 @@
+from datetime import time
+
+from django.db import migrations, models
+
+SLOT_TIMES = [time(hour, 0) for hour in range(9, 18)]
+
+
+def build_slot_availability(apps, schema_editor):
+    Appointment = apps.get_model("appointments", "Appointment")
+    SlotAvailability = apps.get_model("appointments", "SlotAvailability")
+    slot_index = {slot: index for index, slot in enumerate(SLOT_TIMES)}
+
+    masks = {}
+    active = Appointment.objects.filter(
+        status__in=["pending", "confirmed"],
+        start_time__in=SLOT_TIMES,
+    ).values_list("date", "start_time")
+
+    for day, start_time in active.iterator():
+        masks[day] = masks.get(day, 0) | (1 << slot_index[start_time])
+
+    SlotAvailability.objects.bulk_create(
+        [SlotAvailability(date=day, booked_mask=mask) for day, mask in masks.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0001_move_appointment_from_website"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlotAvailability",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField(unique=True)),
+                ("booked_mask", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "Slot availability",
+            },
+        ),
+        migrations.RunPython(build_slot_availability, migrations.RunPython.noop),
+    ]
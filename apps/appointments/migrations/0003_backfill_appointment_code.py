@@ -0,0 +1,38 @@
+import re
+
+from django.db import migrations
+
+from apps.shared.sequences import advance_id_sequence
+
+CODE_PATTERN = re.compile(r"^APT-(\d+)$")
+
+
+def backfill_appointment_codes(apps, schema_editor):
+    Appointment = apps.get_model("appointments", "Appointment")
+
+    missing = list(Appointment.objects.filter(appointment_code__isnull=True).only("pk"))
+    for row in missing:
+        row.appointment_code = f"APT-{row.pk:06d}"
+    Appointment.objects.bulk_update(missing, ["appointment_code"], batch_size=500)
+
+    # New rows take their code from a reserved pk, so the id counter must
+    # move past every code already issued.
+    highest = 0
+    for code in Appointment.objects.values_list("appointment_code", flat=True).iterator():
+        match = CODE_PATTERN.match(code or "")
+        if match:
+            highest = max(highest, int(match.group(1)))
+
+    if highest:
+        advance_id_sequence(schema_editor, Appointment._meta.db_table, Appointment._meta.pk.column, highest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0002_slotavailability"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_appointment_codes, migrations.RunPython.noop),
+    ]
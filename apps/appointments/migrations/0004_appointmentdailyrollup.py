@@ -0,0 +1,65 @@
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+STATUS_COUNT_FIELDS = {
+    "pending": "pending_count",
+    "confirmed": "confirmed_count",
+    "cancelled": "cancelled_count",
+    "completed": "completed_count",
+}
+
+
+def build_daily_rollup(apps, schema_editor):
+    Appointment = apps.get_model("appointments", "Appointment")
+    AppointmentDailyRollup = apps.get_model("appointments", "AppointmentDailyRollup")
+
+    rows = {}
+    status_counts = Appointment.objects.values("date", "status").annotate(count=Count("pk")).order_by()
+    for row in status_counts:
+        field = STATUS_COUNT_FIELDS.get(row["status"])
+        if field:
+            rows.setdefault(row["date"], {})[field] = row["count"]
+
+    created_counts = (
+        Appointment.objects
+        .annotate(created_day=TruncDate("created_at", tzinfo=timezone.get_current_timezone()))
+        .values("created_day")
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+    for row in created_counts:
+        rows.setdefault(row["created_day"], {})["created_count"] = row["count"]
+
+    AppointmentDailyRollup.objects.bulk_create(
+        [AppointmentDailyRollup(date=day, **counts) for day, counts in rows.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0003_backfill_appointment_code"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AppointmentDailyRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField(unique=True)),
+                ("pending_count", models.IntegerField(default=0)),
+                ("confirmed_count", models.IntegerField(default=0)),
+                ("cancelled_count", models.IntegerField(default=0)),
+                ("completed_count", models.IntegerField(default=0)),
+                ("created_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["date"],
+            },
+        ),
+        migrations.RunPython(build_daily_rollup, migrations.RunPython.noop),
+    ]
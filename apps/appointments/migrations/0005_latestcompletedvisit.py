@@ -0,0 +1,60 @@
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_latest_visits(apps, schema_editor):
+    Appointment = apps.get_model("appointments", "Appointment")
+    LatestCompletedVisit = apps.get_model("appointments", "LatestCompletedVisit")
+
+    rows = {}
+    completed = (
+        Appointment.objects
+        .filter(status="completed")
+        .order_by("-date", "-start_time", "-id")
+        .values_list("pk", "name", "phone", "email", "date", "start_time")
+    )
+    for pk, name, phone, email, visit_date, start_time in completed.iterator(chunk_size=2000):
+        identity = ((phone or "").strip(), (email or "").strip(), (name or "").strip().lower())
+        key = hashlib.sha1("\x1f".join(identity).encode()).hexdigest()
+        if key not in rows:
+            rows[key] = LatestCompletedVisit(
+                identity_key=key,
+                appointment_id=pk,
+                date=visit_date,
+                start_time=start_time,
+            )
+
+    LatestCompletedVisit.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0004_appointmentdailyrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LatestCompletedVisit",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("identity_key", models.CharField(max_length=40, unique=True)),
+                ("date", models.DateField()),
+                ("start_time", models.TimeField(blank=True, null=True)),
+                ("appointment", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="appointments.appointment")),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        models.OrderBy(models.F("date"), descending=True),
+                        models.OrderBy(models.F("start_time"), descending=True),
+                        models.OrderBy(models.F("appointment"), descending=True),
+                        name="latest_visit_recency_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(build_latest_visits, migrations.RunPython.noop),
+    ]
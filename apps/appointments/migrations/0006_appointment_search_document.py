@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+from apps.patients.normalization import phone_key
+from apps.shared.search import build_search_document, create_search_index, drop_search_index
+
+
+def backfill_search_documents(apps, schema_editor):
+    Appointment = apps.get_model("appointments", "Appointment")
+
+    batch = []
+    for appointment in Appointment.objects.only("pk", "name", "phone", "email").iterator(chunk_size=500):
+        appointment.search_document = build_search_document(
+            appointment.name, appointment.phone, phone_key(appointment.phone), appointment.email
+        )
+        batch.append(appointment)
+        if len(batch) >= 500:
+            Appointment.objects.bulk_update(batch, ["search_document"])
+            batch = []
+
+    if batch:
+        Appointment.objects.bulk_update(batch, ["search_document"])
+
+
+def create_index(apps, schema_editor):
+    create_search_index(schema_editor.connection, "website_appointment")
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection, "website_appointment")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0005_latestcompletedvisit"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="appointment",
+            name="search_document",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,60 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q
+
+STATUS_COUNT_FIELDS = {
+    "pending": "pending_count",
+    "confirmed": "confirmed_count",
+    "cancelled": "cancelled_count",
+    "completed": "completed_count",
+}
+
+
+def build_patient_stats(apps, schema_editor):
+    Appointment = apps.get_model("appointments", "Appointment")
+    PatientStats = apps.get_model("appointments", "PatientStats")
+
+    totals = (
+        Appointment.objects
+        .filter(patient__isnull=False)
+        .values("patient_id")
+        .annotate(
+            first_seen=Min("created_at"),
+            last_seen=Max("date"),
+            total_count=Count("pk"),
+            **{field: Count("pk", filter=Q(status=status)) for status, field in STATUS_COUNT_FIELDS.items()},
+        )
+        .order_by()
+    )
+    PatientStats.objects.bulk_create([PatientStats(**row) for row in totals], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0007_appointment_query_indexes"),
+        ("patients", "0005_patient_search_document"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatientStats",
+            fields=[
+                ("patient", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="stats", serialize=False, to="patients.patient")),
+                ("first_seen", models.DateTimeField(blank=True, null=True)),
+                ("last_seen", models.DateField(blank=True, null=True)),
+                ("total_count", models.IntegerField(default=0)),
+                ("pending_count", models.IntegerField(default=0)),
+                ("confirmed_count", models.IntegerField(default=0)),
+                ("cancelled_count", models.IntegerField(default=0)),
+                ("completed_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "Patient stats",
+                "indexes": [
+                    models.Index(models.OrderBy(models.F("last_seen"), descending=True), name="patient_stats_last_seen_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(build_patient_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0008_patientstats"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="appointment",
+            name="appointment_status_date_idx",
+        ),
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(fields=["status", "date", "start_time", "id"], name="appointment_status_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(fields=["status", "-date", "start_time", "id"], name="appointment_status_history_idx"),
+        ),
+    ]
@@ -0,0 +1,48 @@
+import hashlib
+
+from django.db import migrations, models
+
+from apps.shared.search import ensure_search_index
+
+BATCH_SIZE = 500
+
+
+def fill_visit_identity_keys(apps, schema_editor):
+    Appointment = apps.get_model("appointments", "Appointment")
+
+    batch = []
+    for appointment in Appointment.objects.only("pk", "name", "phone", "email").iterator(chunk_size=BATCH_SIZE):
+        identity = (
+            (appointment.phone or "").strip(),
+            (appointment.email or "").strip(),
+            (appointment.name or "").strip().lower(),
+        )
+        appointment.visit_identity_key = hashlib.sha1("\x1f".join(identity).encode()).hexdigest()
+        batch.append(appointment)
+        if len(batch) >= BATCH_SIZE:
+            Appointment.objects.bulk_update(batch, ["visit_identity_key"])
+            batch = []
+    if batch:
+        Appointment.objects.bulk_update(batch, ["visit_identity_key"])
+
+
+def reinstall_search_index(apps, schema_editor):
+    # Adding the column remakes the table on SQLite, which drops the sync triggers.
+    ensure_search_index(schema_editor.connection, "website_appointment")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0009_appointment_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="appointment",
+            name="visit_identity_key",
+            field=models.CharField(blank=True, db_index=True, default="", editable=False, max_length=40),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+        migrations.RunPython(fill_visit_identity_keys, migrations.RunPython.noop),
+    ]
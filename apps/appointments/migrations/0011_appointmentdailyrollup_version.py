@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0010_appointment_visit_identity_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="appointmentdailyrollup",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,5 +1,24 @@
-from django.db import models
-from django.db.models import Q
+import hashlib
+from datetime import time
+
+from django.core.cache import cache
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import Case, Count, F, Max, Min, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.patients.normalization import phone_key
+from apps.shared.cache import CacheNamespace
+from apps.shared.search import build_search_document
+from apps.shared.sequences import reserve_pk
+
+from .constants import CLINIC_SLOT_TIMES
+
+SLOT_INDEX = {slot: index for index, slot in enumerate(CLINIC_SLOT_TIMES)}
+ALL_SLOTS_MASK = (1 << len(CLINIC_SLOT_TIMES)) - 1
+
+# Summaries derived from the whole appointment table; every write retires them.
+APPOINTMENTS_CACHE = CacheNamespace("appointments")
 
 
 class Appointment(models.Model):
@@ -15,6 +34,8 @@ class Appointment(models.Model):
         (STATUS_COMPLETED, "Completed"),
     ]
 
+    ACTIVE_STATUSES = [STATUS_PENDING, STATUS_CONFIRMED]
+
     patient = models.ForeignKey(
         "patients.Patient",
         null=True,
@@ -33,6 +54,12 @@ class Appointment(models.Model):
 
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Name, phone and email in one string; indexed for substring search
+    # (see apps.shared.search).
+    search_document = models.TextField(blank=True, default="", editable=False)
+    # visit_identity_key() of (phone, email, name), normalized in Python on
+    # save, so LatestCompletedVisit never has to re-normalize in SQL.
+    visit_identity_key = models.CharField(max_length=40, blank=True, default="", editable=False, db_index=True)
     appointment_code = models.CharField(
         max_length=16,
         unique=True,
@@ -53,6 +80,10 @@ class Appointment(models.Model):
             models.Index(fields=["date"], name="website_app_date_965bb0_idx"),
             models.Index(fields=["name"], name="website_app_name_7177d6_idx"),
             models.Index(fields=["patient"], name="website_app_patient_aa7552_idx"),
+            # Staff lists seek within one status: by schedule, and newest day first.
+            models.Index(fields=["status", "date", "start_time", "id"], name="appointment_status_date_idx"),
+            models.Index(fields=["status", "-date", "start_time", "id"], name="appointment_status_history_idx"),
+            models.Index(fields=["created_at"], name="appointment_created_at_idx"),
         ]
         ordering = ["-date", "start_time", "name"]
         constraints = [
@@ -74,15 +105,597 @@ class Appointment(models.Model):
             return parts[0][:2].upper()
         return (parts[0][0] + parts[-1][0]).upper()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_slot = instance.booked_slot()
+        instance._loaded_rollup = instance.rollup_state()
+        instance._loaded_visit = instance.visit_state()
+        instance._loaded_stats = instance.stats_state()
+        return instance
+
+    def booked_slot(self):
+        """
+        Return the (date, slot index) this appointment occupies in the
+        availability index, or None when it does not block a clinic slot.
+        Reads loaded values only so deferred fields never trigger a query.
+        """
+        data = self.__dict__
+        if data.get("status") not in self.ACTIVE_STATUSES:
+            return None
+
+        slot_index = SLOT_INDEX.get(data.get("start_time"))
+        if slot_index is None or data.get("date") is None:
+            return None
+        return (data["date"], slot_index)
+
+    def rollup_state(self):
+        """
+        Return the (date, status, local created date) this appointment counts
+        towards in the daily rollup, or None when any of them is not loaded.
+        """
+        data = self.__dict__
+        created_at = data.get("created_at")
+        if data.get("date") is None or not data.get("status") or created_at is None:
+            return None
+        return (data["date"], data["status"], timezone.localdate(created_at))
+
+    def visit_state(self):
+        """
+        Return (identity, date, start_time) when this is a completed visit,
+        else None. The identity is (phone, email, lower-cased name), stripped,
+        which is how the dashboard tells patients apart.
+        """
+        data = self.__dict__
+        if data.get("status") != self.STATUS_COMPLETED or data.get("date") is None:
+            return None
+        if any(field not in data for field in ("name", "phone", "email", "start_time")):
+            return None
+
+        identity = visit_identity(data["name"], data["phone"], data["email"])
+        return (identity, data["date"], data["start_time"])
+
+    def stats_state(self):
+        """
+        Return the (patient id, status, created_at, date) this appointment
+        counts towards in PatientStats, or None when it has no patient or
+        any of them is not loaded.
+        """
+        data = self.__dict__
+        if any(data.get(field) is None for field in ("patient_id", "status", "created_at", "date")):
+            return None
+        return (data["patient_id"], data["status"], data["created_at"], data["date"])
+
+    def refresh_search_document(self):
+        """Recompute search_document; returns True when it changed."""
+        document = build_search_document(self.name, self.phone, phone_key(self.phone), self.email)
+        if self.search_document == document:
+            return False
+        self.search_document = document
+        return True
+
+    def refresh_visit_identity_key(self):
+        self.visit_identity_key = visit_identity_key(visit_identity(self.name, self.phone, self.email))
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        previous_slot = getattr(self, "_loaded_slot", None)
+        previous_rollup = getattr(self, "_loaded_rollup", None)
+        previous_visit = getattr(self, "_loaded_visit", None)
+        previous_stats = getattr(self, "_loaded_stats", None)
 
-        if self.appointment_code:
-            return
+        using = kwargs.get("using") or router.db_for_write(Appointment, instance=self)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.refresh_search_document()
+            self.refresh_visit_identity_key()
+        elif {"name", "phone", "email"} & set(update_fields):
+            self.refresh_search_document()
+            self.refresh_visit_identity_key()
+            kwargs["update_fields"] = set(update_fields) | {"search_document", "visit_identity_key"}
+
+        with transaction.atomic(using=using, savepoint=False):
+            if not self.appointment_code and reserve_pk(self, kwargs):
+                self.appointment_code = f"APT-{self.pk:06d}"
 
-        self.appointment_code = f"APT-{self.pk:06d}"
-        super().save(update_fields=["appointment_code"])
+            super().save(*args, **kwargs)
+
+            if not self.appointment_code:
+                # Backends without id reservation, and legacy rows missing a code.
+                self.appointment_code = f"APT-{self.pk:06d}"
+                super().save(update_fields=["appointment_code"])
+
+            current_slot = self.booked_slot()
+            SlotAvailability.objects.move_slot(previous_slot, current_slot)
+
+            current_rollup = self.rollup_state()
+            AppointmentDailyRollup.objects.move(previous_rollup, current_rollup)
+
+            current_visit = self.visit_state()
+            LatestCompletedVisit.objects.move(previous_visit, current_visit, self.pk)
+
+            current_stats = self.stats_state()
+            PatientStats.objects.move(previous_stats, current_stats)
+
+        self._loaded_slot = current_slot
+        self._loaded_rollup = current_rollup
+        self._loaded_visit = current_visit
+        self._loaded_stats = current_stats
+        APPOINTMENTS_CACHE.bump()
+
+    def delete(self, *args, **kwargs):
+        pk, visit, stats = self.pk, self.visit_state(), self.stats_state()
+        with transaction.atomic(savepoint=False):
+            SlotAvailability.objects.move_slot(self.booked_slot(), None)
+            AppointmentDailyRollup.objects.move(self.rollup_state(), None)
+            result = super().delete(*args, **kwargs)
+            LatestCompletedVisit.objects.move(visit, None, pk)
+            PatientStats.objects.move(stats, None)
+        APPOINTMENTS_CACHE.bump()
+        return result
 
     def __str__(self):
         t = self.start_time.strftime("%I:%M %p").lstrip("0") if self.start_time else self.timeslot
         return f"{self.name} - {self.date} {t}"
+
+
+def month_calendar_cache_key(day):
+    return f"appointments:availability:{day:%Y-%m}"
+
+
+def invalidate_month_calendars(days):
+    """
+    Drop cached month calendars now and again after commit, so a reader
+    that cached the pre-commit state in between is evicted as well.
+    """
+    keys = {month_calendar_cache_key(day) for day in days}
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class SlotAvailabilityManager(models.Manager):
+    def move_slot(self, previous, current):
+        """Release the previous (date, slot index) and claim the current one."""
+        if previous == current:
+            return
+        if previous:
+            self.release(*previous)
+        if current:
+            self.claim(*current)
+        invalidate_month_calendars(slot[0] for slot in (previous, current) if slot)
+
+    def claim(self, day, slot_index):
+        bit = 1 << slot_index
+        updated = self.filter(date=day).update(booked_mask=F("booked_mask").bitor(bit))
+        if updated:
+            return
+
+        _, created = self.get_or_create(date=day, defaults={"booked_mask": bit})
+        if not created:
+            self.filter(date=day).update(booked_mask=F("booked_mask").bitor(bit))
+
+    def release(self, day, slot_index):
+        keep = ALL_SLOTS_MASK ^ (1 << slot_index)
+        self.filter(date=day).update(booked_mask=F("booked_mask").bitand(keep))
+
+    def rebuild(self):
+        """Recompute every day's bitmap from active appointments. Returns the row count."""
+        masks = {}
+        active = Appointment.objects.filter(
+            status__in=Appointment.ACTIVE_STATUSES,
+            start_time__in=CLINIC_SLOT_TIMES,
+        ).values_list("date", "start_time")
+
+        for day, start_time in active.iterator():
+            masks[day] = masks.get(day, 0) | (1 << SLOT_INDEX[start_time])
+
+        with transaction.atomic():
+            invalidate_month_calendars(self.values_list("date", flat=True))
+            invalidate_month_calendars(masks)
+            self.all().delete()
+            self.bulk_create(
+                [self.model(date=day, booked_mask=mask) for day, mask in masks.items()],
+                batch_size=500,
+            )
+        return len(masks)
+
+
+class SlotAvailability(models.Model):
+    """
+    Per-day bitmap of booked clinic slots. Bit i is set when
+    CLINIC_SLOT_TIMES[i] holds a pending or confirmed appointment.
+    Maintained by Appointment.save/delete; rebuild with
+    `manage.py rebuild_slot_availability`.
+    """
+
+    date = models.DateField(unique=True)
+    booked_mask = models.PositiveIntegerField(default=0)
+
+    objects = SlotAvailabilityManager()
+
+    class Meta:
+        verbose_name_plural = "Slot availability"
+
+    def is_booked(self, slot_index):
+        return bool(self.booked_mask & (1 << slot_index))
+
+    def __str__(self):
+        return f"{self.date} ({self.booked_mask:0{len(CLINIC_SLOT_TIMES)}b})"
+
+
+class AppointmentDailyRollupManager(models.Manager):
+    def move(self, previous, current):
+        """
+        Move one appointment's contribution from the previous
+        (date, status, created date) to the current one.
+        """
+        if previous == current:
+            return
+
+        deltas = {}
+        for state, step in ((previous, -1), (current, 1)):
+            if not state:
+                continue
+            day, status, created_day = state
+            if status in self.model.STATUS_COUNT_FIELDS:
+                field = self.model.STATUS_COUNT_FIELDS[status]
+                day_deltas = deltas.setdefault(day, {})
+                day_deltas[field] = day_deltas.get(field, 0) + step
+            created_deltas = deltas.setdefault(created_day, {})
+            created_deltas["created_count"] = created_deltas.get("created_count", 0) + step
+
+        for day, day_deltas in deltas.items():
+            self.apply(day, day_deltas)
+
+    def apply(self, day, deltas):
+        """Add `deltas` ({count field: change}) to the day's row, creating it if needed."""
+        updates = {field: F(field) + change for field, change in deltas.items() if change}
+        if not updates:
+            return
+        updates["updated_at"] = timezone.now()
+        updates["version"] = F("version") + 1
+
+        if self.filter(date=day).update(**updates):
+            return
+
+        self.get_or_create(date=day)
+        self.filter(date=day).update(**updates)
+
+    def rebuild(self):
+        """Recompute every day's counters from the appointment table. Returns the row count."""
+        rows = {}
+
+        status_counts = (
+            Appointment.objects
+            .values("date", "status")
+            .annotate(count=Count("pk"))
+            .order_by()
+        )
+        for row in status_counts:
+            field = self.model.STATUS_COUNT_FIELDS.get(row["status"])
+            if field:
+                rows.setdefault(row["date"], {})[field] = row["count"]
+
+        created_counts = (
+            Appointment.objects
+            .annotate(created_day=TruncDate("created_at", tzinfo=timezone.get_current_timezone()))
+            .values("created_day")
+            .annotate(count=Count("pk"))
+            .order_by()
+        )
+        for row in created_counts:
+            rows.setdefault(row["created_day"], {})["created_count"] = row["count"]
+
+        with transaction.atomic():
+            # Start every row above the old total so no window's Sum("version") repeats.
+            version = (self.aggregate(total=Sum("version"))["total"] or 0) + 1
+            self.all().delete()
+            self.bulk_create(
+                [self.model(date=day, version=version, **counts) for day, counts in rows.items()],
+                batch_size=500,
+            )
+        return len(rows)
+
+
+class AppointmentDailyRollup(models.Model):
+    """
+    Per-day appointment counters for the staff charts: appointments
+    scheduled on `date` by status, and booking requests created that
+    (clinic-local) day. Maintained by Appointment.save/delete; rebuild with
+    `manage.py rebuild_appointment_rollup`.
+    """
+
+    STATUS_COUNT_FIELDS = {
+        Appointment.STATUS_PENDING: "pending_count",
+        Appointment.STATUS_CONFIRMED: "confirmed_count",
+        Appointment.STATUS_CANCELLED: "cancelled_count",
+        Appointment.STATUS_COMPLETED: "completed_count",
+    }
+
+    date = models.DateField(unique=True)
+    pending_count = models.IntegerField(default=0)
+    confirmed_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Bumped by every counter update; chart ETags are built from it.
+    version = models.PositiveIntegerField(default=0)
+
+    objects = AppointmentDailyRollupManager()
+
+    class Meta:
+        ordering = ["date"]
+
+    @classmethod
+    def scheduled_total(cls):
+        """Expression for all appointments scheduled on the row's date."""
+        return F("pending_count") + F("confirmed_count") + F("cancelled_count") + F("completed_count")
+
+    @property
+    def scheduled_count(self):
+        return self.pending_count + self.confirmed_count + self.cancelled_count + self.completed_count
+
+    def __str__(self):
+        return f"{self.date}: {self.scheduled_count} scheduled, {self.created_count} created"
+
+
+def visit_identity(name, phone, email):
+    """(phone, email, lower-cased name), stripped: how the dashboard tells patients apart."""
+    return ((phone or "").strip(), (email or "").strip(), (name or "").strip().lower())
+
+
+def visit_identity_key(identity):
+    return hashlib.sha1("\x1f".join(identity).encode()).hexdigest()
+
+
+def visit_sort_key(visit_date, start_time, appointment_id):
+    # Mirrors ORDER BY -date, -start_time, -id with missing times sorting last.
+    return (visit_date, start_time or time.min, appointment_id)
+
+
+class LatestCompletedVisitManager(models.Manager):
+    def move(self, previous, current, appointment_id):
+        """
+        Update the per-identity rows after an appointment's visit state
+        changed from `previous` to `current` (see Appointment.visit_state).
+        """
+        if previous == current:
+            return
+
+        recomputed = None
+        if previous:
+            identity = previous[0]
+            row = self.filter(identity_key=visit_identity_key(identity)).first()
+            # Missing means the row was cascaded away with this appointment.
+            if row is None or row.appointment_id == appointment_id:
+                self.recompute(identity)
+                recomputed = identity
+
+        if current and current[0] != recomputed:
+            self.offer(current, appointment_id)
+
+    def offer(self, visit, appointment_id):
+        """Record this visit if it is the identity's most recent one."""
+        identity, visit_date, start_time = visit
+        key = visit_identity_key(identity)
+        values = {"appointment_id": appointment_id, "date": visit_date, "start_time": start_time}
+
+        row, created = self.get_or_create(identity_key=key, defaults=values)
+        if created:
+            return
+
+        candidate = visit_sort_key(visit_date, start_time, appointment_id)
+        if candidate > visit_sort_key(row.date, row.start_time, row.appointment_id):
+            self.filter(pk=row.pk).update(**values)
+
+    def recompute(self, identity):
+        """Re-derive one identity's latest visit from the appointment table."""
+        key = visit_identity_key(identity)
+        latest = (
+            Appointment.objects
+            .filter(status=Appointment.STATUS_COMPLETED, visit_identity_key=key)
+            .order_by("-date", "-start_time", "-id")
+            .values("pk", "date", "start_time")
+            .first()
+        )
+
+        if latest is None:
+            self.filter(identity_key=key).delete()
+            return
+
+        self.update_or_create(
+            identity_key=key,
+            defaults={
+                "appointment_id": latest["pk"],
+                "date": latest["date"],
+                "start_time": latest["start_time"],
+            },
+        )
+
+    def rebuild(self):
+        """Recompute every identity's latest completed visit. Returns the row count."""
+        rows = {}
+        completed = (
+            Appointment.objects
+            .filter(status=Appointment.STATUS_COMPLETED)
+            .order_by("-date", "-start_time", "-id")
+            .only("pk", "name", "phone", "email", "status", "date", "start_time")
+        )
+        for appointment in completed.iterator(chunk_size=2000):
+            identity, visit_date, start_time = appointment.visit_state()
+            rows.setdefault(visit_identity_key(identity), self.model(
+                identity_key=visit_identity_key(identity),
+                appointment_id=appointment.pk,
+                date=visit_date,
+                start_time=start_time,
+            ))
+
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(rows.values(), batch_size=500)
+        return len(rows)
+
+
+class LatestCompletedVisit(models.Model):
+    """
+    Most recent completed appointment per patient identity (phone, email,
+    lower-cased name), so the dashboard's latest-patients widget is a
+    bounded index read. Maintained by Appointment.save/delete; rebuild with
+    `manage.py rebuild_latest_visits`.
+    """
+
+    identity_key = models.CharField(max_length=40, unique=True)
+    appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name="+")
+    date = models.DateField()
+    start_time = models.TimeField(null=True, blank=True)
+
+    objects = LatestCompletedVisitManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                F("date").desc(), F("start_time").desc(), F("appointment").desc(),
+                name="latest_visit_recency_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.appointment_id} on {self.date}"
+
+
+class PatientStatsManager(models.Manager):
+    def move(self, previous, current):
+        """
+        Move one appointment's contribution from the previous
+        (patient id, status, created_at, date) to the current one.
+        """
+        if previous == current:
+            return
+
+        if previous and current and previous[0] == current[0] and previous[2:] == current[2:]:
+            # A status change only shifts one count to another.
+            deltas = {}
+            for state, step in ((previous, -1), (current, 1)):
+                field = self.model.STATUS_COUNT_FIELDS.get(state[1])
+                if field:
+                    deltas[field] = deltas.get(field, 0) + step
+            updates = {field: F(field) + change for field, change in deltas.items() if change}
+            if updates and not self.filter(patient_id=current[0]).update(**updates):
+                self.refresh([current[0]])
+            return
+
+        if previous:
+            # first_seen/last_seen may have come from this appointment.
+            self.refresh([previous[0]])
+        if current and (not previous or current[0] != previous[0]):
+            self.add(current)
+
+    def add(self, state):
+        """Count one more appointment for the patient, creating their row if needed."""
+        patient_id, status, created_at, day = state
+        updates = {
+            "total_count": F("total_count") + 1,
+            "first_seen": Case(When(first_seen__lte=created_at, then=F("first_seen")), default=Value(created_at)),
+            "last_seen": Case(When(last_seen__gte=day, then=F("last_seen")), default=Value(day)),
+        }
+        values = {"total_count": 1, "first_seen": created_at, "last_seen": day}
+        field = self.model.STATUS_COUNT_FIELDS.get(status)
+        if field:
+            updates[field] = F(field) + 1
+            values[field] = 1
+
+        if self.filter(patient_id=patient_id).update(**updates):
+            return
+
+        try:
+            with transaction.atomic():
+                self.create(patient_id=patient_id, **values)
+        except IntegrityError:
+            # Another transaction created the row first.
+            self.filter(patient_id=patient_id).update(**updates)
+
+    def aggregate_rows(self, appointments):
+        """Unsaved rows computed from `appointments`, one per linked patient."""
+        counts = {
+            field: Count("pk", filter=Q(status=status))
+            for status, field in self.model.STATUS_COUNT_FIELDS.items()
+        }
+        totals = (
+            appointments
+            .filter(patient__isnull=False)
+            .values("patient_id")
+            .annotate(
+                first_seen=Min("created_at"),
+                last_seen=Max("date"),
+                total_count=Count("pk"),
+                **counts,
+            )
+            .order_by()
+        )
+        return [self.model(**row) for row in totals]
+
+    def refresh(self, patient_ids):
+        """Recompute the rows of the given patients from the appointment table."""
+        patient_ids = set(patient_ids)
+        if not patient_ids:
+            return
+        rows = self.aggregate_rows(Appointment.objects.filter(patient_id__in=patient_ids))
+        with transaction.atomic():
+            self.filter(patient_id__in=patient_ids).delete()
+            self.bulk_create(rows, batch_size=500)
+
+    def rebuild(self):
+        """Recompute every patient's row. Returns the row count."""
+        rows = self.aggregate_rows(Appointment.objects.all())
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(rows, batch_size=500)
+        return len(rows)
+
+
+class PatientStats(models.Model):
+    """
+    Per-patient appointment counters for the staff patient queue: when the
+    patient first booked, their latest appointment date and counts by
+    status. Maintained by Appointment.save/delete; rebuild with
+    `manage.py rebuild_patient_stats`.
+    """
+
+    STATUS_COUNT_FIELDS = AppointmentDailyRollup.STATUS_COUNT_FIELDS
+
+    patient = models.OneToOneField(
+        "patients.Patient",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    first_seen = models.DateTimeField(null=True, blank=True)
+    last_seen = models.DateField(null=True, blank=True)
+    total_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    confirmed_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+
+    objects = PatientStatsManager()
+
+    class Meta:
+        verbose_name_plural = "Patient stats"
+        indexes = [
+            models.Index(F("last_seen").desc(), name="patient_stats_last_seen_idx"),
+        ]
+
+    @property
+    def upcoming_count(self):
+        return self.pending_count + self.confirmed_count
+
+    @property
+    def adherence(self):
+        """Share of all appointments that were completed, as a percentage."""
+        return round(self.completed_count * 100.0 / self.total_count, 1) if self.total_count else 0
+
+    def __str__(self):
+        return f"{self.patient_id}: {self.total_count} appointment(s)"
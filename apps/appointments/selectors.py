@@ -0,0 +1,16 @@
+from apps.appointments.models import Appointment
+from apps.shared.search import filter_search, ranked_search
+
+
+def search_appointments(query, queryset=None, ranked=True):
+    """
+    Appointments whose name, phone or email contain every term of `query`,
+    served by the search index. Best matches come first unless `ranked` is
+    False, for callers that impose their own order (a keyset-paged list
+    would replace the relevance order anyway).
+    """
+    if queryset is None:
+        queryset = Appointment.objects.all()
+    if not ranked:
+        return filter_search(queryset, query)
+    return ranked_search(queryset, query)
@@ -0,0 +1,129 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.appointments.availability import get_next_available_slots
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment, SlotAvailability
+
+
+class SlotAvailabilityIndexTests(TestCase):
+    def next_weekday(self, weekday: int):
+        today = timezone.localdate()
+        days_ahead = (weekday - today.weekday()) % 7
+        if days_ahead == 0:
+            days_ahead = 7
+        return today + timedelta(days=days_ahead)
+
+    def next_open_date(self):
+        return self.next_weekday(2)  # Wednesday
+
+    def book(self, booking_date, start_time, status=Appointment.STATUS_PENDING, **extra):
+        return Appointment.objects.create(
+            name=extra.pop("name", "Index Patient"),
+            phone=extra.pop("phone", "09170000000"),
+            email=extra.pop("email", "index@test.com"),
+            date=booking_date,
+            start_time=start_time,
+            timeslot=start_time.strftime("%I:%M %p").lstrip("0"),
+            status=status,
+            services=[APPOINTMENT_SERVICES[0]],
+            **extra,
+        )
+
+    def mask_for(self, booking_date):
+        row = SlotAvailability.objects.filter(date=booking_date).first()
+        return row.booked_mask if row else 0
+
+    def test_booking_sets_slot_bit(self):
+        booking_date = self.next_open_date()
+        self.book(booking_date, time(9, 0))
+        self.book(booking_date, time(11, 0), status=Appointment.STATUS_CONFIRMED)
+
+        self.assertEqual(self.mask_for(booking_date), 0b101)
+
+    def test_cancel_and_complete_release_slot_bit(self):
+        booking_date = self.next_open_date()
+        first = self.book(booking_date, time(9, 0))
+        second = self.book(booking_date, time(10, 0), status=Appointment.STATUS_CONFIRMED)
+
+        first.status = Appointment.STATUS_CANCELLED
+        first.save(update_fields=["status"])
+        self.assertEqual(self.mask_for(booking_date), 0b10)
+
+        reloaded = Appointment.objects.get(pk=second.pk)
+        reloaded.status = Appointment.STATUS_COMPLETED
+        reloaded.save(update_fields=["status"])
+        self.assertEqual(self.mask_for(booking_date), 0)
+
+    def test_reschedule_moves_slot_bit(self):
+        booking_date = self.next_open_date()
+        appointment = self.book(booking_date, time(9, 0))
+
+        new_date = booking_date + timedelta(days=7)
+        appointment.date = new_date
+        appointment.start_time = time(17, 0)
+        appointment.save()
+
+        self.assertEqual(self.mask_for(booking_date), 0)
+        self.assertEqual(self.mask_for(new_date), 1 << 8)
+
+    def test_delete_and_off_hours_bookings(self):
+        booking_date = self.next_open_date()
+        appointment = self.book(booking_date, time(12, 0))
+        self.book(booking_date, time(3, 0), status=Appointment.STATUS_CONFIRMED)
+
+        appointment.delete()
+
+        self.assertEqual(self.mask_for(booking_date), 0)
+
+    def test_rebuild_command_matches_incremental_index(self):
+        booking_date = self.next_open_date()
+        self.book(booking_date, time(9, 0))
+        self.book(booking_date, time(13, 0), status=Appointment.STATUS_CONFIRMED)
+        self.book(booking_date, time(14, 0), status=Appointment.STATUS_CANCELLED)
+        expected = self.mask_for(booking_date)
+
+        SlotAvailability.objects.all().delete()
+        call_command("rebuild_slot_availability", stdout=StringIO())
+
+        self.assertEqual(self.mask_for(booking_date), expected)
+        self.assertEqual(expected, (1 << 0) | (1 << 4))
+
+    def test_next_available_slots_skip_booked_without_appointment_query(self):
+        booking_date = self.next_open_date()
+        self.book(booking_date, time(9, 0))
+        self.book(booking_date, time(10, 0))
+        start = timezone.make_aware(
+            datetime.combine(booking_date, time(8, 0)),
+            timezone.get_current_timezone(),
+        )
+
+        with patch("apps.appointments.availability.CLINIC_HOLIDAYS", {}):
+            with self.assertNumQueries(1):
+                suggestions = get_next_available_slots(start, limit=2)
+
+        self.assertEqual(
+            [(s["date_iso"], s["time_value"]) for s in suggestions],
+            [(booking_date.isoformat(), "11:00 AM"), (booking_date.isoformat(), "12:00 PM")],
+        )
+
+    def test_next_available_slots_respects_start_time_and_closed_days(self):
+        booking_date = self.next_open_date()
+        start = timezone.make_aware(
+            datetime.combine(booking_date, time(16, 30)),
+            timezone.get_current_timezone(),
+        )
+
+        with patch("apps.appointments.availability.CLINIC_HOLIDAYS", {}):
+            suggestions = get_next_available_slots(start, limit=2)
+
+        self.assertEqual(suggestions[0]["date_iso"], booking_date.isoformat())
+        self.assertEqual(suggestions[0]["time_value"], "5:00 PM")
+        # Thursday and Friday are closed, so the next slot is Saturday morning.
+        self.assertEqual(suggestions[1]["date_iso"], (booking_date + timedelta(days=3)).isoformat())
+        self.assertEqual(suggestions[1]["time_value"], "9:00 AM")
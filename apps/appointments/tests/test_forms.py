@@ -6,7 +6,7 @@ from django.test import TestCase
 from django.db import IntegrityError, transaction
 from apps.appointments.models import Appointment
 from apps.patients.models import Patient
-from apps.appointments.forms import AppointmentForm, StaffAppointmentForm
+from apps.appointments.forms import AppointmentForm, SlotUnavailableError, StaffAppointmentForm
 from apps.appointments.constants import APPOINTMENT_SERVICES
 
 class AppointmentFormTests(TestCase):
@@ -546,3 +546,124 @@ class AppointmentFormTests(TestCase):
             list(form.non_field_errors()),
         )
 
+
+    # Booking pipeline / database conflict test cases
+    def test_save_happy_path_query_budget(self):
+
+        service = APPOINTMENT_SERVICES[0]
+        booking_date = self.next_open_date()
+        patient = Patient.objects.create(name="Budget Patient", phone="09170000100", email="budget@test.com")
+        Appointment.objects.create(
+            patient=patient,
+            name=patient.name,
+            phone=patient.phone,
+            email=patient.email,
+            date=booking_date - timedelta(days=7),
+            start_time=time(9, 0),
+            timeslot="9:00 AM",
+            status=Appointment.STATUS_COMPLETED,
+            services=[service],
+        )
+        Appointment.objects.create(
+            name="Same Day",
+            phone="09170000101",
+            email="sameday@test.com",
+            date=booking_date,
+            start_time=time(9, 0),
+            timeslot="9:00 AM",
+            status=Appointment.STATUS_PENDING,
+            services=[service],
+        )
+
+        form = AppointmentForm(data={
+            "name": "Budget Patient",
+            "phone": "09170000100",
+            "email": "budget@test.com",
+            "appointment_date": booking_date,
+            "appointment_time": time(10, 0),
+            "services": [service],
+            "notes": "",
+        })
+        self.assertTrue(form.is_valid(), form.errors.as_text())
+
+        # 1. SAVEPOINT for form.save()'s atomic block (BEGIN outside a test)
+        # 2. SELECT the returning patient by phone/email key
+        # 3. SAVEPOINT around the optimistic insert; on a unique-slot
+        #    IntegrityError it keeps the transaction usable for slot_is_taken
+        # 4. UPDATE sqlite_sequence, a no-op that takes the write lock
+        # 5. SELECT the AUTOINCREMENT counter to reserve the id
+        # 6. INSERT the appointment with its code already set
+        # 7. UPDATE the day's slot bitmap
+        # 8. UPDATE the rollup row for the booked day (pending count)
+        # 9. UPDATE the rollup row for the day it was created (created count)
+        # 10. UPDATE the patient's stats row
+        # 11. RELEASE the insert savepoint
+        # 12. RELEASE the form savepoint (COMMIT outside a test)
+        with self.assertNumQueries(12) as ctx:
+            appt = form.save(status=Appointment.STATUS_PENDING)
+
+        self.assertEqual(appt.appointment_code, f"APT-{appt.pk:06d}")
+        appointment_writes = [
+            query["sql"] for query in ctx.captured_queries
+            if query["sql"].startswith(('INSERT INTO "website_appointment"', 'UPDATE "website_appointment"'))
+        ]
+        self.assertEqual(len(appointment_writes), 1)
+        self.assertTrue(appointment_writes[0].startswith("INSERT"))
+
+    def test_new_records_get_code_in_insert(self):
+        patient = Patient.objects.create(name="Code Patient", phone="09170000103")
+        appointment = Appointment.objects.create(
+            name="Code Patient",
+            phone="09170000103",
+            date=self.next_open_date(),
+            start_time=time(16, 0),
+            timeslot="4:00 PM",
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+        deleted_pk = patient.pk
+        patient.delete()
+        replacement = Patient.objects.create(name="Next Patient")
+
+        self.assertEqual(appointment.appointment_code, f"APT-{appointment.pk:06d}")
+        self.assertEqual(replacement.patient_code, f"PAT-{replacement.pk:06d}")
+        # AUTOINCREMENT/sequence semantics: a deleted row's id is never reused.
+        self.assertGreater(replacement.pk, deleted_pk)
+
+    def test_concurrent_booking_conflict_maps_to_booked(self):
+
+        service = APPOINTMENT_SERVICES[0]
+        booking_date = self.next_open_date()
+        form = AppointmentForm(data={
+            "name": "Racing Patient",
+            "phone": "09170000102",
+            "email": "racing@test.com",
+            "appointment_date": booking_date,
+            "appointment_time": time(15, 0),
+            "services": [service],
+            "notes": "",
+        })
+        self.assertTrue(form.is_valid(), form.errors.as_text())
+
+        # Another request books the slot between validation and save.
+        Appointment.objects.create(
+            name="Winner",
+            phone="09170000103",
+            email="winner@test.com",
+            date=booking_date,
+            start_time=time(15, 0),
+            timeslot="3:00 PM",
+            status=Appointment.STATUS_PENDING,
+            services=[service],
+        )
+
+        with self.assertRaises(SlotUnavailableError):
+            form.save(status=Appointment.STATUS_PENDING)
+
+        self.assertEqual(form.unavailable_reason, "booked")
+        self.assertEqual(form.unavailable_time, time(15, 0))
+        self.assertTrue(
+            any("already booked" in err.lower() for err in form.non_field_errors()),
+            list(form.non_field_errors()),
+        )
+        self.assertFalse(Patient.objects.filter(phone="09170000102").exists())
+        self.assertEqual(Appointment.objects.filter(date=booking_date).count(), 1)
@@ -0,0 +1,77 @@
+from datetime import time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment, LatestCompletedVisit
+
+
+class LatestCompletedVisitTests(TestCase):
+    def book(self, days_ago, hour, name="Visit Patient", phone="09170000000", status=Appointment.STATUS_COMPLETED):
+        return Appointment.objects.create(
+            name=name,
+            phone=phone,
+            email="visit@test.com",
+            date=timezone.localdate() - timedelta(days=days_ago),
+            start_time=time(hour, 0),
+            timeslot=f"{hour}:00",
+            status=status,
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+
+    def latest(self):
+        return sorted(LatestCompletedVisit.objects.values_list("appointment_id", flat=True))
+
+    def test_keeps_most_recent_completed_visit_per_identity(self):
+        older = self.book(10, 9)
+        newer = self.book(3, 9, name="  visit PATIENT ")
+        other = self.book(5, 9, name="Someone Else", phone="09170000001")
+        self.book(1, 9, status=Appointment.STATUS_CANCELLED)
+
+        self.assertEqual(self.latest(), sorted([newer.pk, other.pk]))
+
+        newer.status = Appointment.STATUS_CANCELLED
+        newer.save(update_fields=["status"])
+        self.assertEqual(self.latest(), sorted([older.pk, other.pk]))
+
+        Appointment.objects.get(pk=older.pk).delete()
+        self.assertEqual(self.latest(), [other.pk])
+
+        pending = self.book(0, 10, status=Appointment.STATUS_PENDING)
+        pending.status = Appointment.STATUS_COMPLETED
+        pending.save()
+        self.assertEqual(self.latest(), sorted([other.pk, pending.pk]))
+
+    def test_rebuild_command_matches_incremental_rows(self):
+        self.book(10, 9)
+        self.book(3, 9)
+        self.book(3, 11, phone="09170000002")
+        moved = self.book(2, 9, name="Mover", phone="09170000003")
+        moved.name = "Renamed"
+        moved.save()
+        expected = self.latest()
+
+        LatestCompletedVisit.objects.all().delete()
+        call_command("rebuild_latest_visits", stdout=StringIO())
+
+        self.assertEqual(self.latest(), expected)
+
+    def test_identity_survives_names_sql_would_normalize_differently(self):
+        # SQLite's LOWER folds ASCII only and TRIM strips spaces only.
+        older = self.book(10, 9, name="JOSÉ PEÑA\t")
+        newer = self.book(3, 9, name="\njosé peña")
+        self.assertEqual(self.latest(), [newer.pk])
+
+        newer.status = Appointment.STATUS_CANCELLED
+        newer.save(update_fields=["status"])
+        self.assertEqual(self.latest(), [older.pk])
+
+        older.name = "Someone Else"
+        older.save(update_fields=["name"])
+        self.assertEqual(self.latest(), [older.pk])
+        self.assertEqual(
+            Appointment.objects.filter(visit_identity_key=older.visit_identity_key).get(), older,
+        )
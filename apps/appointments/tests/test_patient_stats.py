@@ -0,0 +1,124 @@
+from datetime import time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment, PatientStats
+from apps.patients.models import Patient
+
+
+class PatientStatsTests(TestCase):
+    def setUp(self):
+        self.patient = Patient.objects.create(name="Stats Patient", phone="09170000000")
+        self.other = Patient.objects.create(name="Other Patient", phone="09170000001")
+
+    def book(self, days_ahead, status=Appointment.STATUS_PENDING, patient=None, hour=9):
+        patient = patient or self.patient
+        return Appointment.objects.create(
+            patient=patient,
+            name=patient.name,
+            phone=patient.phone,
+            date=timezone.localdate() + timedelta(days=days_ahead),
+            start_time=time(hour, 0),
+            timeslot=f"{hour}:00",
+            status=status,
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+
+    def snapshot(self):
+        return {
+            row.pk: (
+                row.first_seen, row.last_seen, row.total_count, row.pending_count,
+                row.confirmed_count, row.cancelled_count, row.completed_count,
+            )
+            for row in PatientStats.objects.all()
+        }
+
+    def assert_matches_rebuild(self):
+        incremental = self.snapshot()
+        PatientStats.objects.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_counts_follow_creates_and_status_changes(self):
+        first = self.book(-10, Appointment.STATUS_COMPLETED)
+        second = self.book(3)
+        self.book(5, Appointment.STATUS_CONFIRMED)
+
+        second.status = Appointment.STATUS_CANCELLED
+        second.save(update_fields=["status"])
+
+        stats = PatientStats.objects.get(patient=self.patient)
+        self.assertEqual(stats.total_count, 3)
+        self.assertEqual(
+            (stats.pending_count, stats.confirmed_count, stats.cancelled_count, stats.completed_count),
+            (0, 1, 1, 1),
+        )
+        self.assertEqual(stats.first_seen, first.created_at)
+        self.assertEqual(stats.last_seen, timezone.localdate() + timedelta(days=5))
+        self.assertEqual(stats.upcoming_count, 1)
+        self.assertEqual(stats.adherence, 33.3)
+        self.assert_matches_rebuild()
+
+    def test_reschedule_reassign_and_delete_recompute_extremes(self):
+        self.book(-10, Appointment.STATUS_COMPLETED)
+        latest = self.book(20, hour=10)
+        self.book(2, patient=self.other)
+
+        latest.date = timezone.localdate() + timedelta(days=1)
+        latest.save()
+        self.assertEqual(
+            PatientStats.objects.get(patient=self.patient).last_seen,
+            timezone.localdate() + timedelta(days=1),
+        )
+        self.assert_matches_rebuild()
+
+        latest = Appointment.objects.get(pk=latest.pk)
+        latest.patient = self.other
+        latest.save(update_fields=["patient"])
+        self.assertEqual(PatientStats.objects.get(patient=self.patient).total_count, 1)
+        self.assertEqual(PatientStats.objects.get(patient=self.other).total_count, 2)
+        self.assert_matches_rebuild()
+
+        for appointment in Appointment.objects.filter(patient=self.patient):
+            appointment.delete()
+        self.assertFalse(PatientStats.objects.filter(patient=self.patient).exists())
+        self.assert_matches_rebuild()
+
+    def test_unlinked_appointments_and_deleted_patients(self):
+        Appointment.objects.create(
+            name="Walk In",
+            phone="09170000009",
+            date=timezone.localdate(),
+            start_time=time(9, 0),
+            timeslot="9:00 AM",
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+        self.assertFalse(PatientStats.objects.exists())
+
+        self.book(1, patient=self.other)
+        self.other.delete()
+        self.assertFalse(PatientStats.objects.exists())
+
+    def test_rebuild_command_and_patient_linking(self):
+        walk_in = Appointment.objects.create(
+            name="Stats Patient",
+            phone="09170000000",
+            date=timezone.localdate() + timedelta(days=4),
+            start_time=time(11, 0),
+            timeslot="11:00 AM",
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+        self.book(1)
+
+        call_command("link_appointment_patients", stdout=StringIO())
+        stats = PatientStats.objects.get(patient=self.patient)
+        self.assertEqual(stats.total_count, 2)
+        self.assertEqual(stats.last_seen, walk_in.date)
+
+        expected = self.snapshot()
+        PatientStats.objects.all().delete()
+        call_command("rebuild_patient_stats", stdout=StringIO())
+        self.assertEqual(self.snapshot(), expected)
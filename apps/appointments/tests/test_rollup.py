@@ -0,0 +1,75 @@
+from datetime import time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment, AppointmentDailyRollup
+
+
+class AppointmentDailyRollupTests(TestCase):
+    def book(self, booking_date, hour, status=Appointment.STATUS_PENDING):
+        return Appointment.objects.create(
+            name="Rollup Patient",
+            phone="09170000000",
+            email="rollup@test.com",
+            date=booking_date,
+            start_time=time(hour, 0),
+            timeslot=f"{hour}:00",
+            status=status,
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+
+    def counts(self):
+        return {
+            row.date: (
+                row.pending_count,
+                row.confirmed_count,
+                row.cancelled_count,
+                row.completed_count,
+                row.created_count,
+            )
+            for row in AppointmentDailyRollup.objects.all()
+            if row.scheduled_count or row.created_count
+        }
+
+    def test_rollup_follows_create_status_change_reschedule_and_delete(self):
+        today = timezone.localdate()
+        day = today + timedelta(days=10)
+
+        first = self.book(day, 9)
+        second = self.book(day, 10, status=Appointment.STATUS_CONFIRMED)
+        self.assertEqual(self.counts(), {day: (1, 1, 0, 0, 0), today: (0, 0, 0, 0, 2)})
+
+        first.status = Appointment.STATUS_CANCELLED
+        first.save(update_fields=["status"])
+        reloaded = Appointment.objects.get(pk=second.pk)
+        reloaded.date = day + timedelta(days=1)
+        reloaded.save()
+        self.assertEqual(self.counts(), {
+            day: (0, 0, 1, 0, 0),
+            day + timedelta(days=1): (0, 1, 0, 0, 0),
+            today: (0, 0, 0, 0, 2),
+        })
+
+        Appointment.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.counts(), {
+            day + timedelta(days=1): (0, 1, 0, 0, 0),
+            today: (0, 0, 0, 0, 1),
+        })
+
+    def test_rebuild_command_matches_incremental_rollup(self):
+        today = timezone.localdate()
+        self.book(today, 9, status=Appointment.STATUS_COMPLETED)
+        self.book(today - timedelta(days=3), 9, status=Appointment.STATUS_CANCELLED)
+        moved = self.book(today + timedelta(days=2), 9)
+        moved.date = today + timedelta(days=4)
+        moved.save()
+        expected = self.counts()
+
+        AppointmentDailyRollup.objects.all().delete()
+        call_command("rebuild_appointment_rollup", stdout=StringIO())
+
+        self.assertEqual(self.counts(), expected)
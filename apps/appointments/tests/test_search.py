@@ -0,0 +1,51 @@
+from datetime import time, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment
+from apps.appointments.selectors import search_appointments
+
+
+class AppointmentSearchTests(TestCase):
+    def book(self, name, phone, email, hour):
+        return Appointment.objects.create(
+            name=name,
+            phone=phone,
+            email=email,
+            date=timezone.localdate() + timedelta(days=3),
+            start_time=time(hour, 0),
+            timeslot=f"{hour}:00",
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+
+    def test_ranked_search_prefers_name_prefix_matches(self):
+        self.book("Mariana Lopez", "09170000001", "mariana@test.com", 9)
+        self.book("Ana Lopez", "09170000002", "ana@test.com", 10)
+        self.book("Carlos Diaz", "09170000003", "carlos@test.com", 11)
+
+        self.assertEqual(
+            [appointment.name for appointment in search_appointments("ana")],
+            ["Ana Lopez", "Mariana Lopez"],
+        )
+        self.assertEqual(
+            [appointment.name for appointment in search_appointments("0000003")],
+            ["Carlos Diaz"],
+        )
+
+    def test_unranked_search_keeps_the_callers_order(self):
+        self.book("Mariana Lopez", "09170000001", "mariana@test.com", 9)
+        self.book("Ana Lopez", "09170000002", "ana@test.com", 10)
+
+        self.assertEqual(
+            [a.name for a in search_appointments("ana", Appointment.objects.order_by("start_time"), ranked=False)],
+            ["Mariana Lopez", "Ana Lopez"],
+        )
+
+    def test_status_updates_keep_document(self):
+        appointment = self.book("Status Only", "09170000004", "", 12)
+        appointment.status = Appointment.STATUS_CONFIRMED
+        appointment.save(update_fields=["status"])
+
+        self.assertEqual(list(search_appointments("status only")), [appointment])
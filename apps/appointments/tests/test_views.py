@@ -1,5 +1,7 @@
-from datetime import timedelta
+from datetime import time, timedelta
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
@@ -80,3 +82,125 @@ class AppointmentViewSmokeTests(TestCase):
         appointment = Appointment.objects.get(email="smoke@test.com")
         self.assertEqual(appointment.status, Appointment.STATUS_PENDING)
         self.assertTrue(appointment.appointment_code)
+
+
+class AppointmentAvailabilityApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def next_weekday(self, weekday: int):
+        today = timezone.localdate()
+        days_ahead = (weekday - today.weekday()) % 7
+        if days_ahead == 0:
+            days_ahead = 7
+        return today + timedelta(days=days_ahead)
+
+    def book(self, booking_date, start_time, status=Appointment.STATUS_PENDING):
+        return Appointment.objects.create(
+            name="Calendar Patient",
+            phone="09170000222",
+            email="calendar@test.com",
+            date=booking_date,
+            start_time=start_time,
+            timeslot=start_time.strftime("%I:%M %p").lstrip("0"),
+            services=[APPOINTMENT_SERVICES[0]],
+            status=status,
+        )
+
+    def get_month(self, booking_date):
+        return self.client.get(
+            reverse("appointment_availability"),
+            {"month": booking_date.strftime("%Y-%m")},
+        )
+
+    def test_month_payload_marks_booked_slots(self):
+        booking_date = self.next_weekday(2)  # Wednesday
+        self.book(booking_date, time(10, 0))
+
+        with patch("apps.appointments.availability.CLINIC_HOLIDAYS", {}):
+            response = self.get_month(booking_date)
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["month"], booking_date.strftime("%Y-%m"))
+        self.assertEqual(payload["slot_labels"][0], "9:00 AM")
+        self.assertEqual(payload["days"][booking_date.isoformat()], "101111111")
+        closed_day = booking_date + timedelta(days=1)  # Thursday
+        self.assertNotIn(closed_day.isoformat(), payload["days"])
+
+    def test_month_is_served_from_cache_and_invalidated_on_status_change(self):
+        booking_date = self.next_weekday(2)  # Wednesday
+        appointment = self.book(booking_date, time(9, 0))
+
+        with patch("apps.appointments.availability.CLINIC_HOLIDAYS", {}):
+            self.get_month(booking_date)
+            with self.assertNumQueries(0):
+                cached = self.get_month(booking_date).json()
+            self.assertEqual(cached["days"][booking_date.isoformat()][0], "0")
+
+            appointment.status = Appointment.STATUS_CANCELLED
+            appointment.save(update_fields=["status"])
+
+            refreshed = self.get_month(booking_date).json()
+
+        self.assertEqual(refreshed["days"][booking_date.isoformat()][0], "1")
+
+    def test_invalid_and_out_of_window_months_are_rejected(self):
+        response = self.client.get(reverse("appointment_availability"), {"month": "soon"})
+        self.assertEqual(response.status_code, 400)
+
+        past_month = timezone.localdate().replace(day=1) - timedelta(days=1)
+        response = self.get_month(past_month)
+        self.assertEqual(response.status_code, 400)
+
+    def test_booking_page_exposes_availability_url(self):
+        response = self.client.get(reverse("appointment_form"))
+        self.assertContains(response, reverse("appointment_availability"))
+
+
+class AppointmentBookingConflictTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def next_weekday(self, weekday: int):
+        today = timezone.localdate()
+        days_ahead = (weekday - today.weekday()) % 7
+        if days_ahead == 0:
+            days_ahead = 7
+        return today + timedelta(days=days_ahead)
+
+    def test_slot_taken_after_validation_shows_booked_dialog(self):
+        booking_date = self.next_weekday(2)  # Wednesday
+        Appointment.objects.create(
+            name="Winner",
+            phone="09170000301",
+            email="winner@test.com",
+            date=booking_date,
+            start_time=time(10, 0),
+            timeslot="10:00 AM",
+            services=[APPOINTMENT_SERVICES[0]],
+            status=Appointment.STATUS_PENDING,
+        )
+
+        # Validation sees a free slot, as if the competing insert had not
+        # committed yet; the constraint then rejects the insert.
+        with patch(
+            "apps.appointments.forms.BaseAppointmentForm.slot_is_taken",
+            side_effect=[False, True],
+        ):
+            response = self.client.post(
+                reverse("appointment_form"),
+                {
+                    "name": "Loser",
+                    "phone": "09170000302",
+                    "email": "loser@test.com",
+                    "appointment_date": booking_date.isoformat(),
+                    "appointment_time": "10:00",
+                    "services": [APPOINTMENT_SERVICES[0]],
+                    "notes": "",
+                },
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["error_dialog"]["subtitle"], "This appointment slot is already booked.")
+        self.assertFalse(Appointment.objects.filter(email="loser@test.com").exists())
@@ -4,4 +4,5 @@ from . import views
 urlpatterns = [
     path("appointment/", views.appointment_form, name="appointment_form"),
     path("appointment/status/", views.appointment_status, name="appointment_status"),
+    path("appointment/availability/", views.appointment_availability, name="appointment_availability"),
 ]
@@ -1,70 +1,27 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.http import JsonResponse
 from django.urls import reverse
 from django.utils import timezone
+from django.views.decorators.http import require_GET
 from datetime import datetime, timedelta
 from .constants import (
-    CLINIC_HOLIDAYS,
+    AVAILABILITY_MONTHS_AHEAD,
     CLINIC_OPEN_WEEKDAYS,
-    CLINIC_SLOT_TIMES,
     SAME_DAY_BOOKING_CUTOFF_HOURS,
 )
 from apps.appointments.models import Appointment
-from .forms import AppointmentForm
+from .availability import SLOT_LABELS, get_next_available_slots, month_availability
+from .forms import AppointmentForm, SlotUnavailableError
 
 def clinic_schedule_for_js():
     return {
         "open_weekdays_js": sorted((day + 1) % 7 for day in CLINIC_OPEN_WEEKDAYS),
-        "slot_labels": [slot.strftime("%I:%M %p").lstrip("0") for slot in CLINIC_SLOT_TIMES],
+        "slot_labels": SLOT_LABELS,
+        "availability_url": reverse("appointment_availability"),
     }
 
 
-def get_next_available_slots(start_dt, limit=3, search_days=21):
-    tz = timezone.get_current_timezone()
-    now_cutoff = timezone.now() + timedelta(hours=SAME_DAY_BOOKING_CUTOFF_HOURS)
-    earliest_dt = max(start_dt, now_cutoff)
-    start_date = earliest_dt.date()
-    end_date = start_date + timedelta(days=search_days)
-
-    booked_slots = set(
-        Appointment.objects.filter(
-            date__gte=start_date,
-            date__lte=end_date,
-            status__in=[Appointment.STATUS_PENDING, Appointment.STATUS_CONFIRMED],
-        ).values_list("date", "start_time")
-    )
-
-    suggestions = []
-    for offset in range(search_days + 1):
-        candidate_date = start_date + timedelta(days=offset)
-
-        if candidate_date.weekday() not in CLINIC_OPEN_WEEKDAYS:
-            continue
-        if candidate_date in CLINIC_HOLIDAYS:
-            continue
-
-        for slot_time in CLINIC_SLOT_TIMES:
-            candidate_dt = timezone.make_aware(
-                datetime.combine(candidate_date, slot_time),
-                tz,
-            )
-            if candidate_dt < earliest_dt:
-                continue
-            if (candidate_date, slot_time) in booked_slots:
-                continue
-
-            suggestions.append({
-                "date_iso": candidate_date.isoformat(),
-                "time_value": slot_time.strftime("%I:%M %p").lstrip("0"),
-                "date_label": candidate_date.strftime("%B %d, %Y"),
-                "time_label": slot_time.strftime("%I:%M %p").lstrip("0"),
-            })
-            if len(suggestions) >= limit:
-                return suggestions
-
-    return suggestions
-
-
 def build_appointment_error_dialog(form):
     reason = getattr(form, "unavailable_reason", "")
     requested_date = getattr(form, "unavailable_date", None)
@@ -110,12 +67,16 @@ def appointment_form(request):
     if request.method == "POST":
         form = AppointmentForm(request.POST)
         if form.is_valid():
-            appointment = form.save(status=Appointment.STATUS_PENDING)
-            request.session["appointment_success_dialog"] = {
-                "appointment_code": appointment.appointment_code,
-                "tracking_url": f"{reverse('appointment_status')}?code={appointment.appointment_code}",
-            }
-            return redirect(f"{reverse('appointment_form')}#appointment-form-section")
+            try:
+                appointment = form.save(status=Appointment.STATUS_PENDING)
+            except SlotUnavailableError:
+                error_dialog = build_appointment_error_dialog(form)
+            else:
+                request.session["appointment_success_dialog"] = {
+                    "appointment_code": appointment.appointment_code,
+                    "tracking_url": f"{reverse('appointment_status')}?code={appointment.appointment_code}",
+                }
+                return redirect(f"{reverse('appointment_form')}#appointment-form-section")
         else:
             error_dialog = build_appointment_error_dialog(form)
     else:
@@ -144,3 +105,23 @@ def appointment_status(request):
         "appointment": appointment,
         "lookup_error": lookup_error,
     })
+
+
+@require_GET
+def appointment_availability(request):
+    today = timezone.localdate()
+    month_param = (request.GET.get("month") or "").strip()
+
+    if month_param:
+        try:
+            month_start = datetime.strptime(month_param, "%Y-%m").date()
+        except ValueError:
+            return JsonResponse({"error": "Use month=YYYY-MM."}, status=400)
+    else:
+        month_start = today.replace(day=1)
+
+    months_ahead = (month_start.year - today.year) * 12 + (month_start.month - today.month)
+    if not 0 <= months_ahead <= AVAILABILITY_MONTHS_AHEAD:
+        return JsonResponse({"error": "That month is outside the booking window."}, status=400)
+
+    return JsonResponse(month_availability(month_start.year, month_start.month))
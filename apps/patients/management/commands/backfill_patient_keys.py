@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.patients.services import backfill_patient_contact_keys
+
+
+class Command(BaseCommand):
+    help = "Recompute the normalized name, phone and email keys used for patient matching."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = backfill_patient_contact_keys(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Updated contact keys for {updated} patient(s)."))
@@ -0,0 +1,38 @@
+import re
+
+from django.db import migrations
+
+from apps.shared.sequences import advance_id_sequence
+
+CODE_PATTERN = re.compile(r"^PAT-(\d+)$")
+
+
+def backfill_patient_codes(apps, schema_editor):
+    Patient = apps.get_model("patients", "Patient")
+
+    missing = list(Patient.objects.filter(patient_code__isnull=True).only("pk"))
+    for row in missing:
+        row.patient_code = f"PAT-{row.pk:06d}"
+    Patient.objects.bulk_update(missing, ["patient_code"], batch_size=500)
+
+    # New rows take their code from a reserved pk, so the id counter must
+    # move past every code already issued.
+    highest = 0
+    for code in Patient.objects.values_list("patient_code", flat=True).iterator():
+        match = CODE_PATTERN.match(code or "")
+        if match:
+            highest = max(highest, int(match.group(1)))
+
+    if highest:
+        advance_id_sequence(schema_editor, Patient._meta.db_table, Patient._meta.pk.column, highest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0002_patientdocument"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_patient_codes, migrations.RunPython.noop),
+    ]
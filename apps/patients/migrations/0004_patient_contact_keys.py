@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-17 13:03
+
+from django.db import migrations, models
+
+from apps.patients.normalization import email_key, name_key, phone_key
+
+
+def backfill_contact_keys(apps, schema_editor):
+    Patient = apps.get_model("patients", "Patient")
+
+    batch = []
+    for patient in Patient.objects.only("pk", "name", "phone", "email").iterator(chunk_size=500):
+        patient.name_key = name_key(patient.name)
+        patient.phone_key = phone_key(patient.phone)
+        patient.email_key = email_key(patient.email)
+        batch.append(patient)
+        if len(batch) >= 500:
+            Patient.objects.bulk_update(batch, ["name_key", "phone_key", "email_key"])
+            batch = []
+
+    if batch:
+        Patient.objects.bulk_update(batch, ["name_key", "phone_key", "email_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0003_backfill_patient_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='email_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='name_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=120),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='phone_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['name_key'], name='website_pat_name_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['phone_key'], name='website_pat_phone_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['email_key'], name='website_pat_email_key_idx'),
+        ),
+        migrations.RunPython(backfill_contact_keys, migrations.RunPython.noop),
+    ]
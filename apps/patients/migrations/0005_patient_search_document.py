@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+from apps.shared.search import build_search_document, create_search_index, drop_search_index
+
+
+def backfill_search_documents(apps, schema_editor):
+    Patient = apps.get_model("patients", "Patient")
+
+    batch = []
+    for patient in Patient.objects.only("pk", "name", "phone", "phone_key", "email").iterator(chunk_size=500):
+        patient.search_document = build_search_document(patient.name, patient.phone, patient.phone_key, patient.email)
+        batch.append(patient)
+        if len(batch) >= 500:
+            Patient.objects.bulk_update(batch, ["search_document"])
+            batch = []
+
+    if batch:
+        Patient.objects.bulk_update(batch, ["search_document"])
+
+
+def create_index(apps, schema_editor):
+    create_search_index(schema_editor.connection, "website_patient")
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection, "website_patient")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0004_patient_contact_keys"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="search_document",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_index, drop_index),
+    ]
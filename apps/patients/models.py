@@ -1,6 +1,11 @@
 from pathlib import Path
 
-from django.db import models
+from django.db import models, router, transaction
+
+from apps.shared.search import build_search_document
+from apps.shared.sequences import reserve_pk
+
+from . import normalization
 
 
 def patient_document_upload_to(instance, filename):
@@ -22,23 +27,74 @@ class Patient(models.Model):
         db_index=True,
     )
 
+    # Normalized copies of the contact fields, used for matching.
+    name_key = models.CharField(max_length=120, blank=True, default="", editable=False)
+    phone_key = models.CharField(max_length=40, blank=True, default="", editable=False)
+    email_key = models.CharField(max_length=254, blank=True, default="", editable=False)
+    # Name, phone and email in one string; indexed for substring search
+    # (see apps.shared.search).
+    search_document = models.TextField(blank=True, default="", editable=False)
+
+    CONTACT_KEY_SOURCES = {
+        "name_key": ("name", normalization.name_key),
+        "phone_key": ("phone", normalization.phone_key),
+        "email_key": ("email", normalization.email_key),
+    }
+
     class Meta:
         ordering = ["name"]
         indexes = [
             models.Index(fields=["name"], name="website_pat_name_d318b7_idx"),
             models.Index(fields=["phone"], name="website_pat_phone_6e57b7_idx"),
             models.Index(fields=["email"], name="website_pat_email_148a3f_idx"),
+            models.Index(fields=["name_key"], name="website_pat_name_key_idx"),
+            models.Index(fields=["phone_key"], name="website_pat_phone_key_idx"),
+            models.Index(fields=["email_key"], name="website_pat_email_key_idx"),
         ]
         db_table = "website_patient"
 
+    def refresh_contact_keys(self):
+        """
+        Recompute the normalized keys and the search document; returns the
+        names of the fields that changed.
+        """
+        changed = []
+        for key_field, (source_field, normalize) in self.CONTACT_KEY_SOURCES.items():
+            value = normalize(getattr(self, source_field))
+            if getattr(self, key_field) != value:
+                setattr(self, key_field, value)
+                changed.append(key_field)
+
+        if self.refresh_search_document():
+            changed.append("search_document")
+        return changed
+
+    def refresh_search_document(self):
+        """Recompute search_document from the current keys; returns True when it changed."""
+        document = build_search_document(self.name, self.phone, self.phone_key, self.email)
+        if self.search_document == document:
+            return False
+        self.search_document = document
+        return True
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        using = kwargs.get("using") or router.db_for_write(Patient, instance=self)
+
+        changed_keys = self.refresh_contact_keys()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and changed_keys:
+            kwargs["update_fields"] = set(update_fields) | set(changed_keys)
+
+        with transaction.atomic(using=using, savepoint=False):
+            if not self.patient_code and reserve_pk(self, kwargs):
+                self.patient_code = f"PAT-{self.pk:06d}"
 
-        if self.patient_code:
-            return
+            super().save(*args, **kwargs)
 
-        self.patient_code = f"PAT-{self.pk:06d}"
-        super().save(update_fields=["patient_code"])
+            if not self.patient_code:
+                # Backends without id reservation, and legacy rows missing a code.
+                self.patient_code = f"PAT-{self.pk:06d}"
+                super().save(update_fields=["patient_code"])
 
     def __str__(self):
         contact = self.phone or self.email or "no contact"
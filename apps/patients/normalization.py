@@ -0,0 +1,27 @@
+import re
+
+# The clinic is in the Philippines: local numbers are written 09XXXXXXXXX
+# (trunk prefix 0) or 9XXXXXXXXX, internationally +63 9XXXXXXXXX.
+DEFAULT_COUNTRY_CODE = "63"
+NATIONAL_NUMBER_LENGTH = 10
+
+
+def phone_key(phone):
+    """Digits-only, E.164-style phone key without the leading '+'."""
+    digits = re.sub(r"\D", "", phone or "")
+    if digits.startswith("00"):
+        digits = digits[2:]
+
+    if len(digits) == NATIONAL_NUMBER_LENGTH + 1 and digits.startswith("0"):
+        return DEFAULT_COUNTRY_CODE + digits[1:]
+    if len(digits) == NATIONAL_NUMBER_LENGTH and digits.startswith("9"):
+        return DEFAULT_COUNTRY_CODE + digits
+    return digits
+
+
+def email_key(email):
+    return (email or "").strip().lower()
+
+
+def name_key(name):
+    return " ".join((name or "").split()).casefold()
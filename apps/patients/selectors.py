@@ -1,22 +1,218 @@
-from apps.patients.models import Patient
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import BooleanField, Case, F, Prefetch, Q, Value, When, Window, prefetch_related_objects
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from apps.patients.models import Patient, PatientDocument
+from apps.shared.search import filter_search, ranked_search
+
+from .normalization import email_key, phone_key
+
+# Keeps each IN (...) list well under SQLite's bound-parameter limit.
+LOOKUP_BATCH_SIZE = 400
+
+PROFILE_UPCOMING_LIMIT = 6
+PROFILE_HISTORY_LIMIT = 8
 
 
 def find_matching_patient(*, name="", phone="", email=""):
-    if phone:
-        patient = Patient.objects.filter(phone=phone).first()
-        if patient:
-            return patient
+    """
+    Return the patient sharing this phone, else this email, in one query.
+    Phones and emails compare by their normalized keys, so formatting and
+    case differences still match. `name` is accepted for call-site symmetry;
+    a name+phone+email match is always also a phone match.
+    """
+    phone, email = phone_key(phone), email_key(email)
 
+    lookup = Q()
+    if phone:
+        lookup |= Q(phone_key=phone)
     if email:
-        patient = Patient.objects.filter(email=email).first()
-        if patient:
-            return patient
-
-    if name and phone and email:
-        return Patient.objects.filter(
-            name__iexact=name,
-            phone=phone,
-            email=email,
-        ).first()
-
-    return None
+        lookup |= Q(email_key=email)
+
+    if not lookup:
+        return None
+
+    return PatientMatcher(Patient.objects.filter(lookup)).match(phone=phone, email=email)
+
+
+class PatientMatcher:
+    """
+    In-memory phone and email maps over a set of patients, applying the same
+    phone-then-email rule as `find_matching_patient`. Patients can be added or
+    re-indexed as a batch changes them; keep their contact keys current.
+    """
+
+    def __init__(self, patients=()):
+        self.by_phone = {}
+        self.by_email = {}
+        for patient in patients:
+            self.add(patient)
+
+    def add(self, patient):
+        if patient.phone_key:
+            self.by_phone.setdefault(patient.phone_key, []).append(patient)
+        if patient.email_key:
+            self.by_email.setdefault(patient.email_key, []).append(patient)
+
+    def remove(self, patient):
+        for index, key in ((self.by_phone, patient.phone_key), (self.by_email, patient.email_key)):
+            bucket = index.get(key)
+            if bucket and patient in bucket:
+                bucket.remove(patient)
+
+    def match(self, *, phone="", email=""):
+        phone, email = phone_key(phone), email_key(email)
+        # Ties resolve like Patient's default ordering.
+        if phone and self.by_phone.get(phone):
+            return min(self.by_phone[phone], key=lambda patient: patient.name)
+        if email and self.by_email.get(email):
+            return min(self.by_email[email], key=lambda patient: patient.name)
+        return None
+
+
+def patients_sharing_contacts(records):
+    """
+    Every patient whose phone or email appears in `records`, an iterable of
+    (name, phone, email) tuples. Issues one query per LOOKUP_BATCH_SIZE
+    distinct values.
+    """
+    phones = sorted({phone_key(phone) for _, phone, _ in records} - {""})
+    emails = sorted({email_key(email) for _, _, email in records} - {""})
+
+    patients = {}
+    for key_field, values in (("phone_key", phones), ("email_key", emails)):
+        for start in range(0, len(values), LOOKUP_BATCH_SIZE):
+            batch = values[start:start + LOOKUP_BATCH_SIZE]
+            for patient in Patient.objects.filter(**{f"{key_field}__in": batch}):
+                patients.setdefault(patient.pk, patient)
+
+    return list(patients.values())
+
+
+def find_matching_patients(records):
+    """
+    Batch form of `find_matching_patient`: one match (or None) per
+    (name, phone, email) tuple, in input order.
+    """
+    records = list(records)
+    matcher = PatientMatcher(patients_sharing_contacts(records))
+    return [matcher.match(phone=phone, email=email) for _, phone, email in records]
+
+
+def search_patients(query, queryset=None, ranked=True):
+    """
+    Patients whose name, phone or email contain every term of `query`,
+    served by the search index. Best matches come first unless `ranked` is
+    False, for callers that impose their own order (a keyset-paged list
+    would replace the relevance order anyway).
+    """
+    if queryset is None:
+        queryset = Patient.objects.all()
+    if not ranked:
+        return filter_search(queryset, query)
+    return ranked_search(queryset, query)
+
+
+@dataclass
+class PatientProfile:
+    patient: Optional[Patient]
+    upcoming: List = field(default_factory=list)
+    history: List = field(default_factory=list)
+    insurance_document: Optional[PatientDocument] = None
+    documents: List[PatientDocument] = field(default_factory=list)
+    stats: Optional[object] = None
+
+    @property
+    def quick_stats(self):
+        if self.stats is None:
+            return {"total": 0, "completed": 0, "upcoming": 0, "cancelled": 0, "adherence": 0}
+        return {
+            "total": self.stats.total_count,
+            "completed": self.stats.completed_count,
+            "upcoming": self.stats.upcoming_count,
+            "cancelled": self.stats.cancelled_count,
+            "adherence": self.stats.adherence,
+        }
+
+
+def profile_appointments(today, upcoming_limit=PROFILE_UPCOMING_LIMIT, history_limit=PROFILE_HISTORY_LIMIT):
+    """
+    Appointments for the profile panel in one bounded query: the next
+    `upcoming_limit` active appointments from `today`, and the latest
+    `history_limit` appointments of any status, ranked with window functions.
+    """
+    # Patients sit below appointments, so reach the model through the relation.
+    Appointment = Patient.appointments.field.model
+    upcoming = Q(date__gte=today, status__in=Appointment.ACTIVE_STATUSES)
+
+    return (
+        Appointment.objects
+        .annotate(
+            is_upcoming=Case(When(upcoming, then=Value(True)), default=Value(False), output_field=BooleanField()),
+        )
+        .annotate(
+            history_rank=Window(
+                RowNumber(),
+                partition_by=[F("patient_id")],
+                order_by=[F("date").desc(), F("start_time").desc(), F("id").desc()],
+            ),
+            upcoming_rank=Window(
+                RowNumber(),
+                partition_by=[F("patient_id"), F("is_upcoming")],
+                order_by=[F("date").asc(), F("start_time").asc(), F("id").asc()],
+            ),
+        )
+        .filter(Q(history_rank__lte=history_limit) | Q(is_upcoming=True, upcoming_rank__lte=upcoming_limit))
+    )
+
+
+def get_patient_profile(patient, today=None):
+    """
+    Assemble the staff profile panel for an already loaded patient with two
+    queries: one for appointments (split into upcoming and history buckets)
+    and one for documents (split into the latest insurance file and the
+    rest). Stats come from `patient.stats` and cost nothing extra when the
+    patient was loaded with select_related("stats").
+    """
+    today = today or timezone.localdate()
+    prefetch_related_objects(
+        [patient],
+        Prefetch("appointments", queryset=profile_appointments(today), to_attr="profile_appointments"),
+        Prefetch("documents", queryset=PatientDocument.objects.all(), to_attr="profile_documents"),
+    )
+
+    appointments = patient.profile_appointments
+    upcoming = sorted(
+        (appointment for appointment in appointments
+         if appointment.is_upcoming and appointment.upcoming_rank <= PROFILE_UPCOMING_LIMIT),
+        key=lambda appointment: appointment.upcoming_rank,
+    )
+    history = sorted(
+        (appointment for appointment in appointments if appointment.history_rank <= PROFILE_HISTORY_LIMIT),
+        key=lambda appointment: appointment.history_rank,
+    )
+
+    # Newest first, per PatientDocument's ordering.
+    documents = patient.profile_documents
+    insurance_document = next(
+        (document for document in documents if document.document_type == PatientDocument.TYPE_INSURANCE),
+        None,
+    )
+
+    try:
+        stats = patient.stats
+    except ObjectDoesNotExist:
+        stats = None
+
+    return PatientProfile(
+        patient=patient,
+        upcoming=upcoming,
+        history=history,
+        insurance_document=insurance_document,
+        documents=[document for document in documents if document.document_type != PatientDocument.TYPE_INSURANCE],
+        stats=stats,
+    )
@@ -1,6 +1,11 @@
+from django.db import transaction
+
 from apps.patients.models import Patient
+from apps.shared.sequences import reserve_ids
+
+from .selectors import PatientMatcher, find_matching_patient, patients_sharing_contacts
 
-from .selectors import find_matching_patient
+BULK_BATCH_SIZE = 500
 
 
 def get_or_create_patient_record(*, name="", phone="", email=""):
@@ -34,3 +39,105 @@ def get_or_create_patient_record(*, name="", phone="", email=""):
         patient.save(update_fields=changed_fields)
 
     return patient
+
+
+def bulk_get_or_create_patient_records(records):
+    """
+    Batch form of `get_or_create_patient_record` for imports and backfills.
+
+    Takes (name, phone, email) tuples and returns one patient (or None) per
+    record, in input order. Records are resolved in order against in-memory
+    maps, so a later record sees patients created or updated by earlier ones
+    exactly as the one-by-one calls would; the database work is one lookup,
+    one id reservation, then one INSERT and one UPDATE per BULK_BATCH_SIZE
+    rows. Backends with a cap on query parameters (SQLite's 999) may split
+    those into smaller batches, so the query count grows with the record
+    count, one per batch.
+    """
+    records = [(name or "", phone or "", email or "") for name, phone, email in records]
+    matcher = PatientMatcher(patients_sharing_contacts(records))
+
+    results = []
+    created = []
+    changed = {}
+
+    for name, phone, email in records:
+        patient = matcher.match(phone=phone, email=email)
+
+        if not patient and (name or phone or email):
+            patient = Patient(name=name, phone=phone, email=email)
+            patient.refresh_contact_keys()
+            created.append(patient)
+            matcher.add(patient)
+
+        if not patient:
+            results.append(None)
+            continue
+
+        updates = {
+            field: value
+            for field, value in (("name", name), ("phone", phone), ("email", email))
+            if value and getattr(patient, field) != value
+        }
+        if updates:
+            matcher.remove(patient)
+            for field, value in updates.items():
+                setattr(patient, field, value)
+            changed_keys = patient.refresh_contact_keys()
+            matcher.add(patient)
+            if patient.pk is not None:
+                changed.setdefault(patient.pk, [patient, set()])[1].update(updates, changed_keys)
+
+        results.append(patient)
+
+    with transaction.atomic():
+        if created:
+            _bulk_insert_patients(created)
+
+        if changed:
+            fields = sorted(set().union(*(fields for _, fields in changed.values())))
+            Patient.objects.bulk_update(
+                [patient for patient, _ in changed.values()],
+                fields,
+                batch_size=BULK_BATCH_SIZE,
+            )
+
+    return results
+
+
+def _bulk_insert_patients(patients):
+    reserved = reserve_ids(Patient, count=len(patients))
+
+    if reserved:
+        for patient, pk in zip(patients, reserved):
+            patient.pk = pk
+            patient.patient_code = f"PAT-{pk:06d}"
+        Patient.objects.bulk_create(patients, batch_size=BULK_BATCH_SIZE)
+        return
+
+    # Backends without id reservation: insert, then stamp codes from the new pks.
+    Patient.objects.bulk_create(patients, batch_size=BULK_BATCH_SIZE)
+    for patient in patients:
+        patient.patient_code = f"PAT-{patient.pk:06d}"
+    Patient.objects.bulk_update(patients, ["patient_code"], batch_size=BULK_BATCH_SIZE)
+
+
+def backfill_patient_contact_keys(batch_size=BULK_BATCH_SIZE):
+    """Recompute contact keys and search documents for every patient; returns how many changed."""
+    key_fields = [*Patient.CONTACT_KEY_SOURCES, "search_document"]
+    updated = 0
+    batch = []
+
+    for patient in Patient.objects.order_by("pk").iterator(chunk_size=batch_size):
+        if patient.refresh_contact_keys():
+            batch.append(patient)
+        if len(batch) >= batch_size:
+            Patient.objects.bulk_update(batch, key_fields)
+            updated += len(batch)
+            batch = []
+
+    if batch:
+        Patient.objects.bulk_update(batch, key_fields)
+        updated += len(batch)
+
+    return updated
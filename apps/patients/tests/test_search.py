@@ -0,0 +1,97 @@
+import os
+import time as clock
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.patients.models import Patient
+from apps.patients.selectors import search_patients
+from apps.shared.query_audit import QueryPatternRecorder, explain
+
+SEARCH_BENCHMARK_ROWS = 1_000_000
+MAX_SEARCH_SECONDS = 0.01
+SEARCH_TIMING_RUNS = 5
+
+
+class PatientSearchTests(TestCase):
+    def setUp(self):
+        self.ana = Patient.objects.create(name="Ana Cruz", phone="09170000001", email="ana@example.com")
+        self.mariana = Patient.objects.create(name="Mariana Santos", phone="09180000002", email="msantos@test.com")
+        self.ben = Patient.objects.create(name="Ben Reyes", phone="09190000003", email="ben@Example.com")
+
+    def names(self, query):
+        return [patient.name for patient in search_patients(query)]
+
+    def test_matches_substrings_of_name_phone_and_email(self):
+        self.assertEqual(self.names("ANA"), ["Ana Cruz", "Mariana Santos"])
+        self.assertEqual(self.names("0000003"), ["Ben Reyes"])
+        self.assertEqual(self.names("639180"), ["Mariana Santos"])
+        self.assertEqual(self.names("example.com"), ["Ana Cruz", "Ben Reyes"])
+        self.assertEqual(self.names("cruz ana"), ["Ana Cruz"])
+        self.assertEqual(self.names("nobody"), [])
+
+    def test_uses_the_trigram_index_and_falls_back_for_short_terms(self):
+        with CaptureQueriesContext(connection) as ctx:
+            list(search_patients("santos"))
+        self.assertIn("MATCH", ctx.captured_queries[0]["sql"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.names("be"), ["Ben Reyes"])
+        self.assertNotIn("MATCH", ctx.captured_queries[0]["sql"])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.ben.name = "Benedict Reyes"
+        self.ben.save(update_fields=["name"])
+        self.assertEqual(self.names("benedict"), ["Benedict Reyes"])
+
+        self.mariana.delete()
+        self.assertEqual(self.names("santos"), [])
+
+    def test_rebuild_command_restores_documents(self):
+        Patient.objects.filter(pk=self.ana.pk).update(search_document="")
+        self.assertEqual(self.names("cruz"), [])
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(self.names("cruz"), ["Ana Cruz"])
+
+
+@skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run benchmarks")
+class PatientSearchBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        batch = []
+        for i in range(SEARCH_BENCHMARK_ROWS):
+            patient = Patient(name=f"Patient {i:07d}", phone=f"09{i:09d}", email=f"p{i}@bench.test")
+            patient.refresh_contact_keys()
+            batch.append(patient)
+            if len(batch) == 10_000:
+                Patient.objects.bulk_create(batch)
+                batch = []
+        Patient.objects.bulk_create(batch)
+
+    def test_selective_search_is_under_ten_milliseconds(self):
+        for query in ("patient 0765432", "000123456", "p98765@bench"):
+            with self.subTest(query=query):
+                recorder = QueryPatternRecorder()
+                with recorder.recording(query):
+                    results = list(search_patients(query)[:20])  # also warms the page cache
+                self.assertTrue(results)
+
+                if connection.vendor == "sqlite":
+                    (entry,) = recorder.patterns.values()
+                    plan = "\n".join(explain(entry["sql"], entry["params"]))
+                    self.assertIn("SCAN website_patient_search VIRTUAL TABLE", plan)
+                    self.assertNotRegex(plan, r"SCAN website_patient\b")
+
+                # Best of several runs, so one scheduler hiccup is not a failure.
+                timings = []
+                for _ in range(SEARCH_TIMING_RUNS):
+                    started = clock.perf_counter()
+                    list(search_patients(query)[:20])
+                    timings.append(clock.perf_counter() - started)
+                self.assertLess(min(timings), MAX_SEARCH_SECONDS)
@@ -0,0 +1,162 @@
+import math
+from datetime import time, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment
+from apps.patients.models import Patient
+from apps.patients.normalization import email_key, name_key, phone_key
+from apps.patients.selectors import find_matching_patient, find_matching_patients
+from apps.patients.services import bulk_get_or_create_patient_records, get_or_create_patient_record
+
+RECORDS = [
+    ("Ana Cruz", "09170000001", "ana@test.com"),
+    ("Ana C.", "", "ana@test.com"),
+    ("Ben Reyes", "09170000002", ""),
+    ("Ben Reyes", "09170000002", "ben@test.com"),
+    ("Carla Diaz", "09170000003", "ana@test.com"),
+    ("", "", ""),
+    ("Dan Lim", "09170000004", "dan@test.com"),
+    ("Dan Lim", "09170000099", "dan@test.com"),
+]
+
+
+class BulkPatientMatchingTests(TestCase):
+    def seed(self):
+        Patient.objects.create(name="Ana Cruz", phone="09170000001", email="old-ana@test.com")
+        Patient.objects.create(name="Dan Lim", phone="", email="dan@test.com")
+
+    def snapshot(self, results):
+        return [
+            (patient.name, patient.phone, patient.email) if patient else None
+            for patient in results
+        ]
+
+    def test_bulk_upsert_matches_one_by_one_calls(self):
+        self.seed()
+        sequential = [get_or_create_patient_record(name=n, phone=p, email=e) for n, p, e in RECORDS]
+        # The batch hands back one shared instance per patient, so compare
+        # against each patient's final state.
+        expected_results = self.snapshot(
+            [Patient.objects.get(pk=patient.pk) if patient else None for patient in sequential]
+        )
+        expected_rows = sorted(Patient.objects.values_list("name", "phone", "email"))
+        expected_identity = [patient.pk if patient else None for patient in sequential]
+
+        Patient.objects.all().delete()
+        self.seed()
+        first_pk = Patient.objects.order_by("pk").first().pk
+        bulk = bulk_get_or_create_patient_records(RECORDS)
+
+        self.assertEqual(self.snapshot(bulk), expected_results)
+        self.assertEqual(sorted(Patient.objects.values_list("name", "phone", "email")), expected_rows)
+        # Same record-to-patient grouping, modulo the ids of the recreated seed rows.
+        offset = first_pk - min(pk for pk in expected_identity if pk)
+        self.assertEqual(
+            [patient.pk - offset if patient else None for patient in bulk],
+            expected_identity,
+        )
+
+    @patch("apps.patients.services.BULK_BATCH_SIZE", 25)
+    def test_bulk_upsert_queries_grow_per_batch_and_issues_codes(self):
+        for count in (100, 300):
+            with self.subTest(count=count):
+                Patient.objects.all().delete()
+                self.seed()
+                records = [(f"Import {i}", f"0918{i:07d}", f"import{i}@test.com") for i in range(count)]
+                records += [("Ana Cruz", "09170000001", "ana@test.com")]
+
+                # contact lookups (phone, email), savepoint pair, id reservation
+                # (write lock, then counter read), one INSERT per batch of 25,
+                # one UPDATE batch
+                with self.assertNumQueries(6 + math.ceil(count / 25) + 1):
+                    patients = bulk_get_or_create_patient_records(records)
+
+                self.assertEqual(Patient.objects.count(), count + 2)
+                for patient in patients:
+                    self.assertEqual(patient.patient_code, f"PAT-{patient.pk:06d}")
+                self.assertEqual(Patient.objects.get(phone="09170000001").email, "ana@test.com")
+
+    def test_find_matching_patients_agrees_with_single_lookup(self):
+        self.seed()
+        Patient.objects.create(name="Ben Reyes", phone="09170000002", email="ana@test.com")
+
+        with self.assertNumQueries(2):
+            matches = find_matching_patients(RECORDS)
+
+        self.assertEqual(
+            matches,
+            [find_matching_patient(name=n, phone=p, email=e) for n, p, e in RECORDS],
+        )
+
+    def test_link_appointment_patients_command(self):
+        existing = Patient.objects.create(name="Ana Cruz", phone="09170000001")
+        booking_date = timezone.localdate() + timedelta(days=30)
+        for index, (name, phone, email) in enumerate(RECORDS):
+            Appointment.objects.create(
+                name=name or "Walk-in",
+                phone=phone,
+                email=email,
+                date=booking_date + timedelta(days=index),
+                start_time=time(9, 0),
+                timeslot="9:00 AM",
+                status=Appointment.STATUS_COMPLETED,
+                services=[APPOINTMENT_SERVICES[0]],
+            )
+
+        call_command("link_appointment_patients", batch_size=3, stdout=StringIO())
+
+        self.assertFalse(Appointment.objects.filter(patient__isnull=True).exists())
+        self.assertEqual(
+            Appointment.objects.filter(patient=existing).count(),
+            len([r for r in RECORDS if r[1] == "09170000001" or r[2] == "ana@test.com"]),
+        )
+
+
+class PatientContactKeyTests(TestCase):
+    def test_normalizers(self):
+        for raw in ["0917 000 0001", "+63 917-000-0001", "(0917) 000.0001", "9170000001", "0063 917 000 0001"]:
+            self.assertEqual(phone_key(raw), "639170000001", raw)
+        self.assertEqual(phone_key(""), "")
+        self.assertEqual(email_key("  Ana.Cruz@Test.COM "), "ana.cruz@test.com")
+        self.assertEqual(name_key("  Ana   CRUZ "), "ana cruz")
+
+    def test_keys_are_maintained_on_save(self):
+        patient = Patient.objects.create(name="Ana Cruz", phone="0917-000-0001", email="Ana@Test.com")
+        self.assertEqual(
+            (patient.name_key, patient.phone_key, patient.email_key),
+            ("ana cruz", "639170000001", "ana@test.com"),
+        )
+
+        patient.phone = "0918 000 0002"
+        patient.save(update_fields=["phone"])
+
+        self.assertEqual(Patient.objects.get(pk=patient.pk).phone_key, "639180000002")
+
+    def test_matching_ignores_formatting_and_case(self):
+        legacy = Patient.objects.create(name="Legacy", phone="(0917) 000-0001", email="Legacy@Test.com")
+
+        self.assertEqual(find_matching_patient(phone="09170000001"), legacy)
+        self.assertEqual(find_matching_patient(email="legacy@test.com"), legacy)
+        self.assertEqual(find_matching_patients([("", "+639170000001", "")]), [legacy])
+
+        with self.assertNumQueries(1) as ctx:
+            find_matching_patient(phone="09170000001", email="legacy@test.com")
+        self.assertIn("phone_key", ctx.captured_queries[0]["sql"])
+
+    def test_backfill_command_repairs_stale_keys(self):
+        patient = Patient.objects.create(name="Stale Keys", phone="0917 000 0009", email="Stale@Test.com")
+        Patient.objects.filter(pk=patient.pk).update(name_key="", phone_key="", email_key="")
+
+        out = StringIO()
+        call_command("backfill_patient_keys", stdout=out)
+
+        patient.refresh_from_db()
+        self.assertEqual(patient.phone_key, "639170000009")
+        self.assertEqual(patient.email_key, "stale@test.com")
+        self.assertIn("1 patient", out.getvalue())
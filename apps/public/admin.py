@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import BlogPost, SiteContent, Testimonial
+from .models import BlogPost, OutboundEmail, SiteContent, Testimonial
 
 @admin.register(SiteContent)
 class SiteContentAdmin(admin.ModelAdmin):
@@ -22,3 +22,11 @@ class BlogPostAdmin(admin.ModelAdmin):
     list_filter = ("category", "is_published")
     search_fields = ("title", "excerpt", "body", "author_name")
     prepopulated_fields = {"slug": ("title",)}
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "attempts", "next_attempt_at", "created_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("subject", "to", "reply_to")
+    readonly_fields = ("attempts", "last_error", "created_at", "sent_at")
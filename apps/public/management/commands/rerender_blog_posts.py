@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.public.models import BlogPost
+from apps.public.page_cache import NAMESPACE_BLOG, invalidate_public_pages
+from apps.public.richtext import RICH_TEXT_RENDER_VERSION
+
+
+class Command(BaseCommand):
+    help = "Re-render stored blog post bodies left behind by a sanitizer change."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-render every post, not only stale ones.")
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        posts = BlogPost.objects.order_by("pk").only("pk", "body")
+        if not options["all"]:
+            posts = posts.exclude(rendered_body_version=RICH_TEXT_RENDER_VERSION)
+
+        rendered = 0
+        last_pk = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:options["batch_size"]])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            for post in batch:
+                post.render_body()
+            with transaction.atomic():
+                BlogPost.objects.bulk_update(batch, ["rendered_body_html", "rendered_body_version"])
+            rendered += len(batch)
+
+        if rendered:
+            # bulk_update skips BlogPost.save, so retire the cached blog pages here.
+            invalidate_public_pages(NAMESPACE_BLOG)
+        self.stdout.write(self.style.SUCCESS(f"Re-rendered {rendered} blog post(s)."))
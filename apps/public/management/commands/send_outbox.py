@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.public.outbox import OUTBOX_BATCH_SIZE, deliver_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued outbox email in batches over one mail connection, retrying failures with backoff. "
+        "Run with --loop as a long-lived worker, or without it from cron to drain what is due."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for due messages.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            results = deliver_outbox(batch_size=batch_size)
+            if results:
+                self.stdout.write(
+                    f"Outbox: {results['sent']} sent, {results['retrying']} to retry, {results['failed']} failed."
+                )
+            if sum(results.values()) >= batch_size:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+LEGACY_HERO_TITLE = "We're Here for You. <span>Dentistry That Understands.</span>"
+MOJIBAKE_DASH = "Ã¢â‚¬â€"
+FALLBACK_DEFAULTS = {
+    "services_page_title": "Our Treatments & Services",
+    "contact_page_title": "Contact Us",
+    "contact_form_heading": "Send Us a Message",
+    "clinic_landmarks": "Nathaniel's Water Station, Planas Tricycle Terminal Station, Gasoline Station",
+}
+
+
+def fix_legacy_site_content(apps, schema_editor):
+    """One-time version of the fix-ups get_site_content used to apply on every read."""
+    SiteContent = apps.get_model("public", "SiteContent")
+
+    for content in SiteContent.objects.all():
+        changed = []
+
+        if content.hero_title == LEGACY_HERO_TITLE:
+            content.hero_title = "We're Here for You. Dentistry That Understands."
+            changed.append("hero_title")
+
+        if MOJIBAKE_DASH in content.hero_subtitle:
+            content.hero_subtitle = content.hero_subtitle.replace(MOJIBAKE_DASH, "-")
+            changed.append("hero_subtitle")
+
+        for field_name, value in FALLBACK_DEFAULTS.items():
+            if not getattr(content, field_name):
+                setattr(content, field_name, value)
+                changed.append(field_name)
+
+        if changed:
+            content.save(update_fields=changed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("public", "0017_blogpost_category"),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_legacy_site_content, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+from apps.public.richtext import RICH_TEXT_RENDER_VERSION, normalize_rich_text
+
+
+def render_blog_bodies(apps, schema_editor):
+    BlogPost = apps.get_model("public", "BlogPost")
+
+    posts = list(BlogPost.objects.only("pk", "body"))
+    for post in posts:
+        post.rendered_body_html = normalize_rich_text(post.body)
+        post.rendered_body_version = RICH_TEXT_RENDER_VERSION
+    BlogPost.objects.bulk_update(posts, ["rendered_body_html", "rendered_body_version"], batch_size=200)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("public", "0018_fix_legacy_site_content"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blogpost",
+            name="rendered_body_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="blogpost",
+            name="rendered_body_version",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(render_blog_bodies, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,31 @@
+from django.core.mail import EmailMessage
 from django.db import models
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 
-from .richtext import normalize_rich_text
+from apps.shared.cache import CacheNamespace, bump_namespaces
+
+from .page_cache import NAMESPACE_BLOG, NAMESPACE_SITE, NAMESPACE_TESTIMONIALS, invalidate_public_pages
+from .richtext import RICH_TEXT_RENDER_VERSION, normalize_rich_text
+
+SITE_CONTENT_CACHE = CacheNamespace("public:site-content")
+
+
+def invalidate_site_content():
+    """Point readers at a new site content version, and retire the pages built from the old one."""
+    bump_namespaces(SITE_CONTENT_CACHE, NAMESPACE_SITE)
+
 
 class SiteContent(models.Model):
+    # Headings the public pages always show; saved in place of blank values.
+    FALLBACK_DEFAULTS = {
+        "services_page_title": "Our Treatments & Services",
+        "contact_page_title": "Contact Us",
+        "contact_form_heading": "Send Us a Message",
+        "clinic_landmarks": "Nathaniel's Water Station, Planas Tricycle Terminal Station, Gasoline Station",
+    }
+
     hero_title = models.CharField(max_length=140, default="We're Here for You. Dentistry That Understands.")
     hero_subtitle = models.TextField(
         blank=True,
@@ -121,6 +141,21 @@ class SiteContent(models.Model):
     def __str__(self):
         return "Website Content"
 
+    def save(self, *args, **kwargs):
+        filled = [field for field, value in self.FALLBACK_DEFAULTS.items() if not getattr(self, field)]
+        for field in filled:
+            setattr(self, field, self.FALLBACK_DEFAULTS[field])
+        if filled and kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | set(filled)
+
+        super().save(*args, **kwargs)
+        invalidate_site_content()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_site_content()
+        return result
+
 
 class Testimonial(models.Model):
     patient_name = models.CharField(max_length=120)
@@ -138,6 +173,15 @@ class Testimonial(models.Model):
     def __str__(self):
         return self.patient_name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_public_pages(NAMESPACE_TESTIMONIALS)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_public_pages(NAMESPACE_TESTIMONIALS)
+        return result
+
 
 class BlogPost(models.Model):
     class Category(models.TextChoices):
@@ -156,6 +200,8 @@ class BlogPost(models.Model):
     )
     excerpt = models.TextField()
     body = models.TextField()
+    rendered_body_html = models.TextField(blank=True, default="", editable=False)
+    rendered_body_version = models.PositiveSmallIntegerField(default=0, editable=False)
     image = models.ImageField(upload_to="site/blog/", blank=True, null=True)
     author_name = models.CharField(max_length=120, blank=True, default="Clinic Team")
     published_at = models.DateTimeField(default=timezone.now)
@@ -174,9 +220,20 @@ class BlogPost(models.Model):
 
     @property
     def rendered_body(self):
+        if self.rendered_body_version == RICH_TEXT_RENDER_VERSION:
+            return self.rendered_body_html
+        # Not re-rendered since the sanitizer changed; stay correct until it is.
         return normalize_rich_text(self.body)
 
+    def render_body(self):
+        self.rendered_body_html = normalize_rich_text(self.body)
+        self.rendered_body_version = RICH_TEXT_RENDER_VERSION
+
     def save(self, *args, **kwargs):
+        self.render_body()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | {"rendered_body_html", "rendered_body_version"}
+
         if not self.slug:
             base_slug = slugify(self.title) or "blog-post"
             slug = base_slug
@@ -186,3 +243,54 @@ class BlogPost(models.Model):
                 counter += 1
             self.slug = slug
         super().save(*args, **kwargs)
+        invalidate_public_pages(NAMESPACE_BLOG)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_public_pages(NAMESPACE_BLOG)
+        return result
+
+
+class OutboundEmail(models.Model):
+    """
+    A message waiting in the outbox. Requests only write a row; delivery
+    happens later in apps.public.outbox, so a slow or unreachable mail
+    server never holds up a page and a failed send is retried, not lost.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True, default="", editable=False)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="public_outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)}"
+
+    def as_message(self, connection=None):
+        return EmailMessage(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email,
+            to=self.to,
+            reply_to=self.reply_to,
+            connection=connection,
+        )
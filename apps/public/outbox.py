@@ -0,0 +1,156 @@
+import logging
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BASE_SECONDS = 60
+OUTBOX_RETRY_MAX_SECONDS = 60 * 60 * 6
+# A claimed batch stays reserved this long; rows left by a worker that died mid-batch become due again after it.
+OUTBOX_CLAIM_SECONDS = 10 * 60
+
+
+def enqueue_email(subject, body, to, from_email=None, reply_to=()):
+    """
+    Put a message in the outbox and return the row. Nothing is sent here;
+    with OUTBOX_SEND_IN_PROCESS a background delivery pass starts once the
+    surrounding transaction commits, and `manage.py send_outbox` delivers
+    (and retries) it otherwise.
+    """
+    email = OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        reply_to=list(reply_to),
+    )
+    if settings.OUTBOX_SEND_IN_PROCESS:
+        transaction.on_commit(schedule_delivery)
+    return email
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the `attempts`-th failure: 1, 2, 4 ... minutes, capped."""
+    return timedelta(seconds=min(OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_SECONDS))
+
+
+def claim_due(batch_size, now):
+    """
+    Reserve up to `batch_size` due messages for this worker. The claim is a
+    conditional UPDATE rather than a row lock, so concurrent workers skip
+    each other's rows on every backend, SQLite included.
+    """
+    due = OutboundEmail.objects.filter(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now)
+    ids = list(due.order_by("next_attempt_at", "id").values_list("pk", flat=True)[:batch_size])
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    due.filter(pk__in=ids).update(claim_token=token, next_attempt_at=now + timedelta(seconds=OUTBOX_CLAIM_SECONDS))
+    return list(OutboundEmail.objects.filter(pk__in=ids, claim_token=token).order_by("id"))
+
+
+def record_sent(email, now):
+    OutboundEmail.objects.filter(pk=email.pk).update(
+        status=OutboundEmail.Status.SENT,
+        attempts=email.attempts + 1,
+        sent_at=now,
+        claim_token="",
+        last_error="",
+    )
+    return "sent"
+
+
+def record_failure(email, error, now):
+    """Schedule the next attempt with backoff, or give up after OUTBOX_MAX_ATTEMPTS."""
+    attempts = email.attempts + 1
+    changes = {"attempts": attempts, "claim_token": "", "last_error": error[:2000]}
+    if attempts >= OUTBOX_MAX_ATTEMPTS:
+        changes["status"] = OutboundEmail.Status.FAILED
+        logger.error("Giving up on outbox email %s after %s attempts: %s", email.pk, attempts, error)
+    else:
+        changes["next_attempt_at"] = now + retry_delay(attempts)
+        logger.warning("Outbox email %s failed (attempt %s), retrying: %s", email.pk, attempts, error)
+    OutboundEmail.objects.filter(pk=email.pk).update(**changes)
+    return "failed" if attempts >= OUTBOX_MAX_ATTEMPTS else "retrying"
+
+
+def deliver_outbox(batch_size=OUTBOX_BATCH_SIZE, now=None):
+    """
+    Send one batch of due messages over a single mail connection and record
+    each outcome as it happens. Returns a Counter of "sent", "retrying" and
+    "failed"; an empty Counter means nothing was due.
+    """
+    now = now or timezone.now()
+    results = Counter()
+    batch = claim_due(batch_size, now)
+    if not batch:
+        return results
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        for email in batch:
+            results[record_failure(email, f"{type(exc).__name__}: {exc}", now)] += 1
+        return results
+
+    try:
+        for email in batch:
+            try:
+                sent = connection.send_messages([email.as_message(connection)])
+            except Exception as exc:
+                results[record_failure(email, f"{type(exc).__name__}: {exc}", now)] += 1
+                # The session may be unusable after an error; the rest of the batch opens its own.
+                connection.close()
+                continue
+            if sent:
+                results[record_sent(email, now)] += 1
+            else:
+                results[record_failure(email, "The mail backend did not accept the message.", now)] += 1
+    finally:
+        connection.close()
+    return results
+
+
+_executor = None
+_scheduled = None
+_lock = threading.Lock()
+
+
+def _deliver_in_background():
+    try:
+        while sum(deliver_outbox().values()) >= OUTBOX_BATCH_SIZE:
+            pass
+    except Exception:
+        logger.exception("Background outbox delivery failed")
+    finally:
+        connections.close_all()
+
+
+def schedule_delivery():
+    """
+    Run a delivery pass on this process's single background thread. A pass
+    that is queued but not yet started will pick up the new row, so bursts
+    collapse into one pass rather than one per message.
+    """
+    global _executor, _scheduled
+    with _lock:
+        if _scheduled is not None and not _scheduled.running() and not _scheduled.done():
+            return _scheduled
+        if _executor is None:
+            _executor = ThreadPoolExecutor(1, thread_name_prefix="outbox")
+        _scheduled = _executor.submit(_deliver_in_background)
+        return _scheduled
@@ -0,0 +1,100 @@
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.messages.storage.session import SessionStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from apps.shared.cache import CacheNamespace, bump_namespaces, namespace_versions
+
+PAGE_CACHE_TTL_SECONDS = 5 * 60
+
+# What a cached page can depend on; bumping a namespace's version retires
+# every page built from it.
+NAMESPACE_SITE = CacheNamespace("public:pages:site")
+NAMESPACE_TESTIMONIALS = CacheNamespace("public:pages:testimonials")
+NAMESPACE_BLOG = CacheNamespace("public:pages:blog")
+
+
+def invalidate_public_pages(*namespaces):
+    """Retire every cached page built from `namespaces`."""
+    bump_namespaces(*namespaces)
+
+
+def has_pending_messages(request):
+    """Whether the default (cookie, then session) message storage holds messages to show."""
+    if request.COOKIES.get(CookieStorage.cookie_name):
+        return True
+    session = getattr(request, "session", None)
+    return bool(session is not None and session.get(SessionStorage.session_key))
+
+
+def is_cacheable_request(request):
+    return (
+        request.method in ("GET", "HEAD")
+        and not request.user.is_authenticated
+        and not has_pending_messages(request)
+    )
+
+
+def page_cache_key(request, namespaces, query_params):
+    params = urlencode(sorted(
+        (name, request.GET[name]) for name in query_params if request.GET.get(name)
+    ))
+    versions = ".".join(namespace_versions(namespaces))
+    return f"public:pages:{request.path}?{params}:{versions}"
+
+
+def cache_public_page(*namespaces, query_params=()):
+    """
+    Serve a public view's rendered page to anonymous visitors from the
+    cache. The page is keyed on its path, the listed query parameters and
+    the versions of the namespaces it reads, so other parameters share one
+    entry and invalidate_public_pages purges it selectively. Misses are
+    stored by PublicPageCacheMiddleware once the response is complete.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            key = page_cache_key(request, namespaces, query_params)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            if request.method == "GET":
+                request.public_page_cache_key = key
+            return view(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
+
+
+class PublicPageCacheMiddleware:
+    """
+    Store pages that cache_public_page missed, after the middleware below
+    it has finished with the response. Session, CSRF and message cookies
+    are only set on the way out, so checking for them in the view decorator
+    would be too early; a page that sets any cookie is never shared. Must
+    be listed above SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        key = getattr(request, "public_page_cache_key", None)
+        if (
+            key
+            and response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+        ):
+            cache.set(key, (response.content, response["Content-Type"]), PAGE_CACHE_TTL_SECONDS)
+        return response
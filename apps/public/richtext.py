@@ -1,3 +1,4 @@
+import html
 import re
 from html.parser import HTMLParser
 from urllib.parse import urlparse
@@ -9,6 +10,29 @@ ALLOWED_TAGS = {"p", "br", "strong", "em", "ul", "ol", "li", "a", "h2", "h3", "b
 VOID_TAGS = {"br"}
 ALLOWED_REL = {"noopener", "noreferrer", "nofollow"}
 ALLOWED_SCHEMES = {"http", "https", "mailto"}
+# Bump whenever normalize_rich_text's output changes, then run
+# `manage.py rerender_blog_posts` to refresh the stored copies.
+RICH_TEXT_RENDER_VERSION = 1
+
+# Tokenizer for the markup the staff editor produces: text, plain start and
+# end tags, and a "<" that cannot open markup. Anything it does not model
+# (comments, declarations, script/style, unusual whitespace or attribute
+# syntax) lands in the last group and the document goes to HTMLParser.
+ASCII_SPACE = r"[\t\n\r\f ]"
+ATTR_NAME = r"[a-zA-Z_:][-\w:.]*"
+BARE_ATTR_VALUE = r"""[^\t\n\r\f "'=<>`]+"""
+TOKEN_RE = re.compile(
+    r"([^<]+)"
+    rf"|</([a-zA-Z][a-zA-Z0-9]*){ASCII_SPACE}*>"
+    rf"""|<([a-zA-Z][a-zA-Z0-9]*)((?:{ASCII_SPACE}+{ATTR_NAME}"""
+    rf"""(?:{ASCII_SPACE}*={ASCII_SPACE}*(?:"[^"]*"|'[^']*'|{BARE_ATTR_VALUE}))?)*){ASCII_SPACE}*(/?)>"""
+    r"|(<)(?=[\t\n\r\f 0-9=])"
+    r"|(<)"
+)
+ATTR_RE = re.compile(
+    rf"""({ATTR_NAME})(?:{ASCII_SPACE}*={ASCII_SPACE}*(?:"([^"]*)"|'([^']*)'|({BARE_ATTR_VALUE})))?"""
+)
+RAW_TEXT_TAGS = set(HTMLParser.CDATA_CONTENT_ELEMENTS)
 
 
 def looks_like_html(value):
@@ -42,6 +66,32 @@ def plain_text_to_html(value):
     return "".join(html_parts)
 
 
+def link_attr_text(attrs):
+    """Render the allowed attributes of an <a> tag from (name, value) pairs."""
+    cleaned = {}
+    for name, value in attrs:
+        name = (name or "").lower()
+        value = (value or "").strip()
+        if not value:
+            continue
+
+        if name == "href":
+            safe_value = sanitize_url(value)
+            if safe_value:
+                cleaned["href"] = safe_value
+        elif name == "target" and value == "_blank":
+            cleaned["target"] = "_blank"
+        elif name == "rel":
+            rel_tokens = [token for token in value.split() if token in ALLOWED_REL]
+            if rel_tokens:
+                cleaned["rel"] = " ".join(rel_tokens)
+
+    if "target" in cleaned and "rel" not in cleaned:
+        cleaned["rel"] = "noopener noreferrer"
+
+    return "".join(f' {name}="{html.escape(value)}"' for name, value in cleaned.items())
+
+
 class LimitedHTMLSanitizer(HTMLParser):
     def __init__(self):
         super().__init__(convert_charrefs=True)
@@ -57,30 +107,7 @@ class LimitedHTMLSanitizer(HTMLParser):
             self.parts.append("<br>")
             return
 
-        attr_text = ""
-        if tag == "a":
-            cleaned = {}
-            for name, value in attrs:
-                name = (name or "").lower()
-                value = (value or "").strip()
-                if not value:
-                    continue
-
-                if name == "href":
-                    safe_value = sanitize_url(value)
-                    if safe_value:
-                        cleaned["href"] = safe_value
-                elif name == "target" and value == "_blank":
-                    cleaned["target"] = "_blank"
-                elif name == "rel":
-                    rel_tokens = [token for token in value.split() if token in ALLOWED_REL]
-                    if rel_tokens:
-                        cleaned["rel"] = " ".join(rel_tokens)
-
-            if "target" in cleaned and "rel" not in cleaned:
-                cleaned["rel"] = "noopener noreferrer"
-
-            attr_text = "".join(f' {name}="{escape(value)}"' for name, value in cleaned.items())
+        attr_text = link_attr_text(attrs) if tag == "a" else ""
 
         self.parts.append(f"<{tag}{attr_text}>")
         self.stack.append(tag)
@@ -115,19 +142,76 @@ class LimitedHTMLSanitizer(HTMLParser):
         return "".join(self.parts)
 
 
-def sanitize_rich_text_html(value):
+def sanitize_with_parser(value):
     sanitizer = LimitedHTMLSanitizer()
     sanitizer.feed(value or "")
     sanitizer.close()
     return sanitizer.get_html().strip()
 
 
+def sanitize_with_tokenizer(value):
+    """
+    Single-pass equivalent of sanitize_with_parser for the markup
+    TOKEN_RE models. Returns None as soon as the document holds anything
+    else, so the caller can hand it to the full parser instead.
+    """
+    parts = []
+    append = parts.append
+    stack = []
+
+    for text, end_tag, start_tag, attrs, self_closing, bare_lt, other in TOKEN_RE.findall(value or ""):
+        if text:
+            append(html.escape(html.unescape(text) if "&" in text else text))
+        elif start_tag:
+            tag = start_tag.lower()
+            if tag in RAW_TEXT_TAGS:
+                return None
+            if tag not in ALLOWED_TAGS or (self_closing and tag not in VOID_TAGS):
+                continue
+            if tag in VOID_TAGS:
+                append("<br>")
+                continue
+
+            attr_text = ""
+            if tag == "a":
+                attr_text = link_attr_text(
+                    (name, html.unescape(quoted or single or bare))
+                    for name, quoted, single, bare in ATTR_RE.findall(attrs)
+                )
+            append(f"<{tag}{attr_text}>")
+            stack.append(tag)
+        elif end_tag:
+            tag = end_tag.lower()
+            if tag not in ALLOWED_TAGS or tag in VOID_TAGS or tag not in stack:
+                continue
+            while stack:
+                current = stack.pop()
+                append(f"</{current}>")
+                if current == tag:
+                    break
+        elif bare_lt:
+            append("&lt;")
+        else:
+            return None
+
+    while stack:
+        append(f"</{stack.pop()}>")
+    return "".join(parts).strip()
+
+
+def sanitize_rich_text_html(value):
+    sanitized = sanitize_with_tokenizer(value)
+    if sanitized is None:
+        sanitized = sanitize_with_parser(value)
+    return sanitized
+
+
 def normalize_rich_text(value):
     text = (value or "").strip()
     if not text:
         return ""
 
-    if looks_like_html(text):
+    if "<" in text and looks_like_html(text):
         return sanitize_rich_text_html(text)
 
     return plain_text_to_html(text)
@@ -0,0 +1,201 @@
+import logging
+import socket
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from aiosmtpd.controller import Controller
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.public import outbox
+from apps.public.models import OutboundEmail
+from apps.public.outbox import OUTBOX_MAX_ATTEMPTS, claim_due, deliver_outbox, enqueue_email
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubSMTPServer:
+    """aiosmtpd on a local port that records each message with the client address it came in on."""
+
+    def __init__(self):
+        self.messages = []
+        self.reject_next = 0
+        stub = self
+
+        class Handler:
+            async def handle_DATA(self, server, session, envelope):
+                if stub.reject_next:
+                    stub.reject_next -= 1
+                    return "451 4.3.0 Try again later"
+                stub.messages.append((session.peer, envelope))
+                return "250 OK"
+
+        # aiosmtpd logs every SMTP command at INFO.
+        self.log = logging.getLogger("mail.log")
+        self.log_level = self.log.level
+        self.log.setLevel(logging.WARNING)
+        self.port = free_port()
+        self.controller = Controller(Handler(), hostname="127.0.0.1", port=self.port)
+        self.controller.start()
+
+    def stop(self):
+        self.controller.stop()
+        self.log.setLevel(self.log_level)
+
+    @property
+    def connections(self):
+        return {peer for peer, _ in self.messages}
+
+
+SMTP_SETTINGS = {
+    "EMAIL_BACKEND": "django.core.mail.backends.smtp.EmailBackend",
+    "EMAIL_HOST": "127.0.0.1",
+    "EMAIL_HOST_USER": "",
+    "EMAIL_HOST_PASSWORD": "",
+    "EMAIL_USE_TLS": False,
+    "EMAIL_TIMEOUT": 5,
+}
+
+
+@override_settings(DEFAULT_FROM_EMAIL="clinic@test.com", CONTACT_EMAIL="owner@test.com", **SMTP_SETTINGS)
+class OutboxDeliveryTests(TestCase):
+    def setUp(self):
+        self.smtp = StubSMTPServer()
+        self.addCleanup(self.smtp.stop)
+        port_override = override_settings(EMAIL_PORT=self.smtp.port)
+        port_override.enable()
+        self.addCleanup(port_override.disable)
+
+    def enqueue(self, count=1):
+        emails = [
+            enqueue_email(f"Inquiry {index}", "Hello.", ["owner@test.com"], reply_to=["patient@example.com"])
+            for index in range(count)
+        ]
+        self.now = timezone.now()
+        return emails
+
+    def test_batch_is_sent_over_one_connection(self):
+        self.enqueue(3)
+
+        results = deliver_outbox(now=self.now)
+
+        self.assertEqual(results["sent"], 3)
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(len(self.smtp.connections), 1)
+        _, envelope = self.smtp.messages[0]
+        self.assertEqual(envelope.mail_from, "clinic@test.com")
+        self.assertEqual(envelope.rcpt_tos, ["owner@test.com"])
+        self.assertIn(b"Reply-To: patient@example.com", envelope.content)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.Status.SENT).exists())
+        self.assertEqual(deliver_outbox(now=self.now), {})
+
+    def test_unreachable_server_backs_off_and_retries(self):
+        [email] = self.enqueue()
+        with override_settings(EMAIL_PORT=free_port()), self.assertLogs("apps.public.outbox", "WARNING"):
+            results = deliver_outbox(now=self.now)
+
+        self.assertEqual(results["retrying"], 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.next_attempt_at, self.now + timedelta(minutes=1))
+        self.assertIn("ConnectionRefusedError", email.last_error)
+
+        # Not due again until the backoff has passed.
+        self.assertEqual(deliver_outbox(now=self.now + timedelta(seconds=30)), {})
+
+        results = deliver_outbox(now=self.now + timedelta(seconds=61))
+        self.assertEqual(results["sent"], 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.SENT)
+        self.assertEqual(email.attempts, 2)
+        self.assertEqual(email.last_error, "")
+
+    def test_backoff_doubles_with_each_failure(self):
+        self.assertEqual(outbox.retry_delay(1), timedelta(minutes=1))
+        self.assertEqual(outbox.retry_delay(2), timedelta(minutes=2))
+        self.assertEqual(outbox.retry_delay(4), timedelta(minutes=8))
+        self.assertEqual(outbox.retry_delay(20), timedelta(hours=6))
+
+    def test_rejected_message_does_not_hold_up_the_rest_of_the_batch(self):
+        first, second = self.enqueue(2)
+        self.smtp.reject_next = 1
+
+        with self.assertLogs("apps.public.outbox", "WARNING"):
+            results = deliver_outbox(now=self.now)
+
+        self.assertEqual(results, {"retrying": 1, "sent": 1})
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, OutboundEmail.Status.PENDING)
+        self.assertIn("451", first.last_error)
+        self.assertEqual(second.status, OutboundEmail.Status.SENT)
+
+    def test_gives_up_after_max_attempts(self):
+        [email] = self.enqueue()
+        OutboundEmail.objects.filter(pk=email.pk).update(attempts=OUTBOX_MAX_ATTEMPTS - 1)
+
+        with override_settings(EMAIL_PORT=free_port()), self.assertLogs("apps.public.outbox", "ERROR"):
+            results = deliver_outbox(now=self.now)
+
+        self.assertEqual(results["failed"], 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.FAILED)
+        self.assertEqual(deliver_outbox(now=self.now + timedelta(days=1)), {})
+        self.assertEqual(self.smtp.messages, [])
+
+    def test_claimed_rows_are_not_handed_to_another_worker(self):
+        self.enqueue(3)
+
+        first = claim_due(2, self.now)
+        second = claim_due(10, self.now)
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({email.pk for email in first} & {email.pk for email in second})
+        self.assertEqual(claim_due(10, self.now), [])
+
+    def test_send_outbox_command_drains_every_due_batch(self):
+        self.enqueue(5)
+        stdout = StringIO()
+
+        call_command("send_outbox", "--batch-size", "2", stdout=stdout)
+
+        self.assertEqual(len(self.smtp.messages), 5)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.Status.SENT).count(), 5)
+        self.assertIn("2 sent", stdout.getvalue())
+
+
+@override_settings(DEFAULT_FROM_EMAIL="clinic@test.com", CONTACT_EMAIL="owner@test.com", **SMTP_SETTINGS)
+class ContactOutboxTests(TestCase):
+    def post_contact(self):
+        return self.client.post(
+            reverse("contact"),
+            {"name": "Test User", "email": "test@example.com", "subject": "Inquiry", "message": "Hello."},
+        )
+
+    def test_contact_post_does_not_touch_the_mail_server(self):
+        with override_settings(EMAIL_PORT=free_port()), patch("django.core.mail.get_connection") as get_connection:
+            response = self.post_contact()
+
+        self.assertRedirects(response, reverse("contact"), fetch_redirect_response=False)
+        get_connection.assert_not_called()
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.Status.PENDING)
+
+    @override_settings(OUTBOX_SEND_IN_PROCESS=True)
+    def test_delivery_is_scheduled_after_commit(self):
+        with patch.object(outbox, "schedule_delivery") as schedule:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                self.post_contact()
+            schedule.assert_not_called()
+            for callback in callbacks:
+                callback()
+
+        schedule.assert_called_once_with()
@@ -0,0 +1,68 @@
+import random
+
+from django.test import SimpleTestCase
+
+from apps.public.richtext import (
+    normalize_rich_text,
+    sanitize_rich_text_html,
+    sanitize_with_parser,
+    sanitize_with_tokenizer,
+)
+
+FRAGMENTS = [
+    "<p>", "</p>", "<P >", "<br>", "<br/>", "<br />", "</br>", "<strong>", "</strong>", "<em>", "</em>",
+    "<ul>", "<ol>", "<li>", "</li>", "</ul>", "<h2>", "</h2>", "<h3 class=lead>", "<blockquote>", "</blockquote>",
+    "<div>", "</div>", "<span style='color:red'>", "<img src=x onerror=alert(1)>", "<p/>",
+    '<a href="https://example.com/?a=1&amp;b=2">', "<a href='javascript:alert(1)'>", "<a HREF=/local target=_blank>",
+    '<a href="#top" rel="nofollow bogus" target="_blank">', "<a href=x/>", '<a title="a>b" href="mailto:a@b.com">',
+    "<a\n href='https://q.example'\n>", '<a href="">', "<a href>", "</a>",
+    "Text", " ", "\n", "\n\n", "&amp;", "&lt;", "&nbsp;", "&copy", "&#39;", "&bogus;", "& ", '"', "'", ">", "café",
+    "<", "< ", "<3", "<=", "<!-- note -->", "<!DOCTYPE html>", "<?xml?>", "<script>x<p>y</script>", "<style>p{}</style>",
+    "</ p>", "</>", "<p\xa0>", "<a b=c=d>", '<a href=x"y>', "<a/href=x>", "<br/ >", "</strong >", "<x:y>", "&#",
+]
+
+
+class SanitizerEngineTests(SimpleTestCase):
+    """The tokenizer must render byte-for-byte what the HTMLParser engine renders."""
+
+    def assert_same_as_parser(self, value):
+        expected = sanitize_with_parser(value)
+        fast = sanitize_with_tokenizer(value)
+        if fast is not None:
+            self.assertEqual(fast, expected, repr(value))
+        self.assertEqual(sanitize_rich_text_html(value), expected, repr(value))
+
+    def test_editor_markup_takes_the_tokenizer(self):
+        value = (
+            '<h2>Aftercare</h2><p>Rinse &amp; rest, see <a href="https://example.com/?a=1&amp;b=2" '
+            'target="_blank">the guide</a>.<br>Call us <em>any</em> time &lt;3</p>'
+            "<ul><li>Soft food</li><li>No straws <span>today</span></li></ul>"
+        )
+
+        self.assertEqual(
+            sanitize_with_tokenizer(value),
+            '<h2>Aftercare</h2><p>Rinse &amp; rest, see <a href="https://example.com/?a=1&amp;b=2" '
+            'target="_blank" rel="noopener noreferrer">the guide</a>.<br>Call us <em>any</em> time &lt;3</p>'
+            "<ul><li>Soft food</li><li>No straws today</li></ul>",
+        )
+        self.assert_same_as_parser(value)
+
+    def test_unmodelled_markup_falls_back_to_parser(self):
+        for value in ("<p>a<!-- b --></p>", "<p>x<script>alert(1)</script></p>", "<p>tail <", "<p\xa0>odd</p>"):
+            with self.subTest(value=value):
+                self.assertIsNone(sanitize_with_tokenizer(value))
+                self.assert_same_as_parser(value)
+
+    def test_each_fragment_in_context(self):
+        for fragment in FRAGMENTS:
+            with self.subTest(fragment=fragment):
+                self.assert_same_as_parser(f"<p>lead {fragment} tail</p>")
+
+    def test_random_documents_match_parser(self):
+        rng = random.Random(20260420)
+        for _ in range(3000):
+            value = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 14)))
+            self.assert_same_as_parser(value)
+
+    def test_plain_text_skips_html_detection(self):
+        self.assertEqual(normalize_rich_text("One & two\n\nThree < four"), "<p>One &amp; two</p><p>Three &lt; four</p>")
@@ -0,0 +1,58 @@
+import os
+import sys
+import time as clock
+from unittest import skipUnless
+
+from django.test import TestCase
+
+from apps.public.models import BlogPost
+from apps.public.richtext import normalize_rich_text, sanitize_with_parser, sanitize_with_tokenizer
+
+SYNTHETIC_BYTES = 2_000_000
+MIN_SPEEDUP = 2.0
+SYNTHETIC_SECTION = (
+    "<h2>Aftercare</h2><p>Brushing twice a day &amp; flossing <strong>matters</strong>, see "
+    '<a href="https://example.com/guide?x=1&amp;y=2" target="_blank">our guide</a>.<br>'
+    "Keep to <em>soft food</em> for a day and call if it's still sore.</p>"
+    "<ul><li>Rinse gently</li><li>No straws &nbsp; today</li></ul><blockquote>Ask us anything.</blockquote>\n"
+)
+
+
+def throughput(sanitize, value, rounds=3):
+    """Best-of-`rounds` throughput in MB/s."""
+    size = len(value.encode())
+    best = float("inf")
+    for _ in range(rounds):
+        started = clock.perf_counter()
+        sanitize(value)
+        best = min(best, clock.perf_counter() - started)
+    return size / best / 1_000_000
+
+
+@skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run benchmarks")
+class RichTextSanitizerBenchmark(TestCase):
+    """Compares the tokenizer against the HTMLParser engine on large articles."""
+
+    def compare(self, label, value):
+        self.assertEqual(sanitize_with_tokenizer(value), sanitize_with_parser(value))
+        parser_rate = throughput(sanitize_with_parser, value)
+        tokenizer_rate = throughput(sanitize_with_tokenizer, value)
+        sys.stderr.write(
+            f"\n{label}: parser {parser_rate:.2f} MB/s, tokenizer {tokenizer_rate:.2f} MB/s "
+            f"({tokenizer_rate / parser_rate:.1f}x)"
+        )
+        return tokenizer_rate / parser_rate
+
+    def test_synthetic_article(self):
+        value = SYNTHETIC_SECTION * (SYNTHETIC_BYTES // len(SYNTHETIC_SECTION))
+
+        self.assertGreater(self.compare("synthetic", value), MIN_SPEEDUP)
+
+    def test_seeded_articles(self):
+        # Stored bodies are what the staff form saves: the seeded plain text turned into paragraphs.
+        bodies = [normalize_rich_text(body) for body in BlogPost.objects.values_list("body", flat=True)]
+        self.assertTrue(bodies)
+        value = "".join(bodies)
+        value *= SYNTHETIC_BYTES // len(value)
+
+        self.assertGreater(self.compare("seeded", value), MIN_SPEEDUP)
@@ -1,17 +1,35 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
 from unittest.mock import patch
 
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.messages import get_messages
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.middleware.csrf import get_token
+from django.shortcuts import render
 from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
-from apps.public.models import BlogPost, SiteContent, Testimonial
+from apps.public import views
+from apps.public.models import BlogPost, OutboundEmail, SiteContent, Testimonial
+from apps.public.page_cache import NAMESPACE_BLOG, invalidate_public_pages
+from apps.public.richtext import RICH_TEXT_RENDER_VERSION
+from apps.public.views import get_site_content
 
 @override_settings(
     DEFAULT_FROM_EMAIL="clinic@test.com",
     CONTACT_EMAIL="owner@test.com",
 )
 class PublicPageSmokeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
     def test_public_pages_load(self):
         urls = [
             reverse("home"),
@@ -25,8 +43,7 @@ class PublicPageSmokeTests(TestCase):
             response = self.client.get(url)
             self.assertEqual(response.status_code, 200, url)
 
-    @patch("apps.public.views.EmailMessage.send", return_value=1)
-    def test_contact_form_success_redirects_with_message(self, _send):
+    def test_contact_form_success_redirects_with_message(self):
         response = self.client.post(
             reverse("contact"),
             {
@@ -42,6 +59,16 @@ class PublicPageSmokeTests(TestCase):
         messages = [m.message for m in get_messages(response.wsgi_request)]
         self.assertIn("Your message has been sent.", messages)
 
+        # Queued for the outbox worker rather than sent inside the request.
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.subject, "Inquiry")
+        self.assertEqual(queued.from_email, "clinic@test.com")
+        self.assertEqual(queued.to, ["owner@test.com"])
+        self.assertEqual(queued.reply_to, ["test@example.com"])
+        self.assertIn("Hello from the smoke test.", queued.body)
+        self.assertEqual(queued.status, OutboundEmail.Status.PENDING)
+
     def test_homepage_uses_site_content_values(self):
         SiteContent.objects.create(
             pk=1,
@@ -221,3 +248,200 @@ class PublicPageSmokeTests(TestCase):
         self.assertContains(detail_response, "<strong>guidance</strong>", html=False)
 
 
+
+
+class SiteContentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_repeat_reads_are_served_without_queries(self):
+        first = get_site_content()
+
+        with self.assertNumQueries(0):
+            second = get_site_content()
+            response = self.client.get(reverse("about"))
+
+        self.assertEqual(first.pk, 1)
+        self.assertEqual(second.pk, 1)
+        self.assertEqual(response.status_code, 200)
+
+    def test_save_and_delete_invalidate_every_reader(self):
+        content = get_site_content()
+        content.hero_title = "Edited Hero"
+        content.save()
+        self.assertEqual(get_site_content().hero_title, "Edited Hero")
+
+        # Another process sees the new version as well; simulate a stale
+        # memo of the old row.
+        stale = SiteContent.objects.get(pk=1)
+        stale.hero_title = "Stale Hero"
+        views._site_content_memo = ("old-version", stale)
+        self.assertEqual(get_site_content().hero_title, "Edited Hero")
+
+        SiteContent.objects.get(pk=1).delete()
+        self.assertEqual(get_site_content().hero_title, "We're Here for You. Dentistry That Understands.")
+
+    def test_blank_headings_are_filled_on_save(self):
+        content = SiteContent.objects.create(pk=1, contact_page_title="")
+        self.assertEqual(content.contact_page_title, "Contact Us")
+
+        content.services_page_title = ""
+        content.save(update_fields=["services_page_title"])
+        content.refresh_from_db()
+        self.assertEqual(content.services_page_title, "Our Treatments & Services")
+
+    def test_legacy_fix_up_migration(self):
+        SiteContent.objects.bulk_create([SiteContent(
+            pk=1,
+            hero_title="We're Here for You. <span>Dentistry That Understands.</span>",
+            hero_subtitle="Gentle careÃ¢â‚¬â€every visit",
+            clinic_landmarks="",
+        )])
+        migration = import_module("apps.public.migrations.0018_fix_legacy_site_content")
+
+        migration.fix_legacy_site_content(django_apps, None)
+
+        content = SiteContent.objects.get(pk=1)
+        self.assertEqual(content.hero_title, "We're Here for You. Dentistry That Understands.")
+        self.assertEqual(content.hero_subtitle, "Gentle care-every visit")
+        self.assertEqual(content.clinic_landmarks, SiteContent.FALLBACK_DEFAULTS["clinic_landmarks"])
+
+
+class PublicPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_site_content()
+        self.post = BlogPost.objects.create(
+            title="Cached Post",
+            excerpt="Cached excerpt",
+            body="Cached body",
+            category=BlogPost.Category.ORTHODONTICS,
+            published_at=timezone.now() - timedelta(days=1),
+        )
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        for name, args in (("home", ()), ("about", ()), ("services", ()), ("blog", ()),
+                           ("blog_detail", (self.post.slug,))):
+            url = reverse(name, args=args)
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url, {"utm_source": "newsletter"})
+            self.assertEqual(second.status_code, 200, url)
+            self.assertEqual(second.content, first.content, url)
+
+    def test_blog_cache_varies_on_category(self):
+        other = BlogPost.objects.create(
+            title="Other Category Post",
+            excerpt="Other excerpt",
+            body="Other body",
+            category=BlogPost.Category.CLINIC_UPDATES,
+            published_at=timezone.now() - timedelta(days=1),
+        )
+        self.client.get(reverse("blog"))
+
+        response = self.client.get(reverse("blog"), {"category": BlogPost.Category.ORTHODONTICS})
+
+        self.assertContains(response, "Cached Post")
+        self.assertNotContains(response, other.title)
+
+    def test_content_changes_purge_dependent_pages_only(self):
+        self.client.get(reverse("home"))
+        self.client.get(reverse("about"))
+
+        Testimonial.objects.create(patient_name="Fresh Voice", quote="Lovely visit.")
+
+        self.assertContains(self.client.get(reverse("home")), "Fresh Voice")
+        with self.assertNumQueries(0):
+            self.client.get(reverse("about"))
+
+        self.assertContains(self.client.get(reverse("blog")), "Cached Post")
+        BlogPost.objects.filter(pk=self.post.pk).update(is_published=False)
+        # Queryset updates skip the model hook until someone purges the namespace.
+        self.assertContains(self.client.get(reverse("blog")), "Cached Post")
+        invalidate_public_pages(NAMESPACE_BLOG)
+        self.assertNotContains(self.client.get(reverse("blog")), "Cached Post")
+
+    def test_staff_and_pending_messages_bypass_cache(self):
+        self.client.get(reverse("about"))
+        staff = get_user_model().objects.create_user("pagestaff", password="pw", is_staff=True)
+
+        with patch.object(views, "get_site_content", wraps=views.get_site_content) as rendered:
+            self.client.force_login(staff)
+            self.client.get(reverse("about"))
+            self.client.logout()
+
+            self.client.cookies["messages"] = "pending"
+            self.client.get(reverse("about"))
+            del self.client.cookies["messages"]
+
+            self.client.get(reverse("about"))
+
+        self.assertEqual(rendered.call_count, 2)
+
+    def test_pages_that_set_a_cookie_are_not_stored(self):
+        def render_with_csrf(request, *args, **kwargs):
+            get_token(request)
+            return render(request, *args, **kwargs)
+
+        with patch.object(views, "render", side_effect=render_with_csrf):
+            first = self.client.get(reverse("about"))
+        # The cookie is added by CsrfViewMiddleware, after the view returned.
+        self.assertIn(settings.CSRF_COOKIE_NAME, first.cookies)
+
+        with patch.object(views, "get_site_content", wraps=views.get_site_content) as rendered:
+            self.client.get(reverse("about"))
+            self.client.get(reverse("about"))
+
+        self.assertEqual(rendered.call_count, 1)
+
+
+class BlogPostRenderedBodyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self, **extra):
+        return BlogPost.objects.create(
+            title=extra.pop("title", "Rendered Post"),
+            excerpt="Rendered excerpt",
+            body=extra.pop("body", "<p>Safe <script>alert(1)</script><strong>copy</strong></p>"),
+            published_at=timezone.now() - timedelta(days=1),
+            **extra,
+        )
+
+    def test_save_stores_sanitized_body(self):
+        post = self.create_post()
+
+        stored = BlogPost.objects.get(pk=post.pk)
+        self.assertEqual(stored.rendered_body_version, RICH_TEXT_RENDER_VERSION)
+        self.assertEqual(stored.rendered_body_html, "<p>Safe alert(1)<strong>copy</strong></p>")
+
+        stored.body = "First line\n\nSecond line"
+        stored.save(update_fields=["body"])
+        stored.refresh_from_db()
+        self.assertEqual(stored.rendered_body_html, "<p>First line</p><p>Second line</p>")
+
+    def test_detail_page_reads_stored_body_without_sanitizing(self):
+        post = self.create_post()
+
+        with patch("apps.public.models.normalize_rich_text") as normalize:
+            response = self.client.get(post.get_absolute_url())
+
+        normalize.assert_not_called()
+        self.assertContains(response, "<p>Safe alert(1)<strong>copy</strong></p>")
+
+    def test_stale_rows_fall_back_and_rerender_command_refreshes_them(self):
+        post = self.create_post()
+        fresh = self.create_post(title="Fresh Post", body="Already current")
+        BlogPost.objects.filter(pk=post.pk).update(rendered_body_html="<p>old</p>", rendered_body_version=0)
+
+        stale = BlogPost.objects.get(pk=post.pk)
+        self.assertEqual(stale.rendered_body, "<p>Safe alert(1)<strong>copy</strong></p>")
+
+        out = StringIO()
+        call_command("rerender_blog_posts", stdout=out)
+
+        self.assertIn("Re-rendered 1 blog post(s).", out.getvalue())
+        stale.refresh_from_db()
+        self.assertEqual(stale.rendered_body_version, RICH_TEXT_RENDER_VERSION)
+        self.assertEqual(stale.rendered_body_html, "<p>Safe alert(1)<strong>copy</strong></p>")
+        self.assertEqual(BlogPost.objects.get(pk=fresh.pk).rendered_body_html, "<p>Already current</p>")
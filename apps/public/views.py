@@ -2,18 +2,55 @@ import logging
 
 from django.conf import settings
 from django.contrib import messages
-from django.core.mail import EmailMessage
+from django.core.cache import cache
+from django.db import DatabaseError
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
 from .forms import ContactForm
-from .models import BlogPost, SiteContent, Testimonial
+from .page_cache import NAMESPACE_BLOG, NAMESPACE_SITE, NAMESPACE_TESTIMONIALS, cache_public_page
+from .models import SITE_CONTENT_CACHE, BlogPost, SiteContent, Testimonial
+from .outbox import enqueue_email
 
 logger = logging.getLogger(__name__)
 
+SITE_CONTENT_TTL_SECONDS = 60 * 60 * 24
+
+# (version, SiteContent) last read by this process.
+_site_content_memo = (None, None)
+
 
 def get_site_content():
-    content, _ = SiteContent.objects.get_or_create(
+    """
+    The site content row, read through a per-process memo and the shared
+    cache. SiteContent.save/delete move the shared version on, so every
+    process reloads on its next request; a hit costs one cache lookup and
+    no query.
+    """
+    global _site_content_memo
+
+    version = SITE_CONTENT_CACHE.version()
+    memo_version, content = _site_content_memo
+    if version == memo_version:
+        return content
+
+    content = cache.get(SITE_CONTENT_CACHE.key("row", version=version))
+    if content is None:
+        # Stored under the version read before loading: a save that lands
+        # meanwhile moves the version on, so this copy is simply never used.
+        content, created = load_site_content()
+        if created:
+            # Our own insert moved the version on; this copy is that version.
+            version = SITE_CONTENT_CACHE.version()
+        cache.set(SITE_CONTENT_CACHE.key("row", version=version), content, SITE_CONTENT_TTL_SECONDS)
+
+    _site_content_memo = (version, content)
+    return content
+
+
+def load_site_content():
+    """Return (content, created), creating the row with its defaults on first use."""
+    return SiteContent.objects.get_or_create(
         pk=1,
         defaults={
             "hero_title": "We're Here for You. Dentistry That Understands.",
@@ -86,42 +123,19 @@ def get_site_content():
         },
     )
 
-    updated = False
-
-    if content.hero_title == "We're Here for You. <span>Dentistry That Understands.</span>":
-        content.hero_title = "We're Here for You. Dentistry That Understands."
-        updated = True
-
-    if "Ã¢â‚¬â€" in content.hero_subtitle:
-        content.hero_subtitle = content.hero_subtitle.replace("Ã¢â‚¬â€", "-")
-        updated = True
-
-    fallback_defaults = {
-        "services_page_title": "Our Treatments & Services",
-        "contact_page_title": "Contact Us",
-        "contact_form_heading": "Send Us a Message",
-        "clinic_landmarks": "Nathaniel's Water Station, Planas Tricycle Terminal Station, Gasoline Station",
-    }
-
-    for field_name, value in fallback_defaults.items():
-        if not getattr(content, field_name):
-            setattr(content, field_name, value)
-            updated = True
-
-    if updated:
-        content.save()
-
-    return content
-
 
 def get_published_testimonials():
     return Testimonial.objects.filter(is_published=True)
 
 
 def get_published_blog_posts():
-    return BlogPost.objects.filter(is_published=True, published_at__lte=timezone.now())
+    # Listings show title and excerpt only; leave the article bodies in the database.
+    return BlogPost.objects.filter(is_published=True, published_at__lte=timezone.now()).defer(
+        "body", "rendered_body_html"
+    )
 
 
+@cache_public_page(NAMESPACE_SITE, NAMESPACE_TESTIMONIALS, NAMESPACE_BLOG)
 def home(request):
     return render(
         request,
@@ -134,10 +148,12 @@ def home(request):
     )
 
 
+@cache_public_page(NAMESPACE_SITE)
 def about(request):
     return render(request, "public/pages/about.html", {"site_content": get_site_content()})
 
 
+@cache_public_page(NAMESPACE_SITE, NAMESPACE_BLOG, query_params=("category",))
 def blog(request):
     blog_posts = get_published_blog_posts()
     active_category = request.GET.get("category", "").strip()
@@ -160,6 +176,7 @@ def blog(request):
     )
 
 
+@cache_public_page(NAMESPACE_SITE, NAMESPACE_BLOG)
 def blog_detail(request, slug):
     post = get_object_or_404(
         BlogPost,
@@ -178,6 +195,7 @@ def blog_detail(request, slug):
     )
 
 
+@cache_public_page(NAMESPACE_SITE)
 def services(request):
     return render(request, "public/pages/services.html", {"site_content": get_site_content()})
 
@@ -194,16 +212,15 @@ def contact(request):
             )
 
             try:
-                email = EmailMessage(
+                # Queued, not sent: the outbox delivers (and retries) it outside the request.
+                enqueue_email(
                     subject=data["subject"],
                     body=body,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
                     to=[settings.CONTACT_EMAIL],
                     reply_to=[data["email"]],
                 )
-                email.send(fail_silently=False)
-            except Exception:
-                logger.exception("Contact form email send failed")
+            except DatabaseError:
+                logger.exception("Contact form email could not be queued")
                 messages.error(
                     request,
                     "We could not send your message right now. Please try again later.",
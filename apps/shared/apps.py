@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class SharedConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.shared"
+
+    def ready(self):
+        from .search import ensure_search_indexes
+
+        # Sent once per migrated app, so every model's index is checked.
+        post_migrate.connect(ensure_search_indexes, dispatch_uid="apps.shared.ensure_search_indexes")
@@ -0,0 +1,112 @@
+import uuid
+from urllib.parse import parse_qs, unquote, urlparse
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "dummy": "django.core.cache.backends.dummy.DummyCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "db": "django.core.cache.backends.db.DatabaseCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+}
+# Query parameters passed through to the backend's OPTIONS.
+CACHE_URL_OPTIONS = {"max_entries": ("MAX_ENTRIES", int), "cull_frequency": ("CULL_FREQUENCY", int)}
+
+
+def cache_config(url, key_prefix=""):
+    """
+    A CACHES entry from a cache URL, the way DATABASE_URL picks the database:
+
+    - ``file:///var/cache/dentist``: files under a directory, shared by every
+      worker on the host (the default outside tests)
+    - ``db://cache_table``: a table in the default database, shared by every
+      host using it (create it with ``manage.py createcachetable``)
+    - ``redis://host:6379/0`` or ``rediss://``: any Redis-protocol server
+      (Redis, Valkey, KeyDB); needs the ``redis`` package
+    - ``locmem://name`` and ``dummy://``: per-process and no-op caches
+
+    ``?timeout=``, ``?max_entries=`` and ``?cull_frequency=`` are honoured.
+    """
+    parsed = urlparse(url)
+    backend = CACHE_BACKENDS.get(parsed.scheme)
+    if backend is None:
+        raise ImproperlyConfigured(f"Unsupported cache URL scheme {parsed.scheme!r} in CACHE_URL.")
+
+    if parsed.scheme == "file":
+        location = unquote(parsed.netloc + parsed.path)
+    elif parsed.scheme == "db":
+        location = parsed.netloc or parsed.path.lstrip("/") or "django_cache"
+    elif parsed.scheme in ("redis", "rediss"):
+        location = parsed._replace(query="").geturl()
+    else:
+        location = parsed.netloc
+
+    config = {"BACKEND": backend, "LOCATION": location, "KEY_PREFIX": key_prefix}
+    options = {}
+    for name, values in parse_qs(parsed.query).items():
+        if name == "timeout":
+            config["TIMEOUT"] = int(values[-1])
+        elif name in CACHE_URL_OPTIONS:
+            option, parse = CACHE_URL_OPTIONS[name]
+            options[option] = parse(values[-1])
+    if options:
+        config["OPTIONS"] = options
+    return config
+
+
+class CacheNamespace:
+    """
+    A group of cache entries retired together. Keys carry the namespace's
+    current version token, so bump() invalidates every entry at once on
+    any backend without listing or deleting them; the old entries simply
+    expire.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.version_key = f"ns:{name}:version"
+
+    def __repr__(self):
+        return f"CacheNamespace({self.name!r})"
+
+    def version(self):
+        return namespace_versions([self])[0]
+
+    def key(self, *parts, version=None):
+        """Cache key for `parts` under the current (or the given) version."""
+        return ":".join([self.name, version or self.version(), *(str(part) for part in parts)])
+
+    def bump(self):
+        bump_namespaces(self)
+
+
+def namespace_versions(namespaces):
+    """Current version token of each namespace in one round trip, starting one where missing."""
+    keys = [namespace.version_key for namespace in namespaces]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, None)
+        # Re-read so concurrent starters settle on whichever token won.
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, "") for key in keys]
+
+
+def bump_namespaces(*namespaces):
+    """
+    Move the namespaces' versions on now and, inside a transaction, again
+    after commit, so an entry built from pre-commit data in between is
+    retired as well. Outside one there is nothing to wait for, and the
+    database is left untouched.
+    """
+    def bump():
+        cache.set_many({namespace.version_key: uuid.uuid4().hex for namespace in namespaces}, None)
+
+    bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
@@ -0,0 +1,39 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.shared.search import create_search_index
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute search documents and rebuild the search index for every model with a "
+        "search_document field. Run after any migration that rebuilds one of those tables."
+    )
+
+    def handle(self, *args, **options):
+        for model in apps.get_models():
+            if not hasattr(model, "refresh_search_document"):
+                continue
+
+            updated = 0
+            batch = []
+            with transaction.atomic():
+                for instance in model._default_manager.order_by("pk").iterator(chunk_size=BATCH_SIZE):
+                    if instance.refresh_search_document():
+                        batch.append(instance)
+                    if len(batch) >= BATCH_SIZE:
+                        model._default_manager.bulk_update(batch, ["search_document"])
+                        updated += len(batch)
+                        batch = []
+                if batch:
+                    model._default_manager.bulk_update(batch, ["search_document"])
+                    updated += len(batch)
+
+                create_search_index(connection, model._meta.db_table, model._meta.pk.column)
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{model._meta.label}: {updated} document(s) updated, index rebuilt."
+            ))
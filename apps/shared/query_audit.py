@@ -0,0 +1,59 @@
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.db import connection
+
+_PLACEHOLDER_LIST = re.compile(r"\bIN \(%s(?:\s*,\s*%s)*\)")
+_WHITESPACE = re.compile(r"\s+")
+_IGNORED_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK", "BEGIN", "COMMIT", "INSERT")
+
+
+def query_pattern(sql):
+    """SQL with IN-lists collapsed, so one filter/order combination is one pattern."""
+    return _WHITESPACE.sub(" ", _PLACEHOLDER_LIST.sub("IN (%s, ...)", sql)).strip()
+
+
+class QueryPatternRecorder:
+    """
+    Execute wrapper that groups the SELECT/UPDATE/DELETE statements run
+    while active by pattern, keeping the first concrete parameters of each
+    so the query can be EXPLAINed afterwards.
+    """
+
+    def __init__(self):
+        self.patterns = OrderedDict()
+        self.label = ""
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(_IGNORED_PREFIXES):
+            pattern = query_pattern(sql)
+            entry = self.patterns.setdefault(pattern, {
+                "sql": sql,
+                "params": params,
+                "count": 0,
+                "sources": [],
+            })
+            entry["count"] += 1
+            if self.label and self.label not in entry["sources"]:
+                entry["sources"].append(self.label)
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def recording(self, label):
+        self.label = label
+        with connection.execute_wrapper(self):
+            yield self
+
+
+def explain(sql, params):
+    """The database's query plan for one statement, as text lines."""
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+
+    if connection.vendor == "sqlite":
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [" ".join(str(column) for column in row) for row in rows]
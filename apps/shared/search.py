@@ -0,0 +1,165 @@
+import logging
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+# The trigram tokenizer cannot match terms shorter than this.
+MIN_TRIGRAM_LENGTH = 3
+
+
+def build_search_document(*parts) -> str:
+    """Case-folded, whitespace-collapsed text a row is searched by."""
+    return " ".join(" ".join(str(part).split()).casefold() for part in parts if part)
+
+
+def search_terms(query) -> list:
+    return (query or "").casefold().split()
+
+
+def search_index_table(model_or_table) -> str:
+    table = getattr(getattr(model_or_table, "_meta", None), "db_table", model_or_table)
+    return f"{table}_search"
+
+
+def filter_search(queryset, query):
+    """
+    Rows whose `search_document` contains every term of `query`.
+
+    SQLite answers from the FTS5 trigram table kept in sync by triggers;
+    PostgreSQL's LIKE is served by the pg_trgm GIN index. Terms too short
+    for trigrams fall back to a plain substring scan.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+
+    connection = connections[queryset.db]
+    if connection.vendor == "sqlite" and all(len(term) >= MIN_TRIGRAM_LENGTH for term in terms):
+        table = connection.ops.quote_name(search_index_table(queryset.model))
+        match = " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        return queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match]))
+
+    for term in terms:
+        queryset = queryset.filter(search_document__contains=term)
+    return queryset
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def create_search_index(connection, table, pk_column="id"):
+    """(Re)build the backend's search index over `table.search_document`."""
+    quote = connection.ops.quote_name
+    index_table = search_index_table(table)
+    pk = quote(pk_column)
+
+    if connection.vendor == "sqlite":
+        drop_search_index(connection, table)
+        fts, src = quote(index_table), quote(table)
+        _execute(connection, [
+            f"CREATE VIRTUAL TABLE {fts} USING fts5(search_document, "
+            f"content={src}, content_rowid={pk}, tokenize='trigram')",
+            f"CREATE TRIGGER {quote(index_table + '_ai')} AFTER INSERT ON {src} BEGIN "
+            f"INSERT INTO {fts}(rowid, search_document) VALUES (new.{pk}, new.search_document); END",
+            f"CREATE TRIGGER {quote(index_table + '_ad')} AFTER DELETE ON {src} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, search_document) "
+            f"VALUES ('delete', old.{pk}, old.search_document); END",
+            f"CREATE TRIGGER {quote(index_table + '_au')} AFTER UPDATE OF search_document ON {src} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, search_document) "
+            f"VALUES ('delete', old.{pk}, old.search_document); "
+            f"INSERT INTO {fts}(rowid, search_document) VALUES (new.{pk}, new.search_document); END",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ])
+    elif connection.vendor == "postgresql":
+        _execute(connection, [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            f"CREATE INDEX IF NOT EXISTS {quote(index_table + '_trgm')} "
+            f"ON {quote(table)} USING gin (search_document gin_trgm_ops)",
+        ])
+
+
+def search_index_installed(connection, table) -> bool:
+    """Whether the SQLite FTS table and all three sync triggers on `table` exist."""
+    index_table = search_index_table(table)
+    expected = {index_table, *(index_table + suffix for suffix in ("_ai", "_ad", "_au"))}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE tbl_name IN (%s, %s) AND type IN ('table', 'trigger')",
+            [index_table, table],
+        )
+        return expected <= {row[0] for row in cursor.fetchall()}
+
+
+def ensure_search_index(connection, table, pk_column="id") -> bool:
+    """
+    Install the search index over `table` if any part of it is missing,
+    rebuilding it from the table. Returns True when it had to.
+
+    SQLite drops a table's triggers when a migration remakes it (most
+    AddField/AlterField operations do), which would leave the index
+    silently stale; the post_migrate handler below calls this after every
+    migrate.
+    """
+    if connection.vendor == "sqlite" and search_index_installed(connection, table):
+        return False
+    create_search_index(connection, table, pk_column)
+    return connection.vendor == "sqlite"
+
+
+def ensure_search_indexes(app_config, using="default", **kwargs):
+    """post_migrate: put back the search index of each of the app's models with a search_document."""
+    connection = connections[using]
+    if connection.vendor not in ("sqlite", "postgresql"):
+        return
+
+    for model in app_config.get_models():
+        if not hasattr(model, "refresh_search_document"):
+            continue
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            if table not in connection.introspection.table_names(cursor):
+                continue
+            columns = {column.name for column in connection.introspection.get_table_description(cursor, table)}
+        # Migrated back to before the column existed.
+        if "search_document" not in columns:
+            continue
+        if ensure_search_index(connection, table, model._meta.pk.column):
+            logger.warning("Rebuilt the search index on %s; a migration had dropped its triggers.", table)
+
+
+def drop_search_index(connection, table):
+    quote = connection.ops.quote_name
+    index_table = search_index_table(table)
+
+    if connection.vendor == "sqlite":
+        _execute(connection, [
+            *(f"DROP TRIGGER IF EXISTS {quote(index_table + suffix)}" for suffix in ("_ai", "_ad", "_au")),
+            f"DROP TABLE IF EXISTS {quote(index_table)}",
+        ])
+    elif connection.vendor == "postgresql":
+        _execute(connection, [f"DROP INDEX IF EXISTS {quote(index_table + '_trgm')}"])
+
+
+def ranked_search(queryset, query):
+    """
+    `filter_search` ordered by relevance: rows whose document starts with
+    the first term (the name, for our documents) come before other matches.
+    """
+    terms = search_terms(query)
+    queryset = filter_search(queryset, query)
+    if not terms:
+        return queryset
+
+    return queryset.annotate(
+        search_rank=Case(
+            When(search_document__startswith=terms[0], then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    ).order_by("search_rank", "search_document")
@@ -0,0 +1,79 @@
+from django.db import connections, router
+
+
+def reserve_ids(model, count=1, using=None):
+    """
+    Reserve `count` primary keys for `model` before inserting, so columns
+    derived from the pk can be written in the same INSERT.
+
+    PostgreSQL draws from the table's own identity/serial sequence, which is
+    non-transactional, so reserved ids are never handed out twice. SQLite
+    continues the AUTOINCREMENT counter, so it only reserves inside an atomic
+    block: a no-op write to sqlite_sequence takes the database write lock
+    before the counter is read, and the transaction keeps it until the
+    caller has inserted. Returns an empty list when nothing can be reserved.
+    """
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    table = model._meta.db_table
+    pk_column = model._meta.pk.column
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+                [table, pk_column, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+        if connection.vendor == "sqlite":
+            if not connection.in_atomic_block:
+                return []
+            cursor.execute("UPDATE sqlite_sequence SET seq = seq WHERE name = %s", [table])
+            cursor.execute(
+                f"SELECT MAX("
+                f"COALESCE((SELECT seq FROM sqlite_sequence WHERE name = %s), 0), "
+                f"COALESCE((SELECT MAX({quote(pk_column)}) FROM {quote(table)}), 0))",
+                [table],
+            )
+            last_id = cursor.fetchone()[0]
+            return list(range(last_id + 1, last_id + 1 + count))
+
+    return []
+
+
+def advance_id_sequence(schema_editor, table, pk_column, minimum):
+    """Make sure the next generated pk for `table` is greater than `minimum`."""
+    connection = schema_editor.connection
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [table, pk_column])
+            sequence_name = cursor.fetchone()[0]
+            # pg_get_serial_sequence returns an already quoted, schema-qualified name.
+            cursor.execute(f"SELECT last_value FROM {sequence_name}")
+            if cursor.fetchone()[0] < minimum:
+                cursor.execute("SELECT setval(%s, %s)", [sequence_name, minimum])
+        elif connection.vendor == "sqlite":
+            cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, %s) WHERE name = %s", [minimum, table])
+            if not cursor.rowcount:
+                cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)", [table, minimum])
+
+
+def reserve_pk(instance, save_kwargs):
+    """
+    Give an unsaved, pk-less instance a reserved primary key and turn the
+    pending save into a single forced INSERT. Returns False when nothing was
+    reserved, leaving the save untouched.
+    """
+    if not instance._state.adding or instance.pk is not None:
+        return False
+
+    reserved = reserve_ids(type(instance), using=save_kwargs.get("using"))
+    if not reserved:
+        return False
+
+    instance.pk = reserved[0]
+    save_kwargs["force_insert"] = True
+    return True
@@ -0,0 +1,155 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+from unittest import skipUnless
+
+import django
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.shared.cache import CacheNamespace, cache_config, namespace_versions
+
+SHARED = CacheNamespace("tests:shared")
+OTHER = CacheNamespace("tests:other")
+
+
+class CacheConfigTests(SimpleTestCase):
+    def test_backends_from_url(self):
+        self.assertEqual(
+            cache_config("file:///var/cache/dentist?max_entries=5000&timeout=600", key_prefix="dentist"),
+            {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": "/var/cache/dentist",
+                "KEY_PREFIX": "dentist",
+                "TIMEOUT": 600,
+                "OPTIONS": {"MAX_ENTRIES": 5000},
+            },
+        )
+        self.assertEqual(cache_config("db://dentist_cache")["LOCATION"], "dentist_cache")
+        self.assertEqual(cache_config("db://")["LOCATION"], "django_cache")
+        self.assertEqual(cache_config("locmem://scratch")["LOCATION"], "scratch")
+
+        redis = cache_config("rediss://:secret@cache.internal:6380/2?timeout=30")
+        self.assertEqual(redis["BACKEND"], "django.core.cache.backends.redis.RedisCache")
+        self.assertEqual(redis["LOCATION"], "rediss://:secret@cache.internal:6380/2")
+        self.assertEqual(redis["TIMEOUT"], 30)
+
+    def test_unknown_scheme_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            cache_config("memcache://localhost:11211")
+
+
+class CacheNamespaceWithoutDatabaseTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_outside_a_transaction_does_not_touch_the_database(self):
+        # SimpleTestCase fails any database connection.
+        before = SHARED.version()
+        SHARED.bump()
+        self.assertNotEqual(SHARED.version(), before)
+
+
+class CacheNamespaceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_retires_only_its_namespace(self):
+        cache.set(SHARED.key("greeting"), "hello")
+        cache.set(OTHER.key("greeting"), "hi")
+
+        SHARED.bump()
+
+        self.assertIsNone(cache.get(SHARED.key("greeting")))
+        self.assertEqual(cache.get(OTHER.key("greeting")), "hi")
+
+    def test_bump_repeats_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            SHARED.bump()
+            during = SHARED.version()
+        self.assertNotEqual(SHARED.version(), during)
+
+    def test_versions_are_stable_until_bumped(self):
+        first = namespace_versions([SHARED, OTHER])
+        self.assertEqual(namespace_versions([SHARED, OTHER]), first)
+        self.assertEqual(SHARED.key("a", 1), f"tests:shared:{first[0]}:a:1")
+
+
+def cache_worker(index, cache_url, barrier, results):
+    """
+    One worker process's script; the barrier keeps every worker on the
+    same step, so reads in one step see the writes of the step before.
+    """
+    django.setup()
+    # Spawned workers inherit the test run's argv and with it the test
+    # settings; point them at the cache under test.
+    override_settings(CACHES={"default": cache_config(cache_url, key_prefix="dentist-test")}).enable()
+
+    barrier.wait()
+    SHARED.version()  # every worker races to start the namespace
+    barrier.wait()
+    results.put((index, "version", SHARED.version()))
+
+    if index == 0:
+        cache.set(SHARED.key("greeting"), "hello from worker 0")
+    barrier.wait()
+    results.put((index, "read", cache.get(SHARED.key("greeting"))))
+
+    barrier.wait()
+    if index == 1:
+        SHARED.bump()
+    barrier.wait()
+    results.put((index, "after bump", cache.get(SHARED.key("greeting"))))
+
+
+class MultiProcessCacheMixin:
+    """Runs worker processes against one shared cache, the way gunicorn workers see it."""
+
+    workers = 4
+
+    def cache_url(self):
+        raise NotImplementedError
+
+    def run_workers(self):
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(self.workers, timeout=60)
+        results = context.Queue()
+        cache_url = self.cache_url()
+        processes = [
+            context.Process(target=cache_worker, args=(index, cache_url, barrier, results))
+            for index in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        collected = {}
+        for _ in range(self.workers * 3):
+            index, step, value = results.get(timeout=120)
+            collected.setdefault(step, {})[index] = value
+        for process in processes:
+            process.join(timeout=30)
+            self.assertEqual(process.exitcode, 0)
+        return collected
+
+    def test_workers_share_versions_and_entries(self):
+        results = self.run_workers()
+
+        self.assertEqual(len(results["version"]), self.workers)
+        self.assertEqual(len(set(results["version"].values())), 1)
+        self.assertEqual(set(results["read"].values()), {"hello from worker 0"})
+        self.assertEqual(set(results["after bump"].values()), {None})
+
+
+class FileCacheMultiProcessTests(MultiProcessCacheMixin, SimpleTestCase):
+    def cache_url(self):
+        directory = tempfile.mkdtemp(prefix="dentist-cache-")
+        self.addCleanup(shutil.rmtree, directory, True)
+        return f"file://{directory}"
+
+
+@skipUnless(os.environ.get("TEST_REDIS_URL"), "set TEST_REDIS_URL to run against a Redis-compatible server")
+class RedisCacheMultiProcessTests(MultiProcessCacheMixin, SimpleTestCase):
+    def cache_url(self):
+        return os.environ["TEST_REDIS_URL"]
@@ -0,0 +1,55 @@
+from datetime import time, timedelta
+from unittest import skipUnless
+
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment
+from apps.appointments.selectors import search_appointments
+from apps.shared.search import ensure_search_index, search_index_installed
+
+TABLE = "website_appointment"
+
+
+@skipUnless(connection.vendor == "sqlite", "the sync triggers only exist on SQLite")
+class SearchIndexRepairTests(TestCase):
+    def book(self, name, hour):
+        return Appointment.objects.create(
+            name=name,
+            phone="09170000000",
+            date=timezone.localdate() + timedelta(days=3),
+            start_time=time(hour, 0),
+            timeslot="9:00 AM",
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+
+    def drop_triggers(self):
+        # What SQLite does to them when a migration remakes the table.
+        with connection.cursor() as cursor:
+            for suffix in ("_ai", "_ad", "_au"):
+                cursor.execute(f'DROP TRIGGER "{TABLE}_search{suffix}"')
+
+    def test_installed_index_is_left_alone(self):
+        self.assertTrue(search_index_installed(connection, TABLE))
+        self.assertFalse(ensure_search_index(connection, TABLE))
+
+    def test_post_migrate_puts_back_dropped_triggers_and_catches_up(self):
+        before = self.book("Prudencia Before", 9)
+        self.drop_triggers()
+        during = self.book("Prudencia During", 10)
+        self.assertFalse(search_index_installed(connection, TABLE))
+        self.assertEqual(list(search_appointments("prudencia")), [before])
+
+        with self.assertLogs("apps.shared.search", "WARNING") as logs:
+            emit_post_migrate_signal(verbosity=0, interactive=False, db="default")
+
+        self.assertIn(TABLE, "\n".join(logs.output))
+        self.assertTrue(search_index_installed(connection, TABLE))
+        after = self.book("Prudencia After", 11)
+        self.assertEqual(
+            {appointment.pk for appointment in search_appointments("prudencia")},
+            {before.pk, during.pk, after.pk},
+        )
@@ -0,0 +1,23 @@
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.patients.models import Patient
+from apps.shared.sequences import reserve_ids
+
+
+class ReserveIdsTests(TransactionTestCase):
+    def test_sqlite_takes_the_write_lock_before_reading_the_counter(self):
+        existing = Patient.objects.create(name="Existing", phone="555-0101")
+
+        with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+            reserved = reserve_ids(Patient, count=3)
+
+        self.assertEqual(reserved, [existing.pk + 1, existing.pk + 2, existing.pk + 3])
+        self.assertTrue(queries[0]["sql"].startswith("UPDATE sqlite_sequence"))
+
+    def test_sqlite_reserves_nothing_outside_a_transaction(self):
+        self.assertEqual(reserve_ids(Patient), [])
+
+        patient = Patient.objects.create(name="Outside", phone="555-0100")
+        self.assertEqual(patient.patient_code, f"PAT-{patient.pk:06d}")
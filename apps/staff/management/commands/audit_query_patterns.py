@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.appointments.availability import get_next_available_slots
+from apps.appointments.constants import CLINIC_SLOT_TIMES
+from apps.appointments.forms import StaffAppointmentForm
+from apps.shared.query_audit import QueryPatternRecorder, explain
+
+AUDIT_USERNAME = "__query_audit__"
+
+
+def staff_pages():
+    """(label, url, query params) for the staff pages whose queries we audit."""
+    return [
+        ("dashboard", reverse("dashboard:home"), {}),
+        ("dashboard chart (month)", reverse("dashboard:appointments_chart"), {"ap_view": "month"}),
+        ("appointments", reverse("dashboard:appointments"), {}),
+        ("appointments search", reverse("dashboard:appointments"), {"q": "ana"}),
+        ("appointments history filter", reverse("dashboard:appointments"), {"history_status": "completed"}),
+        ("patients", reverse("dashboard:patients"), {}),
+        ("patients search", reverse("dashboard:patients"), {"q": "ana"}),
+        ("patient queue scroll", reverse("dashboard:patients_queue"), {"sort": "newest"}),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the staff pages and booking helpers against the current database, record "
+        "every filter/order pattern they execute, and print each with its query plan. "
+        "Runs in a rolled-back transaction with caching disabled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--no-explain", action="store_true", help="List patterns without query plans.")
+
+    def handle(self, *args, **options):
+        recorder = QueryPatternRecorder()
+        host = next((h for h in settings.ALLOWED_HOSTS if "*" not in h), "localhost").lstrip(".")
+        dummy_cache = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+        with override_settings(CACHES=dummy_cache), transaction.atomic():
+            user = get_user_model().objects.create_user(AUDIT_USERNAME, is_staff=True)
+            client = Client(HTTP_HOST=host)
+            client.force_login(user)
+
+            for label, url, params in staff_pages():
+                with recorder.recording(label):
+                    response = client.get(url, params, secure=True)
+                if response.status_code != 200:
+                    self.stderr.write(f"{label}: HTTP {response.status_code}")
+
+            with recorder.recording("next available slots"):
+                get_next_available_slots(timezone.now())
+            with recorder.recording("slot collision check"):
+                StaffAppointmentForm().slot_is_taken(timezone.localdate(), CLINIC_SLOT_TIMES[0])
+
+            self.report(recorder, explain_plans=not options["no_explain"])
+            transaction.set_rollback(True)
+
+    def report(self, recorder, explain_plans):
+        for number, (pattern, entry) in enumerate(recorder.patterns.items(), start=1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"#{number} x{entry['count']} [{', '.join(entry['sources'])}]"
+            ))
+            self.stdout.write(pattern)
+            if explain_plans and pattern.upper().startswith("SELECT"):
+                for line in explain(entry["sql"], entry["params"]):
+                    self.stdout.write(f"    {line}")
+        self.stdout.write(self.style.SUCCESS(f"{len(recorder.patterns)} distinct query pattern(s)."))
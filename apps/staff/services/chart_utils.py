@@ -1,6 +1,24 @@
-from datetime import date, timedelta
-from django.db.models import Count
-from apps.appointments.models import Appointment
+import hashlib
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+from apps.appointments.models import AppointmentDailyRollup
+
+CHART_VIEWS = {"day", "week", "month", "year"}
+CHART_CACHE_TTL_SECONDS = 60 * 60
+
+
+def _daily_counts(start: date, end: date):
+    """(date, appointments scheduled) pairs from the daily rollup, one row per day at most."""
+    return (
+        AppointmentDailyRollup.objects
+        .filter(date__range=(start, end))
+        .annotate(count=AppointmentDailyRollup.scheduled_total())
+        .values_list("date", "count")
+    )
 
 
 def _add_months(d: date, n: int) -> date:
@@ -10,14 +28,59 @@ def _add_months(d: date, n: int) -> date:
     return date(y, m, 1)
 
 
+def normalize_view_mode(view_mode: Optional[str]) -> str:
+    view_mode = (view_mode or "day").lower()
+    return view_mode if view_mode in CHART_VIEWS else "day"
+
+
+def chart_window(view_mode: str, base: date) -> Tuple[date, date]:
+    """First and last date a chart view covers; matches build_appointment_chart."""
+    view_mode = normalize_view_mode(view_mode)
+    if view_mode == "day":
+        return base - timedelta(days=6), base
+    if view_mode == "week":
+        return base - timedelta(days=27), base
+    if view_mode == "month":
+        last_month_start = base.replace(day=1)
+        return _add_months(last_month_start, -5), _add_months(last_month_start, 1) - timedelta(days=1)
+    return date(base.year - 5, 1, 1), date(base.year, 12, 31)
+
+
+def chart_data_version(view_mode: str, base: date) -> Tuple[str, Optional[datetime]]:
+    """
+    (version, last modified) for the rollup rows behind a chart. Every
+    counter update bumps its row's version in the same UPDATE, so the sum
+    over the window grows with each write whatever order they commit in;
+    updated_at is only used for Last-Modified.
+    """
+    start, end = chart_window(view_mode, base)
+    state = (
+        AppointmentDailyRollup.objects
+        .filter(date__range=(start, end))
+        .aggregate(last_modified=Max("updated_at"), days=Count("pk"), version=Sum("version"))
+    )
+    token = f"{normalize_view_mode(view_mode)}:{base.isoformat()}:{state['days']}:{state['version'] or 0}"
+    return hashlib.md5(token.encode()).hexdigest(), state["last_modified"]
+
+
+def get_cached_appointment_chart(view_mode: str, base: date, version: str):
+    """build_appointment_chart, cached per (view, base) for one data version."""
+    view_mode = normalize_view_mode(view_mode)
+    cache_key = f"staff:appointments-chart:{view_mode}:{base.isoformat()}:{version}"
+    return cache.get_or_set(
+        cache_key,
+        lambda: build_appointment_chart(view_mode, base),
+        CHART_CACHE_TTL_SECONDS,
+    )
+
+
 def build_appointment_chart(view_mode: str, base: date):
     """
     Core logic for building chart labels/values and navigation
     for daily / weekly / monthly / yearly appointment stats.
+    Reads the per-day rollup, so cost does not grow with appointment volume.
     """
-    view_mode = (view_mode or "day").lower()
-    if view_mode not in {"day", "week", "month", "year"}:
-        view_mode = "day"
+    view_mode = normalize_view_mode(view_mode)
 
     # ---------- DAY VIEW: last 7 days ----------
     if view_mode == "day":
@@ -25,13 +88,7 @@ def build_appointment_chart(view_mode: str, base: date):
         period_end = base
         period_start = period_end - timedelta(days=window_days - 1)
 
-        qs = (
-            Appointment.objects
-            .filter(date__range=(period_start, period_end))
-            .values("date")
-            .annotate(count=Count("id"))
-        )
-        counts_map = {row["date"]: row["count"] for row in qs}
+        counts_map = dict(_daily_counts(period_start, period_end))
 
         labels = []
         values = []
@@ -51,18 +108,17 @@ def build_appointment_chart(view_mode: str, base: date):
         period_end = base
         period_start = period_end - timedelta(days=days_window - 1)
 
-        qs = (
-            Appointment.objects
-            .filter(date__range=(period_start, period_end))
-            .values("date")
-        )
-
-        week_counts = [0] * weeks_window
-        for row in qs:
-            d = row["date"]
-            idx = (d - period_start).days // 7
-            if 0 <= idx < weeks_window:
-                week_counts[idx] += 1
+        # Weeks are counted back from `base`, not calendar weeks, so each
+        # bucket is a filtered SUM in a single aggregate row.
+        week_ranges = [
+            (period_start + timedelta(days=7 * i), period_start + timedelta(days=7 * i + 6))
+            for i in range(weeks_window)
+        ]
+        totals = AppointmentDailyRollup.objects.aggregate(**{
+            f"week_{i}": Sum(AppointmentDailyRollup.scheduled_total(), filter=Q(date__range=week_range))
+            for i, week_range in enumerate(week_ranges)
+        })
+        week_counts = [totals[f"week_{i}"] or 0 for i in range(weeks_window)]
 
         labels = [f"Week {i+1}" for i in range(weeks_window)]
         values = week_counts
@@ -81,17 +137,15 @@ def build_appointment_chart(view_mode: str, base: date):
         last_month_end = _add_months(last_month_start, 1) - timedelta(days=1)
 
         qs = (
-            Appointment.objects
+            AppointmentDailyRollup.objects
             .filter(date__range=(first_month_start, last_month_end))
-            .values("date")
+            .annotate(month=TruncMonth("date"))
+            .values("month")
+            .annotate(count=Sum(AppointmentDailyRollup.scheduled_total()))
+            .order_by()
         )
-
-        month_counts = [0] * months_window
-        for row in qs:
-            d = row["date"]
-            idx = (d.year - first_month_start.year) * 12 + (d.month - first_month_start.month)
-            if 0 <= idx < months_window:
-                month_counts[idx] += 1
+        counts_map = {row["month"]: row["count"] for row in qs}
+        month_counts = [counts_map.get(m, 0) for m in month_starts]
 
         labels = [m.strftime("%b") for m in month_starts]
         values = month_counts
@@ -107,10 +161,11 @@ def build_appointment_chart(view_mode: str, base: date):
         first_year = last_year - (years_window - 1)
 
         qs = (
-            Appointment.objects
-            .filter(date__year__gte=first_year, date__year__lte=last_year)
+            AppointmentDailyRollup.objects
+            .filter(date__range=(date(first_year, 1, 1), date(last_year, 12, 31)))
             .values("date__year")
-            .annotate(count=Count("id"))
+            .annotate(count=Sum(AppointmentDailyRollup.scheduled_total()))
+            .order_by()
         )
         counts_map = {row["date__year"]: row["count"] for row in qs}
 
@@ -1,57 +1,52 @@
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List
 
 from django.conf import settings
-from django.core.cache import cache
+from django.db.models import Q
 
-from apps.appointments.models import Appointment
-from .weather import client_ip, ip_for_query, weather_by_ip
+from apps.appointments.models import Appointment, LatestCompletedVisit
+from .pagination import APPOINTMENTS_BY_SCHEDULE, KeysetPage, keyset_paginate
+from .weather import client_ip, ip_for_query, weather_provider
 
+UPCOMING_PAGE_SIZE = 20
 
-def get_cached_weather(request, ttl_seconds: int = 300) -> Optional[Dict]:
+
+def get_cached_weather(request) -> Optional[Dict]:
     """
-    Weather for dashboard header, cached for ttl_seconds.
-    Cache key is based on ip_for_query(ip) so localhost/private IP becomes stable.
+    Weather for dashboard header, never waiting on WeatherAPI: the cached
+    reading (possibly stale) or None while the first one is fetched in the
+    background. Keyed on ip_for_query(ip) so localhost/private IP is stable.
     """
     if not settings.WEATHERAPI_KEY:
         return None
 
-    ip = client_ip(request)
-    q = ip_for_query(ip)
-    cache_key = f"weather:{q}"
-
-    wx = cache.get(cache_key)
-    if wx is None:
-        wx = weather_by_ip(ip)
-        if wx:
-            cache.set(cache_key, wx, ttl_seconds)
-    return wx
+    return weather_provider.get(ip_for_query(client_ip(request)))
 
 
 def get_latest_appointments(limit: int = 5) -> List[Appointment]:
     """
     Latest Patients widget (for now): show latest COMPLETED appointments.
-    De-dupe by (phone,email,name) so same person doesn't appear repeatedly.
+    One row per (phone, email, name) so the same person doesn't appear
+    repeatedly; reads the maintained LatestCompletedVisit table, so the
+    cost is bounded by `limit`, not by visit history.
     """
-    completed_qs = (
-        Appointment.objects
-        .filter(status=Appointment.STATUS_COMPLETED)
-        .order_by("-date", "-start_time", "-id")
+    visits = (
+        LatestCompletedVisit.objects
+        .select_related("appointment")
+        .order_by("-date", "-start_time", "-appointment_id")[:limit]
     )
+    return [visit.appointment for visit in visits]
+
 
-    latest: List[Appointment] = []
-    seen: set[Tuple[str, str, str]] = set()
-
-    for a in completed_qs:
-        key = (
-            (a.phone or "").strip(),
-            (a.email or "").strip(),
-            (a.name or "").strip().lower(),
-        )
-        if key in seen:
-            continue
-        seen.add(key)
-        latest.append(a)
-        if len(latest) >= limit:
-            break
-
-    return latest
+def get_upcoming_appointments(today, cursor: Optional[str] = None, limit: int = UPCOMING_PAGE_SIZE) -> KeysetPage:
+    """
+    Upcoming Appointments widget: confirmed and completed visits from
+    `today` on, in schedule order, one keyset page at a time so the
+    dashboard never walks the visit history.
+    """
+    return keyset_paginate(
+        Appointment.objects.filter(date__gte=today),
+        APPOINTMENTS_BY_SCHEDULE,
+        cursor,
+        limit,
+        partitions=[Q(status=Appointment.STATUS_CONFIRMED), Q(status=Appointment.STATUS_COMPLETED)],
+    )
@@ -0,0 +1,88 @@
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import CharField, Count, Q, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from apps.appointments.models import APPOINTMENTS_CACHE, Appointment
+
+METRICS_TTL_SECONDS = 60
+
+# Joins (name, phone, email) into one value for COUNT(DISTINCT ...); the
+# unit separator cannot appear in form input.
+IDENTITY_SEPARATOR = "\x1f"
+
+
+def pct_change(curr: int, prev: int) -> float:
+    if prev == 0:
+        return 100.0 if curr > 0 else 0.0
+    return round((curr - prev) * 100.0 / prev, 2)
+
+
+@dataclass(frozen=True)
+class DashboardMetrics:
+    patients_today: int
+    total_patients: int
+    requests_30: int
+    requests_prev30: int
+    upcoming_week: int
+    prev_week: int
+
+    @property
+    def requests_change(self) -> float:
+        """% change in booking requests vs the previous 30 days."""
+        return pct_change(self.requests_30, self.requests_prev30)
+
+    @property
+    def upcoming_change(self) -> float:
+        """% change of the coming 7 days vs the past 7 days."""
+        return pct_change(self.upcoming_week, self.prev_week)
+
+
+def metrics_cache_key(today) -> str:
+    return APPOINTMENTS_CACHE.key("dashboard-metrics", today.isoformat())
+
+
+def compute_dashboard_metrics(today=None, now=None) -> DashboardMetrics:
+    """All dashboard KPIs from a single conditional-aggregate query."""
+    today = today or timezone.localdate()
+    now = now or timezone.now()
+    last_30 = now - timedelta(days=30)
+    prev_30_start = now - timedelta(days=60)
+    next_7 = today + timedelta(days=7)
+    prev_7_start = today - timedelta(days=7)
+
+    identity = Concat(
+        "name", Value(IDENTITY_SEPARATOR), "phone", Value(IDENTITY_SEPARATOR), "email",
+        output_field=CharField(),
+    )
+
+    totals = Appointment.objects.aggregate(
+        patients_today=Count("pk", filter=Q(date=today)),
+        total_patients=Count(identity, distinct=True),
+        requests_30=Count("pk", filter=Q(created_at__gte=last_30)),
+        requests_prev30=Count("pk", filter=Q(created_at__gte=prev_30_start, created_at__lt=last_30)),
+        upcoming_week=Count("pk", filter=Q(date__gte=today, date__lte=next_7)),
+        prev_week=Count("pk", filter=Q(date__lt=today, date__gte=prev_7_start)),
+    )
+    return DashboardMetrics(**totals)
+
+
+def get_dashboard_metrics(ttl_seconds: int = METRICS_TTL_SECONDS) -> DashboardMetrics:
+    """
+    Dashboard KPIs, shared between staff for ttl_seconds or until the next
+    appointment write. The key includes the clinic-local date so "today"
+    figures never outlive midnight.
+    """
+    today = timezone.localdate()
+    cache_key = metrics_cache_key(today)
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return DashboardMetrics(**cached)
+
+    metrics = compute_dashboard_metrics(today=today)
+    cache.set(cache_key, asdict(metrics), ttl_seconds)
+    return metrics
@@ -0,0 +1,209 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence
+from urllib.parse import urlencode
+
+from django.db.models import F, Q
+
+
+class KeysetColumn(NamedTuple):
+    """One sort column; the last column of a list must be unique so every row has a distinct key."""
+
+    alias: str
+    expression: Any
+    descending: bool
+    parse: Callable[[str], Any]
+    # NULLs sort before every value, as in an ascending ORDER BY on SQLite.
+    nullable: bool = False
+
+
+APPOINTMENTS_BY_SCHEDULE: List[KeysetColumn] = [
+    KeysetColumn("seek_date", F("date"), False, date.fromisoformat),
+    KeysetColumn("seek_time", F("start_time"), False, time.fromisoformat, nullable=True),
+    KeysetColumn("seek_id", F("id"), False, int),
+]
+APPOINTMENTS_NEWEST_FIRST: List[KeysetColumn] = [
+    KeysetColumn("seek_date", F("date"), True, date.fromisoformat),
+    KeysetColumn("seek_time", F("start_time"), False, time.fromisoformat, nullable=True),
+    KeysetColumn("seek_id", F("id"), False, int),
+]
+
+PATIENTS_BY_LAST_VISIT: List[KeysetColumn] = [
+    KeysetColumn("seek_seen", F("stats__last_seen"), True, date.fromisoformat, nullable=True),
+    KeysetColumn("seek_name", F("name"), False, str),
+    KeysetColumn("seek_id", F("id"), False, int),
+]
+PATIENTS_NEWEST_FIRST: List[KeysetColumn] = [
+    KeysetColumn("seek_created", F("created_at"), True, datetime.fromisoformat),
+    KeysetColumn("seek_name", F("name"), False, str),
+    KeysetColumn("seek_id", F("id"), False, int),
+]
+PATIENTS_OLDEST_FIRST: List[KeysetColumn] = [
+    KeysetColumn("seek_created", F("created_at"), False, datetime.fromisoformat),
+    KeysetColumn("seek_name", F("name"), False, str),
+    KeysetColumn("seek_id", F("id"), False, int),
+]
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.prev_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+
+def encode_cursor(direction: str, values) -> str:
+    payload = [direction, [v.isoformat() if hasattr(v, "isoformat") else v for v in values]]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str], columns: Sequence[KeysetColumn]):
+    """Return (direction, key values) from a cursor token, or None if missing or malformed."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        direction, values = json.loads(raw)
+        if direction not in ("next", "prev") or len(values) != len(columns):
+            return None
+        return direction, [
+            None if value is None else column.parse(str(value)) for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        return None
+
+
+def _past(column: KeysetColumn, value, increasing: bool) -> Optional[Q]:
+    """Rows strictly past `value` in one column, or None when nothing can be."""
+    if increasing:
+        if value is None:
+            return Q(**{f"{column.alias}__isnull": False})
+        return Q(**{f"{column.alias}__gt": value})
+    if value is None:
+        return None
+    condition = Q(**{f"{column.alias}__lt": value})
+    if column.nullable:
+        condition |= Q(**{f"{column.alias}__isnull": True})
+    return condition
+
+
+def _not_before(column: KeysetColumn, value, increasing: bool) -> Q:
+    """Rows at or past `value` in one column."""
+    if value is None:
+        return Q() if increasing else Q(**{f"{column.alias}__isnull": True})
+    condition = Q(**{f"{column.alias}__{'gte' if increasing else 'lte'}": value})
+    if column.nullable and not increasing:
+        condition |= Q(**{f"{column.alias}__isnull": True})
+    return condition
+
+
+def _seek_filter(columns: Sequence[KeysetColumn], values, forward: bool) -> Q:
+    """
+    Rows strictly past `values` in the direction of travel: the row-value
+    comparison spelled out, plus a bound on the leading column alone so the
+    database starts its index walk at the cursor instead of filtering from
+    the first row.
+    """
+    condition = Q()
+    for index, column in enumerate(columns):
+        past = _past(column, values[index], column.descending != forward)
+        if past is None:
+            continue
+        # alias=None compiles to IS NULL.
+        condition |= Q(**{columns[i].alias: values[i] for i in range(index)}) & past
+    lead = columns[0]
+    return _not_before(lead, values[0], lead.descending != forward) & condition
+
+
+def _order_by(column: KeysetColumn, forward: bool):
+    if column.descending == forward:
+        return F(column.alias).desc(nulls_last=True if column.nullable else None)
+    return F(column.alias).asc(nulls_first=True if column.nullable else None)
+
+
+def _sort_rows(rows: list, columns: Sequence[KeysetColumn], forward: bool) -> None:
+    """Sort rows fetched by separate queries into the order one ORDER BY over `columns` gives."""
+    for column in reversed(columns):
+        rows.sort(
+            key=lambda row: (getattr(row, column.alias) is not None, getattr(row, column.alias)),
+            reverse=column.descending == forward,
+        )
+
+
+def keyset_paginate(
+    queryset,
+    columns: Sequence[KeysetColumn],
+    cursor: Optional[str],
+    per_page: int,
+    partitions: Optional[Sequence[Q]] = None,
+) -> KeysetPage:
+    """
+    Seek-paginate `queryset` over `columns`. Reads per_page + 1 rows and
+    never counts, so a deep page costs the same as the first one.
+
+    An IN-list on an index's leading column (status__in=...) makes the
+    database sort every matching row. Pass one filter per value as
+    `partitions` instead: each becomes its own index walk of per_page + 1
+    rows, and the walks are merged here.
+    """
+    queryset = queryset.annotate(**{column.alias: column.expression for column in columns})
+
+    decoded = decode_cursor(cursor, columns)
+    forward = decoded is None or decoded[0] == "next"
+    if decoded is not None:
+        queryset = queryset.filter(_seek_filter(columns, decoded[1], forward))
+
+    queryset = queryset.order_by(*(_order_by(column, forward) for column in columns))
+    if partitions:
+        rows = []
+        for partition in partitions:
+            rows.extend(queryset.filter(partition)[:per_page + 1])
+        _sort_rows(rows, columns, forward)
+    else:
+        rows = list(queryset[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage(rows)
+
+    def key(obj):
+        return [getattr(obj, column.alias) for column in columns]
+
+    more_after = has_more if forward else True
+    more_before = decoded is not None if forward else has_more
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor("next", key(rows[-1])) if more_after else None,
+        prev_cursor=encode_cursor("prev", key(rows[0])) if more_before else None,
+    )
+
+
+def cursor_querystring(params, cursor_param: str, cursor: Optional[str]) -> str:
+    """The current query parameters with `cursor_param` set to `cursor`."""
+    query = {key: value for key, value in params.items() if key != cursor_param and value}
+    if cursor:
+        query[cursor_param] = cursor
+    return urlencode(query)
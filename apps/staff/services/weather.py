@@ -1,6 +1,12 @@
 import ipaddress
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests as http_requests
 from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
 
 def client_ip(request):
     xff = request.META.get("HTTP_X_FORWARDED_FOR")
@@ -18,27 +24,120 @@ def ip_for_query(ip: str) -> str:
     except Exception:
         return "auto:ip"
 
+
+class WeatherProvider:
+    """
+    Stale-while-revalidate cache in front of WeatherAPI.
+
+    Readers never wait on the network: they get whatever is cached, fresh or
+    stale, and a missing or stale entry is refreshed on a small background
+    pool. Failures are cached too, for `negative_ttl`, so an outage costs
+    one request per interval instead of one per dashboard load. Entries stay
+    in the cache for `stale_ttl` so there is something to serve meanwhile.
+    In-flight refreshes are deduplicated per process only.
+    """
+
+    def __init__(self, ttl=300, negative_ttl=60, stale_ttl=60 * 60 * 24, timeout=5, max_workers=2, clock=time.time):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.clock = clock
+        self._session = None
+        self._executor = None
+        self._inflight = {}
+        self._lock = threading.RLock()
+
+    @property
+    def session(self):
+        # One pooled session per process, so refreshes reuse the TLS connection.
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = http_requests.Session()
+                    session.mount("https://", HTTPAdapter(pool_maxsize=self.max_workers))
+                    session.mount("http://", HTTPAdapter(pool_maxsize=self.max_workers))
+                    self._session = session
+        return self._session
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="weather-refresh")
+        return self._executor
+
+    def cache_key(self, q):
+        return f"weather:{q}"
+
+    def fetch(self, q):
+        """
+        Return {'temp_c','city','country'} via WeatherAPI, or None on failure.
+        """
+        try:
+            r = self.session.get(
+                settings.WEATHERAPI_URL,
+                params={"key": settings.WEATHERAPI_KEY, "q": q, "aqi": "no"},
+                timeout=self.timeout,
+            )
+            j = r.json()
+            if "current" in j and "location" in j:
+                return {
+                    "temp_c": round(j["current"]["temp_c"]),
+                    "city": j["location"]["name"],
+                    "country": j["location"]["country"],
+                }
+            return None
+        except Exception:
+            return None
+
+    def refresh(self, q):
+        """
+        Fetch now and store the result. A failure is stored for
+        `negative_ttl` and keeps the last good reading, if any, on offer.
+        """
+        key = self.cache_key(q)
+        value = self.fetch(q)
+        if value:
+            expires_at = self.clock() + self.ttl
+        else:
+            previous = cache.get(key)
+            value = previous["value"] if previous else None
+            expires_at = self.clock() + self.negative_ttl
+        cache.set(key, {"value": value, "expires_at": expires_at}, self.stale_ttl)
+        return value
+
+    def schedule_refresh(self, q):
+        """Queue a background refresh of `q` unless one is already running; returns its future."""
+        with self._lock:
+            future = self._inflight.get(q)
+            if future is not None and not future.done():
+                return future
+            future = self.executor.submit(self.refresh, q)
+            self._inflight[q] = future
+            future.add_done_callback(lambda done: self._forget(q, done))
+        return future
+
+    def _forget(self, q, future):
+        # Drop finished refreshes so one entry per client IP does not pile up.
+        with self._lock:
+            if self._inflight.get(q) is future:
+                del self._inflight[q]
+
+    def get(self, q):
+        entry = cache.get(self.cache_key(q))
+        if entry is None or entry["expires_at"] <= self.clock():
+            self.schedule_refresh(q)
+        return entry["value"] if entry else None
+
+
+weather_provider = WeatherProvider()
+
+
 def weather_by_ip(ip: str):
     """
     Return {'temp_c','city','country'} via WeatherAPI, or None on failure.
     """
-    try:
-        q = ip_for_query(ip)
-        r = http_requests.get(
-            "https://api.weatherapi.com/v1/current.json",
-            params={"key": settings.WEATHERAPI_KEY, "q": q, "aqi": "no"},
-            timeout=5,
-        )
-        j = r.json()
-        # Uncomment to see responses in console
-        # print("WX DEBUG:", {"ip": ip, "q": q, "status": r.status_code, "resp": j})
-        if "current" in j and "location" in j:
-            return {
-                "temp_c": round(j["current"]["temp_c"]),
-                "city": j["location"]["name"],
-                "country": j["location"]["country"],
-            }
-        return None
-    except Exception as e:
-        # print("WX ERROR:", e)
-        return None
\ No newline at end of file
+    return weather_provider.fetch(ip_for_query(ip))
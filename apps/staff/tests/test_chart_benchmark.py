@@ -0,0 +1,58 @@
+import os
+import time as clock
+from datetime import date, time, timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.appointments.models import Appointment, AppointmentDailyRollup
+from apps.staff.services.chart_utils import build_appointment_chart
+
+SEED_APPOINTMENTS = 500_000
+MAX_SECONDS_PER_CHART = 0.05
+MAX_ROWS_PER_CHART = 7
+
+
+@skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run benchmarks")
+class AppointmentChartBenchmark(TestCase):
+    """Seeds 500k appointments; chart cost must not depend on that volume."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.base = date(2026, 6, 30)
+        first_day = cls.base - timedelta(days=6 * 365)
+        days = (cls.base - first_day).days + 1
+
+        batch = []
+        for i in range(SEED_APPOINTMENTS):
+            batch.append(Appointment(
+                name=f"Bench {i}",
+                phone=f"0917{i:07d}",
+                date=first_day + timedelta(days=i % days),
+                start_time=time(9 + i % 9, 0),
+                timeslot="9:00 AM",
+                status=Appointment.STATUS_COMPLETED,
+                services=["Cleaning"],
+            ))
+            if len(batch) == 5000:
+                Appointment.objects.bulk_create(batch)
+                batch = []
+        Appointment.objects.bulk_create(batch)
+        AppointmentDailyRollup.objects.rebuild()
+
+    def test_every_view_is_bounded(self):
+        for view in ("day", "week", "month", "year"):
+            with self.subTest(view=view):
+                started = clock.perf_counter()
+                with CaptureQueriesContext(connection) as ctx:
+                    chart = build_appointment_chart(view, self.base)
+                elapsed = clock.perf_counter() - started
+
+                self.assertEqual(len(ctx.captured_queries), 1)
+                with connection.cursor() as cursor:
+                    cursor.execute(ctx.captured_queries[0]["sql"])
+                    self.assertLessEqual(len(cursor.fetchall()), MAX_ROWS_PER_CHART)
+                self.assertLess(elapsed, MAX_SECONDS_PER_CHART)
+                self.assertGreater(sum(chart["values"]), 0)
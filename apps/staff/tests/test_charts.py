@@ -0,0 +1,131 @@
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment, AppointmentDailyRollup
+from apps.staff.services.chart_utils import build_appointment_chart
+
+
+class AppointmentChartTests(TestCase):
+    def book(self, booking_date, hour, status=Appointment.STATUS_PENDING):
+        return Appointment.objects.create(
+            name="Chart Patient",
+            phone="09170000000",
+            email="chart@test.com",
+            date=booking_date,
+            start_time=time(hour, 0),
+            timeslot=f"{hour}:00",
+            status=status,
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+
+    def test_charts_read_only_the_rollup(self):
+        base = date(2026, 3, 31)
+        for booking_date, hour in [
+            (base, 9), (base, 10), (base - timedelta(days=6), 9),
+            (base - timedelta(days=20), 9), (date(2025, 12, 15), 9), (date(2023, 5, 1), 9),
+        ]:
+            self.book(booking_date, hour, status=Appointment.STATUS_COMPLETED)
+
+        with self.assertNumQueries(1) as ctx:
+            day_chart = build_appointment_chart("day", base)
+        self.assertNotIn("website_appointment", ctx.captured_queries[0]["sql"])
+        self.assertEqual(day_chart["values"], [1, 0, 0, 0, 0, 0, 2])
+
+        self.assertEqual(build_appointment_chart("week", base)["values"], [0, 1, 0, 3])
+        self.assertEqual(build_appointment_chart("month", base)["values"], [0, 0, 1, 0, 0, 4])
+        self.assertEqual(build_appointment_chart("year", base)["values"], [0, 0, 1, 0, 1, 4])
+
+
+@override_settings(WEATHERAPI_KEY="", SECURE_SSL_REDIRECT=False)
+class AppointmentChartEndpointCachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.staff = User.objects.create_user("staff", password="pass12345", is_staff=True)
+        self.client.login(username="staff", password="pass12345")
+        self.url = reverse("dashboard:appointments_chart")
+
+    def book(self, booking_date, hour):
+        return Appointment.objects.create(
+            name="Chart Patient",
+            phone="09170000000",
+            date=booking_date,
+            start_time=time(hour, 0),
+            timeslot=f"{hour}:00",
+            status=Appointment.STATUS_COMPLETED,
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+
+    def test_conditional_get_returns_304_until_window_changes(self):
+        day = timezone.localdate() - timedelta(days=2)
+        self.book(day, 9)
+        params = {"ap_view": "day"}
+
+        first = self.client.get(self.url, params)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.headers["ETag"])
+        self.assertIn("Last-Modified", first.headers)
+        self.assertIn("no-cache", first.headers["Cache-Control"])
+        self.assertIn("private", first.headers["Cache-Control"])
+
+        repeat = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=first.headers["ETag"])
+        self.assertEqual(repeat.status_code, 304)
+
+        self.book(day, 10)
+        changed = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=first.headers["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(changed.json()["values"][-3], 2)
+
+    def test_write_with_an_older_timestamp_still_changes_the_etag(self):
+        day = timezone.localdate() - timedelta(days=2)
+        self.book(day, 9)
+        params = {"ap_view": "day"}
+        first = self.client.get(self.url, params)
+
+        # A write that commits last but took its timestamp before the newest row's.
+        stamp = AppointmentDailyRollup.objects.get(date=day).updated_at
+        AppointmentDailyRollup.objects.apply(day, {"completed_count": 1})
+        AppointmentDailyRollup.objects.filter(date=day).update(updated_at=stamp)
+
+        changed = self.client.get(
+            self.url, params,
+            HTTP_IF_NONE_MATCH=first.headers["ETag"],
+            HTTP_IF_MODIFIED_SINCE=first.headers["Last-Modified"],
+        )
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()["values"][-3], 2)
+
+    def test_rebuild_changes_the_etag(self):
+        day = timezone.localdate() - timedelta(days=2)
+        self.book(day, 9)
+        params = {"ap_view": "day"}
+        first = self.client.get(self.url, params)
+
+        AppointmentDailyRollup.objects.rebuild()
+
+        again = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=first.headers["ETag"])
+        self.assertEqual(again.status_code, 200)
+
+    def test_closed_windows_are_cacheable_and_payload_is_reused(self):
+        params = {"ap_view": "month", "ap_start": "2024-03-15"}
+
+        with patch(
+            "apps.staff.services.chart_utils.build_appointment_chart",
+            wraps=build_appointment_chart,
+        ) as build:
+            first = self.client.get(self.url, params)
+            second = self.client.get(self.url, params)
+
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(first.json(), second.json())
+        self.assertIn("max-age=86400", first.headers["Cache-Control"])
+        self.assertIn("private", first.headers["Cache-Control"])
+        self.assertNotIn("Last-Modified", first.headers)
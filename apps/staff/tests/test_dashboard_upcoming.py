@@ -0,0 +1,117 @@
+import os
+import re
+import time as clock
+from datetime import time, timedelta
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.appointments.models import Appointment
+from apps.staff.services.dashboard import UPCOMING_PAGE_SIZE
+
+# The upcoming widget reads confirmed and completed visits as two index walks.
+DASHBOARD_QUERY_BUDGET = 7
+UPCOMING_ITEM_RE = re.compile(r'<div class="upcoming-item">')
+
+
+def seed_appointments(first_day, days, per_day, status=Appointment.STATUS_COMPLETED):
+    batch = [
+        Appointment(
+            name=f"Seeded {offset}-{slot}",
+            phone=f"0917{offset:04d}{slot:03d}",
+            date=first_day + timedelta(days=offset),
+            start_time=time(9 + slot, 0),
+            timeslot=time(9 + slot, 0).strftime("%I:%M %p").lstrip("0"),
+            status=status,
+            services=["Cleaning"],
+        )
+        for offset in range(days)
+        for slot in range(per_day)
+    ]
+    Appointment.objects.bulk_create(batch, batch_size=2000)
+
+
+@override_settings(WEATHERAPI_KEY="", SECURE_SSL_REDIRECT=False)
+class UpcomingAppointmentsWidgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+        staff = get_user_model().objects.create_user("upcomingstaff", password="pass12345", is_staff=True)
+        self.client.force_login(staff)
+
+    def test_dashboard_lists_only_future_confirmed_and_completed(self):
+        seed_appointments(self.today - timedelta(days=3), days=2, per_day=2)
+        seed_appointments(self.today + timedelta(days=1), days=1, per_day=1, status=Appointment.STATUS_CONFIRMED)
+        seed_appointments(self.today + timedelta(days=2), days=1, per_day=1, status=Appointment.STATUS_PENDING)
+
+        response = self.client.get(reverse("dashboard:home"))
+
+        self.assertEqual(len(UPCOMING_ITEM_RE.findall(response.content.decode())), 1)
+        self.assertContains(response, "Seeded 0-0")
+        self.assertNotContains(response, 'id="upcomingLoadMore"')
+
+    def test_load_more_walks_the_feed_in_schedule_order(self):
+        seed_appointments(self.today, days=4, per_day=8, status=Appointment.STATUS_CONFIRMED)
+
+        response = self.client.get(reverse("dashboard:home"))
+        first_page = response.context["upcoming"]
+        self.assertEqual(len(UPCOMING_ITEM_RE.findall(response.content.decode())), UPCOMING_PAGE_SIZE)
+        self.assertContains(response, 'id="upcomingLoadMore"')
+        self.assertEqual(first_page.object_list[-1].name, "Seeded 2-3")
+
+        data = self.client.get(reverse("dashboard:upcoming_appointments"), {"cursor": first_page.next_cursor}).json()
+
+        self.assertEqual(data["count"], 12)
+        self.assertEqual(len(UPCOMING_ITEM_RE.findall(data["html"])), 12)
+        self.assertLess(data["html"].index("Seeded 2-4"), data["html"].index("Seeded 3-0"))
+        self.assertIsNone(data["next_cursor"])
+
+    def test_dashboard_is_bounded_by_page_size_not_history(self):
+        seed_appointments(self.today - timedelta(days=400), days=400, per_day=5)
+        seed_appointments(self.today, days=60, per_day=5, status=Appointment.STATUS_CONFIRMED)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("dashboard:home"))
+
+        self.assertEqual(len(UPCOMING_ITEM_RE.findall(response.content.decode())), UPCOMING_PAGE_SIZE)
+        self.assertLessEqual(len(ctx.captured_queries), DASHBOARD_QUERY_BUDGET)
+
+
+@skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run benchmarks")
+@override_settings(WEATHERAPI_KEY="", SECURE_SSL_REDIRECT=False)
+class UpcomingAppointmentsBenchmark(TestCase):
+    """Seeds ten years of visits; the widget's cost must not grow with them."""
+
+    MAX_SECONDS_PER_PAGE = 0.05
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        seed_appointments(today - timedelta(days=3650), days=3650, per_day=8)
+        seed_appointments(today, days=365, per_day=8, status=Appointment.STATUS_CONFIRMED)
+
+    def test_first_and_later_pages_are_bounded(self):
+        staff = get_user_model().objects.create_user("benchstaff", password="pass12345", is_staff=True)
+        self.client.force_login(staff)
+
+        response = self.client.get(reverse("dashboard:home"))
+        self.assertEqual(len(UPCOMING_ITEM_RE.findall(response.content.decode())), UPCOMING_PAGE_SIZE)
+
+        cursor = response.context["upcoming"].next_cursor
+        for _ in range(5):
+            started = clock.perf_counter()
+            with CaptureQueriesContext(connection) as ctx:
+                data = self.client.get(reverse("dashboard:upcoming_appointments"), {"cursor": cursor}).json()
+            elapsed = clock.perf_counter() - started
+
+            self.assertEqual(data["count"], UPCOMING_PAGE_SIZE)
+            # session, user, and one index walk each for confirmed and completed
+            self.assertLessEqual(len(ctx.captured_queries), 4)
+            self.assertLess(elapsed, self.MAX_SECONDS_PER_PAGE)
+            cursor = data["next_cursor"]
@@ -0,0 +1,113 @@
+from datetime import time, timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment
+from apps.staff.services.dashboard import get_latest_appointments
+from apps.staff.services.metrics import (
+    compute_dashboard_metrics,
+    get_dashboard_metrics,
+    metrics_cache_key,
+)
+
+
+class DashboardMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+
+    def book(self, day, hour, name="Metric Patient", phone="09170000000", email="metric@test.com", created_days_ago=0):
+        appointment = Appointment.objects.create(
+            name=name,
+            phone=phone,
+            email=email,
+            date=day,
+            start_time=time(hour, 0),
+            timeslot=f"{hour}:00",
+            status=Appointment.STATUS_COMPLETED,
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+        if created_days_ago:
+            Appointment.objects.filter(pk=appointment.pk).update(
+                created_at=timezone.now() - timedelta(days=created_days_ago)
+            )
+        return appointment
+
+    def test_single_query_matches_individual_counts(self):
+        self.book(self.today, 9)
+        self.book(self.today, 10, name="Other", phone="09170000001")
+        self.book(self.today + timedelta(days=3), 9, created_days_ago=40)
+        self.book(self.today - timedelta(days=2), 9, created_days_ago=45)
+        self.book(self.today - timedelta(days=20), 9, name="Old", created_days_ago=90)
+
+        with self.assertNumQueries(1):
+            metrics = compute_dashboard_metrics()
+
+        self.assertEqual(metrics.patients_today, Appointment.objects.filter(date=self.today).count())
+        self.assertEqual(
+            metrics.total_patients,
+            Appointment.objects.values("name", "phone", "email").distinct().count(),
+        )
+        self.assertEqual(metrics.requests_30, 2)
+        self.assertEqual(metrics.requests_prev30, 2)
+        self.assertEqual(metrics.upcoming_week, 3)
+        self.assertEqual(metrics.prev_week, 1)
+        self.assertEqual(metrics.requests_change, 0.0)
+        self.assertEqual(metrics.upcoming_change, 200.0)
+
+    def test_metrics_are_cached_per_clinic_day(self):
+        self.book(self.today, 9)
+        first = get_dashboard_metrics()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_dashboard_metrics(), first)
+
+        tomorrow = self.today + timedelta(days=1)
+        with patch("apps.staff.services.metrics.timezone.localdate", return_value=tomorrow):
+            with self.assertNumQueries(1):
+                get_dashboard_metrics()
+
+        self.assertIsNotNone(cache.get(metrics_cache_key(tomorrow)))
+
+    def test_appointment_writes_retire_cached_metrics(self):
+        appointment = self.book(self.today, 9)
+        self.assertEqual(get_dashboard_metrics().patients_today, 1)
+
+        self.book(self.today, 10, name="Walk-in", phone="09170000009")
+        self.assertEqual(get_dashboard_metrics().patients_today, 2)
+
+        appointment.delete()
+        self.assertEqual(get_dashboard_metrics().patients_today, 1)
+
+
+class LatestAppointmentsWidgetTests(TestCase):
+    def test_latest_appointments_dedupes_with_one_bounded_query(self):
+        today = timezone.localdate()
+        for index in range(12):
+            Appointment.objects.create(
+                name=f"Patient {index % 7}",
+                phone=f"0917000000{index % 7}",
+                email="",
+                date=today - timedelta(days=index // 2),
+                start_time=time(9 + index % 2, 0),
+                timeslot="9:00 AM",
+                status=Appointment.STATUS_COMPLETED,
+                services=[APPOINTMENT_SERVICES[0]],
+            )
+
+        # Reference: the original scan over every completed appointment.
+        expected, seen = [], set()
+        for appointment in Appointment.objects.filter(status=Appointment.STATUS_COMPLETED).order_by("-date", "-start_time", "-id"):
+            key = (appointment.phone.strip(), appointment.email.strip(), appointment.name.strip().lower())
+            if key not in seen:
+                seen.add(key)
+                expected.append(appointment.pk)
+
+        with self.assertNumQueries(1):
+            latest = get_latest_appointments(limit=5)
+
+        self.assertEqual([appointment.pk for appointment in latest], expected[:5])
@@ -0,0 +1,251 @@
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import F, Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment
+from apps.patients.models import Patient
+from apps.staff.services.pagination import (
+    APPOINTMENTS_BY_SCHEDULE,
+    APPOINTMENTS_NEWEST_FIRST,
+    keyset_paginate,
+)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        today = timezone.localdate()
+        for index in range(13):
+            Appointment.objects.create(
+                name=f"Keyset {index}",
+                phone="09170000000",
+                date=today - timedelta(days=index % 4),
+                start_time=None if index == 5 else time(9 + index % 3, 0),
+                timeslot="9:00 AM",
+                status=Appointment.STATUS_COMPLETED,
+                services=[APPOINTMENT_SERVICES[0]],
+            )
+
+    def walk(self, columns, per_page, partitions=None):
+        pages, cursor = [], None
+        while True:
+            page = keyset_paginate(Appointment.objects.all(), columns, cursor, per_page, partitions)
+            pages.append(page)
+            if not page.has_next:
+                return pages
+            cursor = page.next_cursor
+
+    def test_forward_walk_matches_full_ordering(self):
+        cases = [
+            (APPOINTMENTS_BY_SCHEDULE, ["date", "start_time", "id"]),
+            (APPOINTMENTS_NEWEST_FIRST, ["-date", "start_time", "id"]),
+        ]
+        for columns, ordering in cases:
+            with self.subTest(ordering=ordering):
+                expected = list(Appointment.objects.order_by(*ordering).values_list("pk", flat=True))
+                pages = self.walk(columns, per_page=4)
+
+                self.assertEqual([a.pk for page in pages for a in page], expected)
+                self.assertEqual([len(page) for page in pages], [4, 4, 4, 1])
+                self.assertFalse(pages[0].has_previous)
+
+    def test_prev_cursor_returns_the_previous_page(self):
+        pages = self.walk(APPOINTMENTS_NEWEST_FIRST, per_page=4)
+
+        back = keyset_paginate(Appointment.objects.all(), APPOINTMENTS_NEWEST_FIRST, pages[2].prev_cursor, 4)
+        self.assertEqual([a.pk for a in back], [a.pk for a in pages[1]])
+        self.assertTrue(back.has_next and back.has_previous)
+
+        first = keyset_paginate(Appointment.objects.all(), APPOINTMENTS_NEWEST_FIRST, back.prev_cursor, 4)
+        self.assertEqual([a.pk for a in first], [a.pk for a in pages[0]])
+        self.assertFalse(first.has_previous)
+
+    def test_missing_start_times_page_across_the_boundary(self):
+        day = timezone.localdate() - timedelta(days=1)
+        for index in range(5):
+            Appointment.objects.create(
+                name=f"Untimed {index}",
+                phone="09170000000",
+                date=day,
+                start_time=None,
+                timeslot="Walk-in",
+                status=Appointment.STATUS_COMPLETED,
+                services=[APPOINTMENT_SERVICES[0]],
+            )
+        cases = [
+            (APPOINTMENTS_BY_SCHEDULE, [F("date").asc(), F("start_time").asc(nulls_first=True), "id"]),
+            (APPOINTMENTS_NEWEST_FIRST, [F("date").desc(), F("start_time").asc(nulls_first=True), "id"]),
+        ]
+        for columns, ordering in cases:
+            with self.subTest(descending=columns[0].descending):
+                expected = list(Appointment.objects.order_by(*ordering).values_list("pk", flat=True))
+                pages = self.walk(columns, per_page=3)
+                self.assertEqual([a.pk for page in pages for a in page], expected)
+
+                back = keyset_paginate(Appointment.objects.all(), columns, pages[3].prev_cursor, 3)
+                self.assertEqual([a.pk for a in back], [a.pk for a in pages[2]])
+
+    def test_partitions_merge_into_one_ordering(self):
+        every_third = list(Appointment.objects.order_by("pk").values_list("pk", flat=True))[::3]
+        Appointment.objects.filter(pk__in=every_third).update(status=Appointment.STATUS_CANCELLED)
+        partitions = [Q(status=Appointment.STATUS_CANCELLED), Q(status=Appointment.STATUS_COMPLETED)]
+        expected = list(Appointment.objects.order_by("-date", "start_time", "id").values_list("pk", flat=True))
+
+        with self.assertNumQueries(2):
+            keyset_paginate(Appointment.objects.all(), APPOINTMENTS_NEWEST_FIRST, None, 4, partitions)
+        pages = self.walk(APPOINTMENTS_NEWEST_FIRST, per_page=4, partitions=partitions)
+        self.assertEqual([a.pk for page in pages for a in page], expected)
+
+        back = keyset_paginate(
+            Appointment.objects.all(), APPOINTMENTS_NEWEST_FIRST, pages[2].prev_cursor, 4, partitions,
+        )
+        self.assertEqual([a.pk for a in back], [a.pk for a in pages[1]])
+
+    def test_each_page_is_one_query_without_count(self):
+        with self.assertNumQueries(1) as ctx:
+            page = keyset_paginate(Appointment.objects.all(), APPOINTMENTS_BY_SCHEDULE, None, 4)
+        self.assertNotIn("COUNT", ctx.captured_queries[0]["sql"].upper())
+
+        with self.assertNumQueries(1):
+            keyset_paginate(Appointment.objects.all(), APPOINTMENTS_BY_SCHEDULE, page.next_cursor, 4)
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        first = keyset_paginate(Appointment.objects.all(), APPOINTMENTS_BY_SCHEDULE, None, 4)
+        junk = keyset_paginate(Appointment.objects.all(), APPOINTMENTS_BY_SCHEDULE, "not-a-cursor", 4)
+        self.assertEqual([a.pk for a in junk], [a.pk for a in first])
+
+
+@override_settings(WEATHERAPI_KEY="", SECURE_SSL_REDIRECT=False)
+class StaffAppointmentsPagingTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        User.objects.create_user("staff", password="pass12345", is_staff=True)
+        self.client.login(username="staff", password="pass12345")
+
+    def test_pending_requests_are_capped_and_linked(self):
+        start = timezone.localdate() + timedelta(days=1)
+        for index in range(30):
+            Appointment.objects.create(
+                name=f"Pending {index}",
+                phone="09170000000",
+                date=start + timedelta(days=index // 9),
+                start_time=time(9 + index % 9, 0),
+                timeslot="9:00 AM",
+                status=Appointment.STATUS_PENDING,
+                services=[APPOINTMENT_SERVICES[0]],
+            )
+
+        response = self.client.get(reverse("dashboard:appointments"), {"q": "Pending"})
+        page = response.context["pending_requests"]
+        self.assertEqual(len(page), 25)
+        self.assertTrue(page.has_next)
+        self.assertIn("q=Pending", response.context["pending_links"]["next"])
+
+        response = self.client.get(
+            reverse("dashboard:appointments") + "?" + response.context["pending_links"]["next"]
+        )
+        self.assertEqual(len(response.context["pending_requests"]), 5)
+        self.assertContains(response, "Pending 29")
+
+
+@override_settings(WEATHERAPI_KEY="", SECURE_SSL_REDIRECT=False)
+class PatientQueuePaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("queue", password="pw", is_staff=True)
+        self.client.force_login(self.user)
+        today = timezone.localdate()
+        self.patients = []
+        for index in range(30):
+            patient = Patient.objects.create(name=f"Queue {index:02d}", phone=f"0917000{index:04d}")
+            Appointment.objects.create(
+                patient=patient,
+                name=patient.name,
+                phone=patient.phone,
+                date=today - timedelta(days=index),
+                start_time=time(9, 0),
+                timeslot="9:00 AM",
+                status=Appointment.STATUS_COMPLETED,
+                services=[APPOINTMENT_SERVICES[0]],
+            )
+            self.patients.append(patient)
+        Patient.objects.create(name="No Visits", phone="09179999999")
+
+    def test_queue_pages_by_last_visit_without_aggregating_appointments(self):
+        url = reverse("dashboard:patients")
+        response = self.client.get(url)
+
+        first_page = [p.name for p in response.context["patient_queue"]]
+        self.assertEqual(first_page, [f"Queue {index:02d}" for index in range(25)])
+        self.assertContains(response, 'js-queue-count">25</span>')
+
+        next_link = response.context["queue_links"]["next"]
+        response = self.client.get(f"{url}?{next_link}")
+        self.assertEqual(
+            [p.name for p in response.context["patient_queue"]],
+            [f"Queue {index:02d}" for index in range(25, 30)],
+        )
+        self.assertFalse(response.context["patient_queue"].has_next)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        queue_queries = [q["sql"] for q in ctx.captured_queries if "appointments_patientstats" in q["sql"]]
+        self.assertTrue(queue_queries)
+        self.assertFalse(any("website_appointment" in sql for sql in queue_queries))
+
+    def test_selected_patient_off_page_is_loaded_by_pk(self):
+        wanted = self.patients[-1]
+        response = self.client.get(reverse("dashboard:patients"), {"patient": wanted.pk})
+
+        self.assertNotIn(wanted, list(response.context["patient_queue"]))
+        self.assertEqual(response.context["selected_patient"], wanted)
+        self.assertEqual(response.context["quick_stats"]["completed"], 1)
+        self.assertEqual(response.context["quick_stats"]["adherence"], 100.0)
+
+    def test_queue_endpoint_serves_the_next_page_for_infinite_scroll(self):
+        first = self.client.get(reverse("dashboard:patients"), {"sort": "oldest"})
+        cursor = first.context["patient_queue"].next_cursor
+
+        response = self.client.get(reverse("dashboard:patients_queue"), {"sort": "oldest", "queue_cursor": cursor})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["count"], 5)
+        self.assertIsNone(data["next_cursor"])
+        self.assertIn("Queue 29", data["html"])
+        self.assertIn(f"?sort=oldest&patient={self.patients[29].pk}", data["html"])
+        self.assertNotIn("Queue 00", data["html"])
+
+    def test_queue_endpoint_requires_staff(self):
+        self.client.logout()
+        response = self.client.get(reverse("dashboard:patients_queue"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_page_queries_do_not_grow_with_patient_count(self):
+        url = reverse("dashboard:patients")
+        wanted = self.patients[-1]
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url, {"patient": wanted.pk})
+
+        for index in range(30, 90):
+            patient = Patient.objects.create(name=f"Queue {index:02d}", phone=f"0917000{index:04d}")
+            Appointment.objects.create(
+                patient=patient,
+                name=patient.name,
+                phone=patient.phone,
+                date=timezone.localdate() - timedelta(days=index),
+                start_time=time(10, 0),
+                timeslot="10:00 AM",
+                status=Appointment.STATUS_CONFIRMED,
+                services=[APPOINTMENT_SERVICES[0]],
+            )
+
+        with self.assertNumQueries(len(small)):
+            response = self.client.get(url, {"patient": wanted.pk})
+        self.assertEqual(response.context["selected_patient"], wanted)
+        self.assertEqual(len(response.context["patient_queue"]), 25)
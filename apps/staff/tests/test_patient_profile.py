@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.models import Appointment
+from apps.patients.models import Patient, PatientDocument
+from apps.patients.selectors import get_patient_profile
+
+
+class PatientProfileMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._temp_media = tempfile.mkdtemp()
+        cls._media_override = override_settings(MEDIA_ROOT=cls._temp_media, MEDIA_URL="/media/")
+        cls._media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._media_override.disable()
+        shutil.rmtree(cls._temp_media, ignore_errors=True)
+        super().tearDownClass()
+
+    def book(self, patient, days, status, hour=9):
+        return Appointment.objects.create(
+            patient=patient,
+            name=patient.name,
+            phone=patient.phone,
+            date=timezone.localdate() + timedelta(days=days),
+            start_time=time(hour, 0),
+            timeslot=f"{hour}:00",
+            status=status,
+            services=[APPOINTMENT_SERVICES[0]],
+        )
+
+    def attach(self, patient, title, document_type):
+        return PatientDocument.objects.create(
+            patient=patient,
+            title=title,
+            document_type=document_type,
+            file=SimpleUploadedFile(f"{title}.pdf", b"content", content_type="application/pdf"),
+        )
+
+    def make_patient(self, name="Profile Patient", phone="09170000000", hour=9):
+        """21 appointments: 12 past, 8 upcoming and one cancelled upcoming."""
+        patient = Patient.objects.create(name=name, phone=phone)
+        for days in range(-12, 0):
+            status = Appointment.STATUS_COMPLETED if days % 3 else Appointment.STATUS_CANCELLED
+            self.book(patient, days, status, hour)
+        for days in range(1, 9):
+            status = Appointment.STATUS_CONFIRMED if days % 2 else Appointment.STATUS_PENDING
+            self.book(patient, days, status, hour)
+        self.book(patient, 2, Appointment.STATUS_CANCELLED, hour + 1)
+        return patient
+
+
+class PatientProfileSelectorTests(PatientProfileMixin, TestCase):
+    def test_profile_matches_separate_queries_in_two(self):
+        patient = self.make_patient()
+        self.make_patient("Other Patient", "09170000001", hour=13)
+        self.attach(patient, "Old card", PatientDocument.TYPE_INSURANCE)
+        latest_card = self.attach(patient, "New card", PatientDocument.TYPE_INSURANCE)
+        self.attach(patient, "Agreement", PatientDocument.TYPE_AGREEMENT)
+        patient = Patient.objects.select_related("stats").get(pk=patient.pk)
+        today = timezone.localdate()
+
+        with self.assertNumQueries(2):
+            profile = get_patient_profile(patient, today)
+
+        appointments = Appointment.objects.filter(patient=patient)
+        self.assertEqual(
+            profile.upcoming,
+            list(appointments.filter(date__gte=today, status__in=Appointment.ACTIVE_STATUSES)
+                 .order_by("date", "start_time", "id")[:6]),
+        )
+        self.assertEqual(profile.history, list(appointments.order_by("-date", "-start_time", "-id")[:8]))
+        self.assertEqual(profile.insurance_document, latest_card)
+        self.assertEqual([document.title for document in profile.documents], ["Agreement"])
+        self.assertEqual(profile.quick_stats["total"], 21)
+        self.assertEqual(profile.quick_stats["upcoming"], 8)
+
+    def test_profile_without_appointments_or_stats(self):
+        patient = Patient.objects.create(name="Fresh Patient")
+
+        profile = get_patient_profile(patient)
+
+        self.assertEqual((profile.upcoming, profile.history, profile.documents), ([], [], []))
+        self.assertIsNone(profile.insurance_document)
+        self.assertEqual(profile.quick_stats["total"], 0)
+
+
+@override_settings(WEATHERAPI_KEY="", SECURE_SSL_REDIRECT=False)
+class PatientsPageQueryBudgetTests(PatientProfileMixin, TestCase):
+    def test_patients_page_query_budget(self):
+        user = get_user_model().objects.create_user("budget", password="pw", is_staff=True)
+        self.client.force_login(user)
+        patient = self.make_patient()
+        for index in range(3):
+            self.make_patient(f"Queue {index}", f"0917000010{index}", hour=11 + 2 * index)
+        self.attach(patient, "Card", PatientDocument.TYPE_INSURANCE)
+        self.attach(patient, "Agreement", PatientDocument.TYPE_AGREEMENT)
+
+        # session, user, queue page, selected patient by pk, profile
+        # appointments, profile documents
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse("dashboard:patients"), {"patient": patient.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["upcoming_schedule"]), 6)
+        self.assertEqual(len(response.context["visit_history"]), 8)
+        self.assertContains(response, "Agreement")
@@ -0,0 +1,166 @@
+from datetime import time, timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.appointments.constants import APPOINTMENT_SERVICES
+from apps.appointments.forms import StaffAppointmentForm
+from apps.appointments.models import Appointment
+from apps.shared.query_audit import QueryPatternRecorder, explain, query_pattern
+from apps.staff.services.pagination import (
+    APPOINTMENTS_BY_SCHEDULE,
+    APPOINTMENTS_NEWEST_FIRST,
+    encode_cursor,
+)
+
+STATUS_DATE_INDEX = "appointment_status_date_idx"
+STATUS_HISTORY_INDEX = "appointment_status_history_idx"
+CREATED_AT_INDEX = "appointment_created_at_idx"
+
+
+class QueryPatternTests(TestCase):
+    def test_in_lists_collapse_to_one_pattern(self):
+        self.assertEqual(
+            query_pattern('SELECT 1 FROM t WHERE "s" IN (%s, %s,  %s)'),
+            'SELECT 1 FROM t WHERE "s" IN (%s, ...)',
+        )
+        self.assertEqual(query_pattern("SELECT %s"), "SELECT %s")
+
+    def test_recorder_counts_patterns_and_sources(self):
+        recorder = QueryPatternRecorder()
+        with recorder.recording("first"):
+            list(Appointment.objects.filter(status__in=["pending", "confirmed"]))
+            list(Appointment.objects.filter(status__in=["pending"]))
+        with recorder.recording("second"):
+            list(Appointment.objects.filter(status__in=["cancelled", "completed", "pending"]))
+
+        (entry,) = recorder.patterns.values()
+        self.assertEqual(entry["count"], 3)
+        self.assertEqual(entry["sources"], ["first", "second"])
+
+
+@skipUnless(connection.vendor == "sqlite", "query plans are asserted in SQLite's EXPLAIN QUERY PLAN format")
+@override_settings(WEATHERAPI_KEY="", SECURE_SSL_REDIRECT=False)
+class AppointmentIndexPlanTests(TestCase):
+    """
+    The queries the pages really issue are recorded and explained with the
+    indexes in place, and again after dropping them inside the test
+    transaction, which rolls the drop back.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        statuses = [choice for choice, _ in Appointment.STATUS_CHOICES]
+        for index in range(80):
+            Appointment.objects.create(
+                name=f"Plan {index}",
+                phone="09170000000",
+                date=today + timedelta(days=index % 40 - 20),
+                start_time=None if index % 7 == 0 else time(9 + index % 9, 0),
+                timeslot="9:00 AM",
+                status=statuses[index % len(statuses)],
+                services=[APPOINTMENT_SERVICES[0]],
+            )
+        cls.user = get_user_model().objects.create_user("plans", password="pw", is_staff=True)
+
+    def plan(self, sql, params, after_drop=False):
+        if after_drop:
+            # sqlite3 caches prepared statements by text, and a cached EXPLAIN
+            # keeps reporting the plan it was compiled with.
+            sql += " "
+        return "\n".join(explain(sql, params))
+
+    def drop_indexes(self, *names):
+        with connection.cursor() as cursor:
+            for name in names:
+                cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+
+    def record(self, label, run):
+        recorder = QueryPatternRecorder()
+        with recorder.recording(label):
+            run()
+        return [entry for entry in recorder.patterns.values() if 'FROM "website_appointment"' in entry["sql"]]
+
+    def assert_plan_switches(self, entry, *index_names):
+        before = self.plan(entry["sql"], entry["params"])
+        self.assertTrue(any(name in before for name in index_names), before)
+        self.drop_indexes(*index_names)
+        after = self.plan(entry["sql"], entry["params"], after_drop=True)
+        self.assertFalse(any(name in after for name in index_names), after)
+        return before, after
+
+    def cursor_at(self, columns, direction="next", **filters):
+        row = Appointment.objects.filter(**filters).order_by("pk")[1]
+        return encode_cursor(direction, [getattr(row, column.expression.name) for column in columns])
+
+    def test_staff_list_pages_walk_indexes_without_sorting(self):
+        self.client.force_login(self.user)
+        url = reverse("dashboard:appointments")
+        pending = self.cursor_at(APPOINTMENTS_BY_SCHEDULE, status=Appointment.STATUS_PENDING)
+        upcoming = self.cursor_at(
+            APPOINTMENTS_BY_SCHEDULE, status=Appointment.STATUS_CONFIRMED, date__gte=timezone.localdate(),
+        )
+        history = self.cursor_at(APPOINTMENTS_NEWEST_FIRST, status=Appointment.STATUS_COMPLETED)
+        history_back = self.cursor_at(APPOINTMENTS_NEWEST_FIRST, "prev", status=Appointment.STATUS_COMPLETED)
+        requests = [
+            (url, {}),
+            (url, {"pending_cursor": pending, "upcoming_cursor": upcoming, "history_cursor": history}),
+            (url, {"history_status": Appointment.STATUS_CANCELLED, "history_cursor": history}),
+            (url, {"history_cursor": history_back}),
+            (reverse("dashboard:upcoming_appointments"), {"cursor": upcoming}),
+        ]
+
+        lists = []
+        for path, params in requests:
+            def run():
+                self.assertEqual(self.client.get(path, params).status_code, 200)
+            lists += [entry for entry in self.record(path, run) if "ORDER BY" in entry["sql"]]
+
+        plans = [self.plan(entry["sql"], entry["params"]) for entry in lists]
+        # First pages, later pages and a previous page for every list.
+        self.assertGreaterEqual(len(plans), 6)
+        for entry, plan in zip(lists, plans):
+            with self.subTest(sql=entry["sql"]):
+                self.assertNotIn("TEMP B-TREE", plan)
+                self.assertTrue(STATUS_DATE_INDEX in plan or STATUS_HISTORY_INDEX in plan, plan)
+        # Later pages start the walk at the cursor instead of filtering from the first row.
+        self.assertTrue(any("date>?" in plan for plan in plans))
+        self.assertTrue(any("date<?" in plan for plan in plans))
+
+        self.drop_indexes(STATUS_DATE_INDEX, STATUS_HISTORY_INDEX)
+        after = [self.plan(entry["sql"], entry["params"], after_drop=True) for entry in lists]
+        self.assertTrue(all("TEMP B-TREE" in plan for plan in after))
+
+    def test_collision_check_is_answered_from_the_index(self):
+        taken = self.record(
+            "collision",
+            lambda: self.assertFalse(StaffAppointmentForm().slot_is_taken(timezone.localdate(), time(8, 0))),
+        )
+        before, _ = self.assert_plan_switches(taken[0], STATUS_DATE_INDEX, STATUS_HISTORY_INDEX)
+        self.assertIn("status=? AND date=? AND start_time=?", before)
+
+    def test_recent_requests_seek_created_at(self):
+        recent = Appointment.objects.filter(created_at__gte=timezone.now() - timedelta(days=30)).order_by()
+        sql, params = recent.query.sql_with_params()
+        before, after = self.assert_plan_switches({"sql": sql, "params": params}, CREATED_AT_INDEX)
+        self.assertIn("created_at>?", before)
+        self.assertIn("SCAN", after)
+
+
+class AuditQueryPatternsCommandTests(TestCase):
+    def test_command_reports_patterns_and_leaves_no_audit_user(self):
+        out = StringIO()
+        call_command("audit_query_patterns", stdout=out, stderr=StringIO())
+
+        output = out.getvalue()
+        self.assertIn("[slot collision check]", output)
+        self.assertIn("[appointments search]", output)
+        self.assertIn("distinct query pattern(s).", output)
+        self.assertFalse(get_user_model().objects.exists())
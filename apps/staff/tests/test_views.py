@@ -3,9 +3,10 @@ import shutil
 from datetime import time, timedelta
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
-from django.test import TestCase, override_settings
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from apps.appointments.models import Appointment
@@ -251,6 +252,7 @@ class WebsiteManagementTests(TestCase):
 
     def test_staff_can_update_website_content(self):
         self.client.login(username="webstaff", password="pass12345")
+        self.assertContains(self.client.get(reverse("home")), "Original Hero")
 
         response = self.client.post(
             reverse("dashboard:website"),
@@ -296,11 +298,14 @@ class WebsiteManagementTests(TestCase):
             response.redirect_chain,
             [(f"{reverse('dashboard:website')}?saved=1", 302)],
         )
+        # The save moved the cached public copy on.
+        self.assertContains(self.client.get(reverse("home")), "Updated Hero")
 
 
 @override_settings(WEATHERAPI_KEY="", SECURE_SSL_REDIRECT=False)
 class ContentManagerTests(TestCase):
     def setUp(self):
+        cache.clear()
         User = get_user_model()
         self.staff = User.objects.create_user("contentstaff", password="pass12345", is_staff=True)
 
@@ -443,6 +448,8 @@ class ContentManagerTests(TestCase):
             published_at=timezone.now(),
             is_published=True,
         )
+        visitor = Client()
+        self.assertContains(visitor.get(reverse("blog")), "Bulk Blog One")
 
         response = self.client.post(
             reverse("dashboard:blog_bulk"),
@@ -459,3 +466,5 @@ class ContentManagerTests(TestCase):
         self.assertFalse(first.is_published)
         self.assertFalse(second.is_published)
         self.assertContains(response, "2 blog post(s)")
+        # The queryset update purged the anonymous visitor's cached blog page.
+        self.assertNotContains(visitor.get(reverse("blog")), "Bulk Blog One")
@@ -0,0 +1,171 @@
+import json
+import threading
+import time as clock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from apps.staff.services import dashboard
+from apps.staff.services.weather import WeatherProvider
+
+WEATHER_PAYLOAD = {"current": {"temp_c": 29.6}, "location": {"name": "Angeles", "country": "Philippines"}}
+
+
+class StubWeatherAPI:
+    """WeatherAPI stand-in on a local port; `status`, `payload` and `delay` steer its replies."""
+
+    def __init__(self):
+        self.status = 200
+        self.payload = WEATHER_PAYLOAD
+        self.delay = 0
+        self.requests = []
+        self.release = threading.Event()
+        self.release.set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.requests.append((self.client_address, self.path))
+                stub.release.wait(5)
+                clock.sleep(stub.delay)
+                body = json.dumps(stub.payload).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/current.json"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class WeatherProviderTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.stub = StubWeatherAPI()
+        self.addCleanup(self.stub.stop)
+        self.now = 1_000_000.0
+        self.provider = WeatherProvider(ttl=300, negative_ttl=60, timeout=2, clock=lambda: self.now)
+        settings_override = override_settings(WEATHERAPI_KEY="test-key", WEATHERAPI_URL=self.stub.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def settle(self, q="auto:ip"):
+        future = self.provider.schedule_refresh(q)
+        future.result(timeout=5)
+
+    def test_cold_read_returns_at_once_and_fills_in_background(self):
+        self.stub.release.clear()
+
+        started = clock.perf_counter()
+        self.assertIsNone(self.provider.get("auto:ip"))
+        self.assertIsNone(self.provider.get("auto:ip"))
+        self.assertLess(clock.perf_counter() - started, 0.5)
+
+        self.stub.release.set()
+        self.settle()
+
+        self.assertEqual(self.provider.get("auto:ip"), {"temp_c": 30, "city": "Angeles", "country": "Philippines"})
+        self.assertEqual(len(self.stub.requests), 1)
+        self.assertIn("key=test-key", self.stub.requests[0][1])
+
+    def test_stale_reading_is_served_while_refreshing(self):
+        self.provider.refresh("auto:ip")
+        self.now += 301
+        self.stub.payload = {"current": {"temp_c": 18}, "location": {"name": "Baguio", "country": "Philippines"}}
+        self.stub.delay = 1
+
+        started = clock.perf_counter()
+        stale = self.provider.get("auto:ip")
+        self.assertLess(clock.perf_counter() - started, 0.5)
+        self.assertEqual(stale["city"], "Angeles")
+
+        self.settle()
+        self.assertEqual(self.provider.get("auto:ip")["city"], "Baguio")
+
+    def test_failures_are_cached_briefly_and_keep_last_good_reading(self):
+        self.stub.status = 500
+        self.stub.payload = {"error": {"message": "down"}}
+        self.provider.refresh("auto:ip")
+
+        self.assertIsNone(self.provider.get("auto:ip"))
+        self.assertEqual(len(self.stub.requests), 1)
+
+        self.now += 61
+        self.stub.status = 200
+        self.stub.payload = WEATHER_PAYLOAD
+        self.provider.get("auto:ip")
+        self.settle()
+        self.assertEqual(self.provider.get("auto:ip")["city"], "Angeles")
+
+        self.now += 301
+        self.stub.status = 503
+        self.stub.payload = {}
+        self.provider.refresh("auto:ip")
+        self.assertEqual(self.provider.get("auto:ip")["city"], "Angeles")
+        self.assertEqual(len(self.stub.requests), 3)
+
+    def test_unreachable_api_is_a_cached_miss(self):
+        self.stub.stop()
+
+        self.assertIsNone(self.provider.refresh("auto:ip"))
+        self.assertIsNone(self.provider.get("auto:ip"))
+        self.assertIsNotNone(cache.get(self.provider.cache_key("auto:ip")))
+
+    def test_refreshes_share_one_pooled_connection(self):
+        for q in ("auto:ip", "8.8.8.8", "1.1.1.1"):
+            self.provider.refresh(q)
+
+        self.assertEqual(len(self.stub.requests), 3)
+        self.assertEqual(len({address for address, _ in self.stub.requests}), 1)
+
+    def test_finished_refreshes_are_not_kept(self):
+        futures = [self.provider.schedule_refresh(q) for q in ("auto:ip", "8.8.8.8", "1.1.1.1")]
+        for future in futures:
+            future.result(timeout=5)
+
+        # Done callbacks run on the worker just after the result is set.
+        deadline = clock.perf_counter() + 5
+        while self.provider._inflight and clock.perf_counter() < deadline:
+            clock.sleep(0.01)
+        self.assertEqual(self.provider._inflight, {})
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class DashboardWeatherTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.stub = StubWeatherAPI()
+        self.addCleanup(self.stub.stop)
+        staff = get_user_model().objects.create_user("weatherstaff", password="pass12345", is_staff=True)
+        self.client.force_login(staff)
+
+    def test_slow_weather_api_does_not_hold_up_the_dashboard(self):
+        self.stub.release.clear()
+
+        with override_settings(WEATHERAPI_KEY="test-key", WEATHERAPI_URL=self.stub.url):
+            started = clock.perf_counter()
+            response = self.client.get(reverse("dashboard:home"))
+            elapsed = clock.perf_counter() - started
+
+            self.assertLess(elapsed, 2)
+            self.assertContains(response, "Pampanga")
+
+            self.stub.release.set()
+            dashboard.weather_provider.schedule_refresh("auto:ip").result(timeout=5)
+            self.assertContains(self.client.get(reverse("dashboard:home")), "Angeles")
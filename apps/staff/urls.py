@@ -16,6 +16,7 @@ from .views import (
     index,
     message,
     patients,
+    patients_queue,
     profile,
     settings_page,
     testimonial_bulk_action,
@@ -24,6 +25,7 @@ from .views import (
     testimonial_edit,
     testimonial_toggle_publish,
     testimonials,
+    upcoming_appointments,
     website,
 )
 
@@ -34,6 +36,7 @@ urlpatterns = [
     path("appointments/", appointments, name="appointments"),
     path("appointments/new/", appointments_form, name="appointments_form"),
     path("patients/", patients, name="patients"),
+    path("patients/queue/", patients_queue, name="patients_queue"),
     path("inquiries/", inquiries, name="inquiries"),
     path("message/", message, name="message"),
     path("website/", website, name="website"),
@@ -54,4 +57,5 @@ urlpatterns = [
     path("login/", RememberMeLoginView.as_view(), name="login"),
     path("logout/", auth_views.LogoutView.as_view(), name="logout"),
     path("chart-date/", appointments_chart, name="appointments_chart"),
+    path("upcoming/", upcoming_appointments, name="upcoming_appointments"),
 ]
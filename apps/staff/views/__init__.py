@@ -1,7 +1,7 @@
 from .auth import RememberMeLoginView, staff_only
-from .dashboard import index, appointments_chart
+from .dashboard import index, appointments_chart, upcoming_appointments
 from .appointments import appointments, appointments_form
-from .patients import patients
+from .patients import patients, patients_queue
 from .content import (
     blog_post_bulk_action,
     blog_post_create,
@@ -1,16 +1,25 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
 from apps.appointments.models import Appointment
+from apps.appointments.selectors import search_appointments
+from apps.staff.services.pagination import (
+    APPOINTMENTS_BY_SCHEDULE,
+    APPOINTMENTS_NEWEST_FIRST,
+    cursor_querystring,
+    keyset_paginate,
+)
 from apps.staff.services.time_utils import parse_date
-from apps.appointments.forms import StaffAppointmentForm
+from apps.appointments.forms import SlotUnavailableError, StaffAppointmentForm
 
 from .auth import staff_only
 
+LIST_PAGE_SIZE = 25
+HISTORY_PAGE_SIZE = 5
+
 @login_required(login_url="dashboard:login")
 @user_passes_test(staff_only)
 def appointments(request):
@@ -60,25 +69,26 @@ def appointments(request):
     base_qs = Appointment.objects.all()
 
     if q:
-        base_qs = base_qs.filter(
-            Q(name__icontains=q)
-            | Q(phone__icontains=q)
-            | Q(email__icontains=q)
-        )
+        # Matches are listed in each list's schedule order, not by relevance.
+        base_qs = search_appointments(q, base_qs, ranked=False)
 
     # Requests = pending appointments
-    pending_requests = (
-        base_qs.filter(status=Appointment.STATUS_PENDING)
-        .order_by("date", "start_time", "name")
+    pending_requests = keyset_paginate(
+        base_qs.filter(status=Appointment.STATUS_PENDING),
+        APPOINTMENTS_BY_SCHEDULE,
+        request.GET.get("pending_cursor"),
+        LIST_PAGE_SIZE,
     )
 
     # Upcoming confirmed appointments (today and future)
-    upcoming_appointments = (
+    upcoming_appointments = keyset_paginate(
         base_qs.filter(
             status=Appointment.STATUS_CONFIRMED,
             date__gte=today,
-        )
-        .order_by("date", "start_time", "name")
+        ),
+        APPOINTMENTS_BY_SCHEDULE,
+        request.GET.get("upcoming_cursor"),
+        LIST_PAGE_SIZE,
     )
 
     status_filter = request.GET.get("history_status", "").strip()
@@ -86,45 +96,40 @@ def appointments(request):
     end_str = request.GET.get("history_to", "").strip()
 
     # Recent cancelled / completed (history)
-    recent_history_qs = base_qs.filter(
-        status__in=[Appointment.STATUS_CANCELLED, Appointment.STATUS_COMPLETED]
-    )
-
     VALID_HISTORY_STATUSES = [
         Appointment.STATUS_CANCELLED,
         Appointment.STATUS_COMPLETED,
     ]
 
     if status_filter in VALID_HISTORY_STATUSES:
-        recent_history_qs = recent_history_qs.filter(status=status_filter)
+        history_statuses = [status_filter]
     else:
         status_filter = ""  # reset to empty if invalid value provided
+        history_statuses = VALID_HISTORY_STATUSES
 
+    recent_history_qs = base_qs
     start_date = parse_date(start_str)
     end_date = parse_date(end_str)
 
-    if start_date: 
+    if start_date:
         recent_history_qs = recent_history_qs.filter(date__gte=start_date)
     if end_date:
         recent_history_qs = recent_history_qs.filter(date__lte=end_date)
 
-    recent_history_qs = recent_history_qs.order_by("-date","start_time", "name")
-
-    history_page_number = request.GET.get("history_page")
-    history_paginator = Paginator(recent_history_qs, 5)
-    recent_history = history_paginator.get_page(history_page_number)
-
-    from urllib.parse import urlencode
-
-    history_query = {
-        "history_status": status_filter,
-        "history_from": start_str,
-        "history_to": end_str,
-    }
-    if q:
-        history_query["q"] = q
+    # One index walk per status, merged, rather than sorting every history row.
+    recent_history = keyset_paginate(
+        recent_history_qs,
+        APPOINTMENTS_NEWEST_FIRST,
+        request.GET.get("history_cursor"),
+        HISTORY_PAGE_SIZE,
+        partitions=[Q(status=status) for status in history_statuses],
+    )
 
-    history_querystring = urlencode({k: v for k, v in history_query.items() if v})
+    def page_links(page, cursor_param):
+        return {
+            "next": cursor_querystring(request.GET, cursor_param, page.next_cursor),
+            "prev": cursor_querystring(request.GET, cursor_param, page.prev_cursor),
+        }
 
     ctx = {
         "q": q,
@@ -134,7 +139,9 @@ def appointments(request):
         "history_status": status_filter,
         "history_from": start_str,
         "history_to": end_str,
-        "history_querystring": history_querystring,
+        "pending_links": page_links(pending_requests, "pending_cursor"),
+        "upcoming_links": page_links(upcoming_appointments, "upcoming_cursor"),
+        "history_links": page_links(recent_history, "history_cursor"),
         "active_page": "appointments",
     }
     return render(request, "staff/pages/dappointments.html", ctx)
@@ -145,9 +152,13 @@ def appointments_form(request):
     if request.method == 'POST':
         form = StaffAppointmentForm(request.POST)
         if form.is_valid():
-            form.save(status=Appointment.STATUS_CONFIRMED)
-            messages.success(request, "Appointment has been created.")
-            return redirect('dashboard:appointments')
+            try:
+                form.save(status=Appointment.STATUS_CONFIRMED)
+            except SlotUnavailableError:
+                messages.error(request, "Please correct the errors below.")
+            else:
+                messages.success(request, "Appointment has been created.")
+                return redirect('dashboard:appointments')
         else:
             messages.error(request, "Please correct the errors below.")
     else:
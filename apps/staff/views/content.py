@@ -4,6 +4,7 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
 from apps.public.models import BlogPost, Testimonial
+from apps.public.page_cache import NAMESPACE_BLOG, NAMESPACE_TESTIMONIALS, invalidate_public_pages
 from apps.staff.forms import BlogPostForm, TestimonialForm
 
 from .auth import staff_only
@@ -127,6 +128,9 @@ def testimonial_bulk_action(request):
         else:
             messages.error(request, "Choose a valid bulk action.")
 
+        # Queryset updates and deletes bypass the models' own invalidation.
+        invalidate_public_pages(NAMESPACE_TESTIMONIALS)
+
     return redirect("dashboard:testimonials")
 
 
@@ -240,6 +244,9 @@ def blog_post_bulk_action(request):
         else:
             messages.error(request, "Choose a valid bulk action.")
 
+        # Queryset updates and deletes bypass the models' own invalidation.
+        invalidate_public_pages(NAMESPACE_BLOG)
+
     return redirect("dashboard:blog")
 
 
@@ -1,14 +1,25 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.http import JsonResponse
 from django.shortcuts import render
-from apps.staff.services.dashboard import get_cached_weather, get_latest_appointments
+from django.template.loader import render_to_string
+from apps.staff.services.dashboard import get_cached_weather, get_latest_appointments, get_upcoming_appointments
 from django.utils import timezone
-from apps.staff.services.chart_utils import build_appointment_chart
-from apps.appointments.models import Appointment
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from apps.staff.services.chart_utils import (
+    build_appointment_chart,
+    chart_data_version,
+    chart_window,
+    get_cached_appointment_chart,
+    normalize_view_mode,
+)
+from apps.staff.services.metrics import get_dashboard_metrics
 from .auth import staff_only
 
+CHART_CLOSED_WINDOW_MAX_AGE = 60 * 60 * 24
+
 @login_required(login_url="dashboard:login")
 @user_passes_test(staff_only)
 def index(request):
@@ -26,57 +37,13 @@ def index(request):
     #         if wx:
     #             cache.set(cache_key, wx, 300)
 
-    # --- dates
     today = timezone.localdate()
-    now = timezone.now()
-    last_30 = now - timedelta(days=30)
-    prev_30_start = now - timedelta(days=60)
-    next_7 = today + timedelta(days=7)
-    prev_7_start = today - timedelta(days=7)
-
-    # --- Helper
-    def pct_change(curr: int, prev: int) -> float:
-        if prev == 0:
-            return 100.0 if curr > 0 else 0.0
-        return round((curr - prev) * 100.0 / prev, 2)
 
     # --- KPIs
-    patients_today = Appointment.objects.filter(date=today).count()
-    
-    total_patients = (
-        Appointment.objects
-        .values("name", "phone", "email")
-        .distinct()
-        .count()
-    )
-
-    requests_30 = Appointment.objects.filter(created_at__gte=last_30).count()
-    requests_prev30 = Appointment.objects.filter(created_at__gte=prev_30_start,
-                                                 created_at__lt=last_30).count()
-    requests_change = pct_change(requests_30, requests_prev30)
-
-    upcoming_week = Appointment.objects.filter(date__gte=today, date__lte=next_7).count()
-    prev_week = Appointment.objects.filter(date__lt=today, date__gte=prev_7_start).count()
-    upcoming_change = pct_change(upcoming_week, prev_week)
-
-    # existing data you already render
-    todays_slots = (
-        Appointment.objects
-        .filter(date=today)
-        .order_by("start_time", "name")
-    )
-
-    # upcoming appointments list
-    upcoming = (
-        Appointment.objects
-        .filter(
-            status__in=[
-                Appointment.STATUS_CONFIRMED,
-                Appointment.STATUS_COMPLETED,
-            ]
-        )
-        .order_by("date", "start_time", "name")
-    )
+    metrics = get_dashboard_metrics()
+
+    # upcoming appointments list (first page; the widget loads the rest on demand)
+    upcoming = get_upcoming_appointments(today)
 
     # latest patients (based on most recently completed appointments)
     latest_patients = get_latest_appointments(limit=5)
@@ -101,20 +68,19 @@ def index(request):
     ctx = {
         "weather": wx or {"temp_c": 21, "city": "Pampanga", "country": "Philippines"},
         "today": today,
-        "todays_slots": todays_slots,
 
         # KPI values
-        "kpi_patients_today": patients_today,
-        "kpi_patients_today_change": requests_change,   # use 30-day trend label
+        "kpi_patients_today": metrics.patients_today,
+        "kpi_patients_today_change": metrics.requests_change,   # use 30-day trend label
 
-        "kpi_total_patients": total_patients,
-        "kpi_total_patients_change": requests_change,   # re-use same 30d trend (or compute your own)
+        "kpi_total_patients": metrics.total_patients,
+        "kpi_total_patients_change": metrics.requests_change,   # re-use same 30d trend (or compute your own)
 
-        "kpi_requests_30": requests_30,
-        "kpi_requests_change": requests_change,         # % vs previous 30 days
+        "kpi_requests_30": metrics.requests_30,
+        "kpi_requests_change": metrics.requests_change,         # % vs previous 30 days
 
-        "kpi_placeholder": upcoming_week,               # “upcoming this week”
-        "kpi_placeholder_change": upcoming_change, 
+        "kpi_placeholder": metrics.upcoming_week,               # “upcoming this week”
+        "kpi_placeholder_change": metrics.upcoming_change,
         
         "appts_chart_labels": appts_chart_labels,
         "appts_chart_values": appts_chart_values,
@@ -130,12 +96,28 @@ def index(request):
     }
     return render(request, "staff/index.html", ctx)
 
+@login_required(login_url="dashboard:login")
+@user_passes_test(staff_only)
+def upcoming_appointments(request):
+    """Next page of the Upcoming Appointments widget, as rendered day groups plus a cursor."""
+    today = timezone.localdate()
+    page = get_upcoming_appointments(today, request.GET.get("cursor"))
+    html = render_to_string("staff/partials/_upcoming_days.html", {
+        "upcoming": page,
+        "today": today,
+    }, request=request)
+    return JsonResponse({
+        "html": html,
+        "count": len(page),
+        "next_cursor": page.next_cursor,
+    })
+
 @login_required(login_url="dashboard:login")
 @user_passes_test(staff_only)
 def appointments_chart(request):
     today = timezone.localdate()
 
-    view_mode = (request.GET.get("ap_view") or "day").lower()
+    view_mode = normalize_view_mode(request.GET.get("ap_view"))
     start_param = request.GET.get("ap_start")
 
     if start_param:
@@ -146,5 +128,24 @@ def appointments_chart(request):
     else:
         base = today
 
-    chart = build_appointment_chart(view_mode, base)
-    return JsonResponse(chart)
\ No newline at end of file
+    version, last_modified = chart_data_version(view_mode, base)
+    etag = quote_etag(version)
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+    # Validate on the ETag only: updated_at is taken before commit, so a
+    # later-committing write can leave Last-Modified unchanged.
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(get_cached_appointment_chart(view_mode, base, version))
+
+    response.headers["ETag"] = etag
+    if last_modified_ts is not None:
+        response.headers["Last-Modified"] = http_date(last_modified_ts)
+
+    # Closed historical windows only change through back-dated edits, so the
+    # browser may reuse them; open windows are revalidated on every request.
+    if chart_window(view_mode, base)[1] < today:
+        patch_cache_control(response, private=True, max_age=CHART_CLOSED_WINDOW_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -3,19 +3,33 @@ from urllib.parse import urlencode
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.db.models import Count, Max, Min, Q
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 
-from apps.appointments.models import Appointment
 from apps.patients.forms import PatientDocumentForm
 from apps.patients.models import Patient, PatientDocument
+from apps.patients.selectors import PatientProfile, get_patient_profile, search_patients
+from apps.staff.services.pagination import (
+    PATIENTS_BY_LAST_VISIT,
+    PATIENTS_NEWEST_FIRST,
+    PATIENTS_OLDEST_FIRST,
+    cursor_querystring,
+    keyset_paginate,
+)
 
 from .auth import staff_only
 
 
-PATIENT_QUEUE_SORT_OPTIONS = {"all", "newest", "oldest"}
+PATIENT_QUEUE_ORDERINGS = {
+    "all": PATIENTS_BY_LAST_VISIT,
+    "newest": PATIENTS_NEWEST_FIRST,
+    "oldest": PATIENTS_OLDEST_FIRST,
+}
+PATIENT_QUEUE_SORT_OPTIONS = set(PATIENT_QUEUE_ORDERINGS)
+QUEUE_PAGE_SIZE = 25
 
 
 def patients_url(*, patient_id=None, query="", sort="all"):
@@ -30,13 +44,38 @@ def patients_url(*, patient_id=None, query="", sort="all"):
     return f"{base_url}?{urlencode(params)}" if params else base_url
 
 
+def queue_params(request):
+    """(search query, sort) for the patient queue from the request's GET or POST data."""
+    data = request.POST if request.method == "POST" else request.GET
+    q = (data.get("q", "") or "").strip()
+    sort = (data.get("sort", "all") or "all").strip().lower()
+    if sort not in PATIENT_QUEUE_SORT_OPTIONS:
+        sort = "all"
+    return q, sort
+
+
+def patient_queue_queryset(q):
+    # PatientStats only has rows for patients with appointments.
+    queryset = Patient.objects.filter(stats__total_count__gt=0).select_related("stats")
+    if q:
+        # The queue keeps its chosen sort; matches are not ranked by relevance.
+        queryset = search_patients(q, queryset, ranked=False)
+    return queryset
+
+
+def patient_queue_page(q, sort, cursor):
+    return keyset_paginate(patient_queue_queryset(q), PATIENT_QUEUE_ORDERINGS[sort], cursor, QUEUE_PAGE_SIZE)
+
+
+def queue_item_query(q, sort, cursor=""):
+    """Query string the queue items link with, ahead of their `patient` parameter."""
+    return cursor_querystring({"q": q, "sort": "" if sort == "all" else sort}, "queue_cursor", cursor)
+
+
 @login_required(login_url="dashboard:login")
 @user_passes_test(staff_only)
 def patients(request):
-    q = ((request.POST.get("q") if request.method == "POST" else request.GET.get("q", "")) or "").strip()
-    sort = ((request.POST.get("sort") if request.method == "POST" else request.GET.get("sort", "all")) or "all").strip().lower()
-    if sort not in PATIENT_QUEUE_SORT_OPTIONS:
-        sort = "all"
+    q, sort = queue_params(request)
     selected_key = request.GET.get("patient", "").strip()
     today = timezone.localdate()
     document_form = PatientDocumentForm(prefix="doc")
@@ -75,105 +114,22 @@ def patients(request):
                 return redirect(patients_url(patient_id=target_patient.id, query=q, sort=sort))
             messages.error(request, "Please complete the document upload form.")
 
-    patient_qs = Patient.objects.all()
-    if q:
-        patient_qs = patient_qs.filter(
-            Q(name__icontains=q)
-            | Q(phone__icontains=q)
-            | Q(email__icontains=q)
-        )
-
-    patient_queue_qs = (
-        patient_qs.annotate(
-            first_seen=Min("appointments__created_at"),
-            last_seen=Max("appointments__date"),
-            total_appointments=Count("appointments", distinct=True),
-            pending_count=Count(
-                "appointments",
-                filter=Q(appointments__status=Appointment.STATUS_PENDING),
-                distinct=True,
-            ),
-            confirmed_count=Count(
-                "appointments",
-                filter=Q(appointments__status=Appointment.STATUS_CONFIRMED),
-                distinct=True,
-            ),
-            completed_count=Count(
-                "appointments",
-                filter=Q(appointments__status=Appointment.STATUS_COMPLETED),
-                distinct=True,
-            ),
-            cancelled_count=Count(
-                "appointments",
-                filter=Q(appointments__status=Appointment.STATUS_CANCELLED),
-                distinct=True,
-            ),
-        )
-        .filter(total_appointments__gt=0)
-    )
-
-    if sort == "newest":
-        patient_queue_qs = patient_queue_qs.order_by("-created_at", "name")
-    elif sort == "oldest":
-        patient_queue_qs = patient_queue_qs.order_by("created_at", "name")
-    else:
-        patient_queue_qs = patient_queue_qs.order_by("-last_seen", "name")
-
-    patient_queue = list(patient_queue_qs)
+    queue_cursor = request.GET.get("queue_cursor", "")
+    patient_queue = patient_queue_page(q, sort, queue_cursor)
+    queue_links = {
+        "next": queue_item_query(q, sort, patient_queue.next_cursor),
+        "prev": queue_item_query(q, sort, patient_queue.prev_cursor),
+    }
 
+    # The selected patient is looked up by pk rather than searched for in
+    # the loaded page, so it may sit anywhere in the queue.
     selected_patient = None
-    upcoming_schedule = []
-    visit_history = []
-    document_items = []
-    insurance_document = None
-    quick_stats = {
-        "total": 0,
-        "completed": 0,
-        "upcoming": 0,
-        "cancelled": 0,
-        "adherence": 0,
-    }
+    if selected_key.isdigit():
+        selected_patient = patient_queue_queryset(q).filter(pk=int(selected_key)).first()
+    if selected_patient is None and patient_queue:
+        selected_patient = patient_queue.object_list[0]
 
-    if patient_queue:
-        selected_patient = patient_queue[0]
-        if selected_key.isdigit():
-            wanted = int(selected_key)
-            selected_patient = next((p for p in patient_queue if p.id == wanted), selected_patient)
-
-        selected_appointments = (
-            Appointment.objects.filter(patient=selected_patient)
-            .order_by("-date", "-start_time")
-        )
-
-        upcoming_schedule = list(
-            selected_appointments.filter(
-                date__gte=today,
-                status__in=[Appointment.STATUS_PENDING, Appointment.STATUS_CONFIRMED],
-            ).order_by("date", "start_time")[:6]
-        )
-        visit_history = list(selected_appointments[:8])
-
-        completed = selected_patient.completed_count
-        total = selected_patient.total_appointments
-        pending = selected_patient.pending_count
-        confirmed = selected_patient.confirmed_count
-        cancelled = selected_patient.cancelled_count
-
-        adherence = round((completed * 100.0 / total), 1) if total else 0
-        quick_stats = {
-            "total": total,
-            "completed": completed,
-            "upcoming": pending + confirmed,
-            "cancelled": cancelled,
-            "adherence": adherence,
-        }
-
-        insurance_document = selected_patient.documents.filter(
-            document_type=PatientDocument.TYPE_INSURANCE
-        ).first()
-        document_items = list(
-            selected_patient.documents.exclude(document_type=PatientDocument.TYPE_INSURANCE)
-        )
+    profile = get_patient_profile(selected_patient, today) if selected_patient else PatientProfile(patient=None)
 
     return render(request, "staff/pages/patients.html", {
         "active_page": "patients",
@@ -181,11 +137,30 @@ def patients(request):
         "sort": sort,
         "today": today,
         "patient_queue": patient_queue,
+        "queue_item_query": queue_item_query(q, sort, queue_cursor),
+        "queue_links": queue_links,
         "selected_patient": selected_patient,
-        "upcoming_schedule": upcoming_schedule,
-        "visit_history": visit_history,
-        "document_items": document_items,
-        "insurance_document": insurance_document,
-        "quick_stats": quick_stats,
+        "upcoming_schedule": profile.upcoming,
+        "visit_history": profile.history,
+        "document_items": profile.documents,
+        "insurance_document": profile.insurance_document,
+        "quick_stats": profile.quick_stats,
         "document_form": document_form,
     })
+
+
+@login_required(login_url="dashboard:login")
+@user_passes_test(staff_only)
+def patients_queue(request):
+    """Next page of the patient queue for infinite scroll, as rendered items plus a cursor."""
+    q, sort = queue_params(request)
+    page = patient_queue_page(q, sort, request.GET.get("queue_cursor"))
+    html = render_to_string("staff/partials/_patient_queue_items.html", {
+        "patients": page,
+        "item_query": queue_item_query(q, sort),
+    }, request=request)
+    return JsonResponse({
+        "html": html,
+        "count": len(page),
+        "next_cursor": page.next_cursor,
+    })
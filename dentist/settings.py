@@ -4,6 +4,8 @@ import sys
 import dj_database_url
 from decouple import config
 
+from apps.shared.cache import cache_config
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 RUNNING_TESTS = "test" in sys.argv
 
@@ -38,6 +40,7 @@ TIME_ZONE = os.getenv("TIME_ZONE", "Asia/Manila")
 
 # --- App-specific ---
 WEATHERAPI_KEY = os.getenv("WEATHERAPI_KEY", "")
+WEATHERAPI_URL = os.getenv("WEATHERAPI_URL", "https://api.weatherapi.com/v1/current.json")
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY", "")
 
 # Application definition
@@ -61,6 +64,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Above SessionMiddleware, so it sees every cookie set on the response.
+    'apps.public.page_cache.PublicPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -122,11 +127,15 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Shared by every worker on the host by default; see apps.shared.cache.cache_config
+# for the db:// and redis:// alternatives. Tests keep a per-process cache.
+# The file cache culls at random once full, namespace version keys included,
+# so keep max_entries well above the site's working set (Django's default is 300).
+CACHE_URL = "locmem://dentist-local-cache" if RUNNING_TESTS else os.getenv(
+    "CACHE_URL", f"file://{BASE_DIR / '.cache' / 'django'}?max_entries=20000"
+)
 CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "dentist-local-cache"
-    }
+    "default": cache_config(CACHE_URL, key_prefix=os.getenv("CACHE_KEY_PREFIX", "dentist")),
 }
 
 # Internationalization
@@ -170,6 +179,12 @@ EMAIL_PORT = int(os.getenv("EMAIL_PORT", "1025"))
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "False").lower() == "true"
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", "30"))
+
+# Contact mail goes through the outbox (apps.public.outbox). With this on, each
+# web process delivers right after the request on a background thread; turn it
+# off when `manage.py send_outbox --loop` runs as a separate worker.
+OUTBOX_SEND_IN_PROCESS = os.getenv("OUTBOX_SEND_IN_PROCESS", "True").lower() == "true"
 
 
 # Account Settings
@@ -235,6 +250,7 @@ if not DEBUG:
 
 if RUNNING_TESTS:
     EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    OUTBOX_SEND_IN_PROCESS = False
     PASSWORD_HASHERS = [
         "django.contrib.auth.hashers.MD5PasswordHasher",
     ]
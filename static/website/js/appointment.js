@@ -51,6 +51,46 @@ document.addEventListener('DOMContentLoaded', () => {
   const openWeekdays = new Set(clinicSchedule.open_weekdays_js);
   const buildSlotLabels = () => clinicSchedule.slot_labels;
 
+  // Month availability from the public API, fetched once per month.
+  // Until a month has loaded every slot is shown; the server still validates.
+  const availabilityRequests = new Map();
+  const availabilityByMonth = new Map();
+
+  const loadMonthAvailability = (isoDate) => {
+    if (!clinicSchedule.availability_url || !isoDate) {
+      return Promise.resolve(null);
+    }
+
+    const monthKey = isoDate.slice(0, 7);
+    if (!availabilityRequests.has(monthKey)) {
+      const request = fetch(`${clinicSchedule.availability_url}?month=${monthKey}`, {
+        headers: { Accept: 'application/json' },
+      })
+        .then((response) => (response.ok ? response.json() : null))
+        .catch(() => null)
+        .then((payload) => {
+          availabilityByMonth.set(monthKey, payload);
+          return payload;
+        });
+      availabilityRequests.set(monthKey, request);
+    }
+    return availabilityRequests.get(monthKey);
+  };
+
+  const isSlotTaken = (isoDate, label) => {
+    const availability = availabilityByMonth.get(isoDate.slice(0, 7));
+    if (!availability) {
+      return false;
+    }
+
+    const day = availability.days[isoDate];
+    const index = availability.slot_labels.indexOf(label);
+    if (day === undefined || index === -1) {
+      return false;
+    }
+    return day[index] !== '1';
+  };
+
   // MOBILE MATRIX ONLY: strip AM/PM for display
   const displayTimeLabel = (value) =>
     value.replace(' AM', '').replace(' PM', '');
@@ -182,6 +222,15 @@ document.addEventListener('DOMContentLoaded', () => {
     if (!slotList) return;
     slotList.innerHTML = '';
     const selectedTime = timeField.value;
+    const isoDate = dateInput.value;
+
+    if (isoDate && !availabilityByMonth.has(isoDate.slice(0, 7))) {
+      loadMonthAvailability(isoDate).then((availability) => {
+        if (availability && dateInput.value === isoDate) {
+          renderDesktopSlots();
+        }
+      });
+    }
 
     buildSlotLabels().forEach(label => {
       const btn = document.createElement('button');
@@ -190,6 +239,15 @@ document.addEventListener('DOMContentLoaded', () => {
 
       // DESKTOP: show full label with AM/PM
       btn.textContent = label;
+      if (isoDate && isSlotTaken(isoDate, label)) {
+        btn.disabled = true;
+        btn.title = 'Already booked';
+        if (timeField.value === label) {
+          timeField.value = '';
+        }
+        slotList.appendChild(btn);
+        return;
+      }
       if (label === selectedTime) {
         btn.classList.add('is-active');
       }
@@ -318,6 +376,16 @@ document.addEventListener('DOMContentLoaded', () => {
 
       weekLabel.textContent = `${fmtShort(start)} â€“ ${fmtShort(end)}`;
 
+      const pendingMonths = [formatIsoLocalDate(start), formatIsoLocalDate(end)]
+        .filter((iso) => !availabilityByMonth.has(iso.slice(0, 7)));
+      if (pendingMonths.length) {
+        Promise.all(pendingMonths.map(loadMonthAvailability)).then((results) => {
+          if (results.some(Boolean)) {
+            renderMatrix();
+          }
+        });
+      }
+
       header.appendChild(prevBtn);
       header.appendChild(weekLabel);
       header.appendChild(nextBtn);
@@ -411,6 +479,17 @@ document.addEventListener('DOMContentLoaded', () => {
           dot.className = 'dot';
           btn.appendChild(dot);
 
+          if (isSlotTaken(day.iso, label)) {
+            btn.disabled = true;
+            btn.setAttribute(
+              'aria-label',
+              `${displayTimeLabel(label)} on ${day.dowShort} ${day.dayNum} (already booked)`
+            );
+            td.appendChild(btn);
+            row.appendChild(td);
+            return;
+          }
+
           if (day.iso === selectedDateIso && label === selectedTime) {
             btn.classList.add('is-selected');
             btn.setAttribute('aria-pressed', 'true');